@@ -0,0 +1,6 @@
+"""Benchmarks for Dalton
+
+* server - Local stand-in for the AtomicAssets and WAX chain APIs
+* run - Runs the benchmarks and writes JSON results
+* compare - Compares two result files
+"""
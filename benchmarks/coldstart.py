@@ -0,0 +1,142 @@
+"""Cold start benchmark
+
+Starts fresh interpreters that import daltonapi.api and make one request to
+a local stand-in server, then checks the p99 of the import time and of the
+first request latency against a budget. The exit status is 1 when the
+budget is exceeded.
+
+    python -m benchmarks.coldstart --runs 20 --import-budget 0.1 --request-budget 0.5
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+import daltonapi
+
+from .server import StandInServer
+
+# modules the import of daltonapi.api should leave for first use
+HEAVY_MODULES = (
+    "asyncio",
+    "requests",
+    "httpx",
+    "msgpack",
+    "daltonapi.tools.cache",
+    "daltonapi.tools.catalog",
+)
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from daltonapi.api import Atom
+imported = time.perf_counter()
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+Atom(sys.argv[1]).get_asset("1099500000000")
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "request": done - imported, "heavy": heavy}))
+"""
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Returns the nearest-rank percentile of some values
+
+    Args:
+        values (list): measurements
+        share (float): percentile as a fraction, such as 0.99
+
+    Returns:
+        float: the value below which `share` of the values fall
+    """
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(share * len(ordered))) - 1]
+
+
+def measure(endpoint: str, runs: int = 10) -> dict:
+    """Measures cold starts in `runs` new interpreters
+
+    Args:
+        endpoint (str): AtomicAssets endpoint of a stand-in server
+        runs (int, optional): interpreters started. Defaults to 10.
+
+    Returns:
+        dict: p50 and p99 import and first request seconds, and the heavy
+        modules loaded by the import
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(daltonapi.__file__)))
+    env = dict(
+        os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get("PYTHONPATH", "")])
+    )
+    imports, requests, heavy = [], [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD, endpoint, *HEAVY_MODULES],
+            check=True,
+            capture_output=True,
+            env=env,
+        ).stdout
+        result = json.loads(output)
+        imports.append(result["import"])
+        requests.append(result["request"])
+        heavy.update(result["heavy"])
+    return {
+        "runs": runs,
+        "import_p50_seconds": percentile(imports, 0.5),
+        "import_p99_seconds": percentile(imports, 0.99),
+        "first_request_p50_seconds": percentile(requests, 0.5),
+        "first_request_p99_seconds": percentile(requests, 0.99),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def over_budget(
+    result: dict, import_budget: float, request_budget: float
+) -> Dict[str, float]:
+    """Returns the p99 metrics of a measure result that exceed their budget"""
+    budgets = {
+        "import_p99_seconds": import_budget,
+        "first_request_p99_seconds": request_budget,
+    }
+    return {
+        metric: result[metric]
+        for metric, budget in budgets.items()
+        if budget and result[metric] > budget
+    }
+
+
+def main(argv=None) -> int:
+    """Runs the cold start benchmark and checks it against the budget"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--import-budget", type=float, default=0.0, help="p99 seconds, 0 for none"
+    )
+    parser.add_argument(
+        "--request-budget", type=float, default=0.0, help="p99 seconds, 0 for none"
+    )
+    parser.add_argument(
+        "--output", help="file to write JSON results to, default stdout"
+    )
+    args = parser.parse_args(argv)
+
+    with StandInServer(assets=10, transfers=0, holders=0, templates=10) as server:
+        result = measure(server.atomic_endpoint, args.runs)
+    exceeded = over_budget(result, args.import_budget, args.request_budget)
+    result["over_budget"] = exceeded
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    for metric, value in exceeded.items():
+        print(f"{metric} {value:.3f}s is over budget", file=sys.stderr)
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Benchmark comparison
+
+Compares two result files written by benchmarks.run, metric by metric.
+
+    python -m benchmarks.compare old.json new.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+
+# endings of metrics where a larger value is worse
+LOWER_IS_BETTER = ("seconds", "bytes_per_asset")
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    """Returns (benchmark, metric, old, new, change, regressed) rows"""
+    rows = []
+    for name, metrics in new["results"].items():
+        for metric, value in metrics.items():
+            before = old["results"].get(name, {}).get(metric)
+            if not isinstance(value, (int, float)) or not before:
+                continue
+            change = (value - before) / before
+            worse = change if metric.endswith(LOWER_IS_BETTER) else -change
+            rows.append((name, metric, before, value, change, worse > threshold))
+    return rows
+
+
+def main(argv=None) -> int:
+    """Prints the comparison, exiting with 1 when a metric regressed"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed regression"
+    )
+    args = parser.parse_args(argv)
+    with open(args.old, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(args.new, encoding="utf-8") as file:
+        new = json.load(file)
+
+    rows = compare(old, new, args.threshold)
+    for name, metric, before, value, change, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(
+            f"{name:24} {metric:22} {before:14.3f} {value:14.3f} {change:+8.1%} {flag}"
+        )
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
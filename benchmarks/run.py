@@ -0,0 +1,229 @@
+"""Benchmark runner
+
+Runs the benchmarks against a local stand-in server and writes the results
+as JSON, so that releases can be compared with benchmarks.compare.
+
+    python -m benchmarks.run --output results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+import daltonapi
+from daltonapi.api import Atom, Wax, WaxTable
+from daltonapi.blocks import BlockReader
+from daltonapi.tools.atomic_classes import Asset, Transfer
+from daltonapi.tools.paging import PageSizeController
+
+from . import coldstart
+from .server import StandInServer, make_asset, make_transfer
+
+BENCHMARKS: Dict[str, Callable[[StandInServer, argparse.Namespace], dict]] = {}
+
+
+def benchmark(func):
+    """Registers a benchmark function under its name"""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+@benchmark
+def request_throughput(server: StandInServer, args) -> dict:
+    """Concurrent get_asset calls for distinct assets"""
+    atom = Atom(server.atomic_endpoint)
+    ids = [str(1099500000000 + i) for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(atom.get_asset, ids))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(ids),
+        "seconds": elapsed,
+        "requests_per_second": len(ids) / elapsed,
+    }
+
+
+@benchmark
+def account_throughput(server: StandInServer, args) -> dict:
+    """Concurrent Wax.get_account calls"""
+    wax = Wax(server.chain_endpoint)
+    names = [f"owner{i}.wam" for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(wax.get_account, names))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(names),
+        "seconds": elapsed,
+        "requests_per_second": len(names) / elapsed,
+    }
+
+
+@benchmark
+def pagination_crawl(server: StandInServer, args) -> dict:
+    """Serial get_assets paging through every asset"""
+    atom = Atom(server.atomic_endpoint)
+    start = time.perf_counter()
+    page, rows = 1, 0
+    while True:
+        assets = atom.get_assets(
+            collection="benchcollect", page=page, limit=args.page_size
+        )
+        rows += len(assets)
+        if len(assets) < args.page_size:
+            break
+        page += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "pages": page,
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed,
+    }
+
+
+@benchmark
+def table_crawl(server: StandInServer, args) -> dict:
+    """WaxTable.get_table_rows over the whole table"""
+    table = WaxTable(
+        "bench", "rows", endpoint=f"{server.chain_endpoint}v1/chain/get_table_rows"
+    )
+    start = time.perf_counter()
+    hits = table.get_table_rows("bench", {}, start_at=0, limit=args.page_size * 10)
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": len(hits),
+        "seconds": elapsed,
+        "rows_per_second": len(hits) / elapsed,
+    }
+
+
+@benchmark
+def adaptive_table_crawl(server: StandInServer, args) -> dict:
+    """WaxTable.get_table_rows over the whole table with adaptive page sizes"""
+    table = WaxTable(
+        "bench", "rows", endpoint=f"{server.chain_endpoint}v1/chain/get_table_rows"
+    )
+    paging = PageSizeController(initial=args.page_size)
+    start = time.perf_counter()
+    hits = table.get_table_rows("bench", {}, start_at=0, paging=paging)
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": len(hits),
+        "requests": paging.requests,
+        "best_page_size": paging.best,
+        "seconds": elapsed,
+        "rows_per_second": len(hits) / elapsed,
+    }
+
+
+@benchmark
+def block_read(server: StandInServer, args) -> dict:
+    """BlockReader over every block, a window of blocks fetched at a time"""
+    reader = BlockReader(Wax(server.chain_endpoint), window=args.workers)
+    start = time.perf_counter()
+    transfers = sum(1 for _ in reader.transfers(1, server.blocks))
+    elapsed = time.perf_counter() - start
+    return {
+        "blocks": server.blocks,
+        "transfers": transfers,
+        "seconds": elapsed,
+        "blocks_per_second": server.blocks / elapsed,
+    }
+
+
+@benchmark
+def model_construction(server: StandInServer, args) -> dict:
+    """Building Asset and Transfer objects from payloads, without the network"""
+    results = {}
+    for name, model, make in (
+        ("asset", Asset, make_asset),
+        ("transfer", Transfer, make_transfer),
+    ):
+        payloads = [make(i) for i in range(args.objects)]
+        start = time.perf_counter()
+        for payload in payloads:
+            model(payload)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_per_second"] = len(payloads) / elapsed
+    return results
+
+
+@benchmark
+def memory_per_object(server: StandInServer, args) -> dict:
+    """Memory held by built Asset objects, excluding their payloads"""
+    payloads = [make_asset(i) for i in range(args.objects)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    assets = [Asset(payload) for payload in payloads]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"objects": len(assets), "bytes_per_asset": size / len(assets)}
+
+
+@benchmark
+def cold_start(server: StandInServer, args) -> dict:
+    """Import time and first request latency of new interpreters"""
+    result = coldstart.measure(server.atomic_endpoint, args.cold_starts)
+    del result["heavy_modules"]
+    return result
+
+
+def main(argv=None) -> int:
+    """Runs the benchmarks and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output", help="file to write JSON results to, default stdout"
+    )
+    parser.add_argument(
+        "--only", nargs="*", choices=sorted(BENCHMARKS), help="benchmarks to run"
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--cold-starts", type=int, default=10)
+    parser.add_argument("--assets", type=int, default=5000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per response"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with StandInServer(
+        assets=args.assets,
+        table_rows=args.assets,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    ) as server:
+        for name in args.only or BENCHMARKS:
+            results[name] = BENCHMARKS[name](server, args)
+            print(f"{name}: {results[name]}", file=sys.stderr)
+
+    report = {
+        "daltonapi": daltonapi.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "settings": vars(args),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
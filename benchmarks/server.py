@@ -0,0 +1,621 @@
+"""Stand-in server
+
+A local HTTP server imitating the AtomicAssets, AtomicMarket and WAX chain
+APIs, serving generated payloads of configurable size, with injectable
+latency and errors. It also imitates the AtomicAssets live stream, as
+Engine.IO long-polling sessions that published events are queued on."""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+COLLECTION = "benchcollect"
+
+
+def make_collection(name: str = COLLECTION) -> dict:
+    """Returns a collection payload"""
+    return {
+        "collection_name": name,
+        "name": "Benchmark Collection",
+        "img": "QmTCbzLPUtvy6bHdn4cvrFxg4QLqMZEuP9KTWSHnY4Zw5F",
+        "author": "benchauthor1",
+        "allow_notify": True,
+        "authorized_accounts": ["benchauthor1"],
+        "notify_accounts": [],
+        "market_fee": 0.05,
+        "data": {"name": "Benchmark Collection", "description": "Generated data"},
+        "created_at_block": "100000",
+        "created_at_time": "1600000000000",
+    }
+
+
+def make_schema(index: int = 0) -> dict:
+    """Returns a schema payload"""
+    return {
+        "schema_name": f"schema{index % 10}",
+        "format": [
+            {"name": "name", "type": "string"},
+            {"name": "img", "type": "image"},
+            {"name": "rarity", "type": "string"},
+        ],
+        "created_at_block": "100001",
+        "created_at_time": "1600000000500",
+    }
+
+
+def make_template(index: int) -> dict:
+    """Returns a template payload"""
+    return {
+        "contract": "atomicassets",
+        "template_id": str(1000 + index),
+        "is_transferable": True,
+        "is_burnable": True,
+        "issued_supply": "500",
+        "max_supply": "1000",
+        "collection": make_collection(),
+        "schema": make_schema(index),
+        "immutable_data": {
+            "name": f"Template {index}",
+            "img": "QmUn8kvvHFrJK2mSsiPFNRMmmehnRoNJsqTP4XTVsemgrc",
+            "rarity": "common",
+        },
+        "created_at_block": "100002",
+        "created_at_time": "1600000001000",
+    }
+
+
+def make_asset(index: int, templates: int = 100) -> dict:
+    """Returns an asset payload"""
+    template = make_template(index % templates)
+    return {
+        "contract": "atomicassets",
+        "asset_id": str(1099500000000 + index),
+        "owner": f"owner{index % 1000}.wam",
+        "is_transferable": True,
+        "is_burnable": True,
+        "collection": template["collection"],
+        "schema": template["schema"],
+        "template": {
+            k: v for k, v in template.items() if k not in ("collection", "schema")
+        },
+        "mutable_data": {},
+        "immutable_data": {},
+        "template_mint": str(index % 500 + 1),
+        "backed_tokens": [],
+        "burned_by_account": None,
+        "burned_at_block": None,
+        "burned_at_time": None,
+        "updated_at_block": "100100",
+        "updated_at_time": "1600000100000",
+        "transferred_at_block": "100100",
+        "transferred_at_time": "1600000100000",
+        "minted_at_block": str(100010 + index),
+        "minted_at_time": str(1600000010000 + index * 500),
+        "data": dict(template["immutable_data"]),
+        "name": template["immutable_data"]["name"],
+    }
+
+
+def make_transfer(index: int) -> dict:
+    """Returns a transfer payload moving two assets"""
+    return {
+        "contract": "atomicassets",
+        "transfer_id": str(5000000 + index),
+        "sender_name": f"owner{index % 1000}.wam",
+        "recipient_name": f"owner{(index + 1) % 1000}.wam",
+        "memo": "benchmark",
+        "txid": "ab" * 32,
+        "assets": [make_asset(index), make_asset(index + 1)],
+        "collection": make_collection(),
+        "created_at_block": str(200000 + index),
+        "created_at_time": str(1600001000000 + index * 500),
+    }
+
+
+def make_sale(index: int, templates: int = 100) -> dict:
+    """Returns a sold AtomicMarket sale payload of one asset, one a minute"""
+    asset = make_asset(index, templates)
+    price = str((index * 7919 % 1000 + 100) * 1000000)
+    return {
+        "market_contract": "atomicmarket",
+        "assets_contract": "atomicassets",
+        "sale_id": str(100000 + index),
+        "seller": asset["owner"],
+        "buyer": f"owner{(index + 1) % 1000}.wam",
+        "offer_id": str(9000000 + index),
+        "price": {
+            "token_contract": "eosio.token",
+            "token_symbol": "WAX",
+            "token_precision": 8,
+            "median": None,
+            "amount": price,
+        },
+        "listing_price": price,
+        "listing_symbol": "WAX",
+        "assets": [asset],
+        "maker_marketplace": "",
+        "taker_marketplace": "",
+        "collection_name": COLLECTION,
+        "collection": asset["collection"],
+        "is_seller_contract": False,
+        "updated_at_block": str(300000 + index * 120),
+        "updated_at_time": str(1600002000000 + index * 60000),
+        "created_at_block": str(299000 + index * 120),
+        "created_at_time": str(1600001000000 + index * 60000),
+        "state": 3,
+    }
+
+
+def make_block(number: int) -> dict:
+    """Returns a chain block payload, with an AtomicAssets transfer, a token
+    transfer, and every tenth block an AtomicAssets mint log"""
+    seconds, half = divmod(number, 2)
+    txid = f"{number:064x}"
+    actions = [
+        {
+            "account": "atomicassets",
+            "name": "transfer",
+            "authorization": [{"actor": f"owner{number % 1000}.wam"}],
+            "data": {
+                "from": f"owner{number % 1000}.wam",
+                "to": f"owner{(number + 1) % 1000}.wam",
+                "asset_ids": [str(1099500000000 + number)],
+                "memo": "benchmark",
+            },
+        },
+        {
+            "account": "eosio.token",
+            "name": "transfer",
+            "authorization": [{"actor": f"owner{number % 1000}.wam"}],
+            "data": {
+                "from": f"owner{number % 1000}.wam",
+                "to": "benchauthor1",
+                "quantity": "1.00000000 WAX",
+                "memo": "",
+            },
+        },
+    ]
+    if number % 10 == 0:
+        actions.append(
+            {
+                "account": "atomicassets",
+                "name": "logmint",
+                "authorization": [{"actor": "atomicassets"}],
+                "data": {
+                    "asset_id": str(1099600000000 + number),
+                    "authorized_minter": "benchauthor1",
+                    "collection_name": COLLECTION,
+                    "schema_name": "schema0",
+                    "template_id": 1000,
+                    "new_asset_owner": f"owner{number % 1000}.wam",
+                },
+            }
+        )
+    return {
+        "timestamp": time.strftime(
+            "%Y-%m-%dT%H:%M:%S", time.gmtime(1600000000 + seconds)
+        )
+        + (".500" if half else ".000"),
+        "producer": "benchproduce",
+        "block_num": number,
+        "id": f"{number:08x}" + "0" * 56,
+        "transactions": [
+            {
+                "status": "executed",
+                "trx": {"id": txid, "transaction": {"actions": actions}},
+            },
+            {"status": "executed", "trx": "ff" * 32},
+        ],
+    }
+
+
+def make_account(name: str) -> dict:
+    """Returns a WAX chain account payload"""
+    return {
+        "account_name": name,
+        "head_block_num": 150000000,
+        "core_liquid_balance": "123.45678900 WAX",
+        "ram_quota": 10000,
+        "ram_usage": 5000,
+        "net_weight": 1000000000,
+        "cpu_weight": 2000000000,
+        "net_limit": {"used": 100, "available": 900, "max": 1000},
+        "cpu_limit": {"used": 200, "available": 800, "max": 1000},
+        "total_resources": {
+            "owner": name,
+            "net_weight": "10.00000000 WAX",
+            "cpu_weight": "20.00000000 WAX",
+            "ram_bytes": 10000,
+        },
+        "permissions": [],
+    }
+
+
+class _Sessions:
+    """Engine.IO long-polling sessions of the stand-in live stream"""
+
+    def __init__(self, ping_interval: float):
+        self.ping_interval = ping_interval
+        self._sessions: Dict[str, dict] = {}
+        self._changed = threading.Condition()
+        self._count = 0
+
+    def handle(self, method: str, query: dict, body: str) -> Tuple[int, str]:
+        """Returns the (status, text) of a polling request"""
+        with self._changed:
+            sid = query.get("sid")
+            if sid is None:
+                self._count += 1
+                sid = f"session{self._count}"
+                self._sessions[sid] = {"queue": [], "namespaces": set()}
+                return 200, "0" + json.dumps(
+                    {
+                        "sid": sid,
+                        "upgrades": [],
+                        "pingInterval": int(self.ping_interval * 1000),
+                        "pingTimeout": 5000,
+                        "maxPayload": 1000000,
+                    }
+                )
+            session = self._sessions.get(sid)
+            if session is None:
+                return 400, json.dumps({"code": 1, "message": "Session ID unknown"})
+            if method == "POST":
+                for packet in body.split("\x1e"):
+                    if packet.startswith("40"):
+                        namespace = packet[2:].rstrip(",")
+                        session["namespaces"].add(namespace)
+                        session["queue"].append(
+                            f"40{namespace},{json.dumps({'sid': sid})}"
+                        )
+                    elif packet.startswith("41"):
+                        session["namespaces"].discard(packet[2:].rstrip(","))
+                    elif packet == "1":
+                        del self._sessions[sid]
+                self._changed.notify_all()
+                return 200, "ok"
+            deadline = time.monotonic() + self.ping_interval
+            while not session["queue"] and sid in self._sessions:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    session["queue"].append("2")
+                    break
+                self._changed.wait(remaining)
+            if sid not in self._sessions:
+                return 400, json.dumps({"code": 1, "message": "Session ID unknown"})
+            packets, session["queue"] = session["queue"], []
+            return 200, "\x1e".join(packets)
+
+    def publish(self, namespace: str, event: str, data):
+        """Queues an event on every session connected to the namespace"""
+        packet = f"42{namespace},{json.dumps([event, data])}"
+        with self._changed:
+            for session in self._sessions.values():
+                if namespace in session["namespaces"]:
+                    session["queue"].append(packet)
+            self._changed.notify_all()
+
+    def drop(self):
+        """Ends every session, as a server restart would"""
+        with self._changed:
+            self._sessions.clear()
+            self._changed.notify_all()
+
+
+class StandInServer:
+    """Serves AtomicAssets and WAX chain API payloads from a local thread
+
+    Use as a context manager, then point clients at `atomic_endpoint` and
+    `chain_endpoint`.
+    """
+
+    def __init__(
+        self,
+        assets: int = 10000,
+        transfers: int = 10000,
+        holders: int = 5000,
+        templates: int = 100,
+        table_rows: int = 10000,
+        sales: int = 1000,
+        blocks: int = 1000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 1,
+        ping_interval: float = 5.0,
+    ):
+        """Creates a StandInServer
+
+        Args:
+            assets (int, optional): number of assets served. Defaults to 10000.
+            transfers (int, optional): number of transfers served. Defaults to 10000.
+            holders (int, optional): number of holders served. Defaults to 5000.
+            templates (int, optional): number of templates served. Defaults to 100.
+            table_rows (int, optional): rows in the served table. Defaults to 10000.
+            sales (int, optional): number of sales served. Defaults to 1000.
+            blocks (int, optional): number of chain blocks served. Defaults to 1000.
+            latency (float, optional): seconds added to every response. Defaults to 0.
+            error_rate (float, optional): fraction of requests failed with a 500. Defaults to 0.
+            seed (int, optional): seed of the error injection. Defaults to 1.
+            ping_interval (float, optional): seconds a live stream poll waits for
+                events. Defaults to 5.
+        """
+        self.assets = assets
+        self.transfers = transfers
+        self.holders = holders
+        self.templates = templates
+        self.table_rows = table_rows
+        self.sales = sales
+        self.blocks = blocks
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions = _Sessions(ping_interval)
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Returns the base URL of the running server"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def atomic_endpoint(self) -> str:
+        """Returns the endpoint to pass to Atom"""
+        return f"{self.url}atomicassets/v1/"
+
+    @property
+    def market_endpoint(self) -> str:
+        """Returns the endpoint to pass to Market"""
+        return f"{self.url}atomicmarket/v1/"
+
+    @property
+    def chain_endpoint(self) -> str:
+        """Returns the endpoint to pass to Wax"""
+        return self.url
+
+    def start(self):
+        """Starts serving on a free local port"""
+        server = self
+
+        class Handler(_Handler):
+            stand_in = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the server"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_transfer(self, publish: bool = True) -> dict:
+        """Adds a transfer to those served, publishing it on the live stream
+
+        Args:
+            publish (bool, optional): send it to stream clients. Defaults to True.
+
+        Returns:
+            dict: the transfer payload
+        """
+        with self._lock:
+            index = self.transfers
+            self.transfers += 1
+        transfer = make_transfer(index)
+        if publish:
+            self.publish(
+                "/atomicassets/v1/transfers",
+                "new_transfer",
+                {
+                    "transfer": transfer,
+                    "block": {"block_num": transfer["created_at_block"]},
+                },
+            )
+        return transfer
+
+    def publish(self, namespace: str, event: str, data):
+        """Sends an event to the live stream clients connected to a namespace"""
+        self._sessions.publish(namespace, event, data)
+
+    def drop_stream(self):
+        """Ends every live stream session, so clients have to reconnect"""
+        self._sessions.drop()
+
+    def stream(self, method: str, query: dict, body: str) -> Tuple[int, str]:
+        """Returns the (status, text) of an Engine.IO polling request"""
+        return self._sessions.handle(method, query, body)
+
+    def fail_next(self) -> bool:
+        """Counts a request and decides whether to fail it"""
+        with self._lock:
+            self.requests += 1
+            return self._random.random() < self.error_rate
+
+    def get(self, path: str, query: dict):
+        """Returns the (status, payload) of an AtomicAssets or AtomicMarket request"""
+        api, _, *parts = path.strip("/").split("/")
+        page = int(query.get("page", 1))
+        limit = int(query.get("limit", 100))
+        start = (page - 1) * limit
+
+        def window(total, build):
+            return [build(i) for i in range(start, min(total, start + limit))]
+
+        if api == "atomicmarket":
+            return self._market(parts, query, start, limit)
+        if parts == ["assets"]:
+            data = self._assets(query, start, limit)
+        elif parts[0] == "assets" and len(parts) == 2:
+            index = int(parts[1]) - 1099500000000
+            if not 0 <= index < self.assets:
+                return 416, {"success": False, "message": "Asset not found"}
+            data = make_asset(index, self.templates)
+        elif parts == ["transfers"]:
+            first = max(0, int(query.get("lower_bound", 5000000)) - 5000000)
+            data = [
+                make_transfer(i)
+                for i in range(
+                    first + start, min(self.transfers, first + start + limit)
+                )
+            ]
+        elif parts == ["accounts"]:
+            data = window(
+                self.holders,
+                lambda i: {"account": f"owner{i}.wam", "assets": str(self.holders - i)},
+            )
+        elif parts == ["templates"]:
+            data = window(self.templates, make_template)
+        elif parts == ["schemas"]:
+            data = window(min(self.templates, 10), make_schema)
+        elif parts[0] == "templates" and len(parts) == 3:
+            data = make_template(int(parts[2]) - 1000)
+        elif parts[0] == "collections" and len(parts) == 2:
+            data = make_collection(parts[1])
+        else:
+            return 404, {"success": False, "message": "Not found"}
+        return 200, {"success": True, "data": data, "query_time": time.time() * 1000}
+
+    def _assets(self, query: dict, start: int, limit: int) -> list:
+        """Returns a page of assets, filtered by schema, template and asset_id bounds"""
+        indices = range(self.assets)
+        if "schema_name" in query:
+            schemas = set(query["schema_name"].split(","))
+            indices = [
+                i for i in indices if f"schema{i % self.templates % 10}" in schemas
+            ]
+        if "template_id" in query:
+            templates = set(query["template_id"].split(","))
+            indices = [
+                i for i in indices if str(1000 + i % self.templates) in templates
+            ]
+        if query.get("sort") == "asset_id":
+            low = int(query.get("lower_bound", 0)) - 1099500000000
+            high = int(query.get("upper_bound", 1099500000000 + self.assets))
+            indices = [i for i in indices if low <= i < high - 1099500000000]
+            if query.get("order", "desc") == "desc":
+                indices = indices[::-1]
+        indices = list(indices)[start : start + limit]
+        return [make_asset(i, self.templates) for i in indices]
+
+    def _market(self, parts: list, query: dict, start: int, limit: int):
+        """Returns the (status, payload) of an AtomicMarket GET request"""
+        if parts == ["sales"]:
+            indices = range(self.sales)
+            if "template_id" in query:
+                templates = set(query["template_id"].split(","))
+                indices = [
+                    i for i in indices if str(1000 + i % self.templates) in templates
+                ]
+            if query.get("sort") == "sale_id":
+                low = int(query.get("lower_bound", 0)) - 100000
+                indices = [i for i in indices if i >= low]
+                if query.get("order", "desc") == "desc":
+                    indices = indices[::-1]
+            indices = list(indices)[start : start + limit]
+            data = [make_sale(i, self.templates) for i in indices]
+        elif parts[0] == "sales" and len(parts) == 2:
+            index = int(parts[1]) - 100000
+            if not 0 <= index < self.sales:
+                return 416, {"success": False, "message": "Sale not found"}
+            data = make_sale(index, self.templates)
+        else:
+            return 404, {"success": False, "message": "Not found"}
+        return 200, {"success": True, "data": data, "query_time": time.time() * 1000}
+
+    def post(self, path: str, body: dict):
+        """Returns the (status, payload) of a WAX chain POST request"""
+        if path == "/v1/chain/get_account":
+            return 200, make_account(body.get("account_name", ""))
+        if path == "/v1/chain/get_info":
+            return 200, {
+                "chain_id": "1064487b3cd1a897ce03ae5b6a865651747e2e152090f99c1d19d44e01aea5a4",
+                "head_block_num": self.blocks,
+                "last_irreversible_block_num": max(1, self.blocks - 300),
+            }
+        if path == "/v1/chain/get_block":
+            number = int(body.get("block_num_or_id", 0))
+            if not 1 <= number <= self.blocks:
+                return 500, {"code": 500, "message": "Could not find block"}
+            return 200, make_block(number)
+        if path == "/v1/chain/get_table_rows":
+            start = int(body.get("lower_bound") or 0)
+            end = min(self.table_rows, start + int(body.get("limit", 10)))
+            rows = [
+                {"id": i, "owner": f"owner{i % 1000}.wam"} for i in range(start, end)
+            ]
+            more = end < self.table_rows
+            return 200, {
+                "rows": rows,
+                "more": more,
+                "next_key": str(end) if more else "",
+            }
+        return 404, {"code": 404, "message": "Not found"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the StandInServer"""
+
+    stand_in: StandInServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply_text(self, status: int, text: str):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve(self, handler):
+        if self.stand_in.latency:
+            time.sleep(self.stand_in.latency)
+        if self.stand_in.fail_next():
+            self._reply(500, {"success": False, "message": "Injected error"})
+            return
+        self._reply(*handler())
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        query = {key: val[-1] for key, val in parse_qs(url.query).items()}
+        if url.path == "/socket.io/":
+            self._reply_text(*self.stand_in.stream("GET", query, ""))
+            return
+        self._serve(lambda: self.stand_in.get(url.path, query))
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        content = self.rfile.read(length)
+        if url.path == "/socket.io/":
+            query = {key: val[-1] for key, val in parse_qs(url.query).items()}
+            self._reply_text(*self.stand_in.stream("POST", query, content.decode()))
+            return
+        body = json.loads(content or b"{}")
+        self._serve(lambda: self.stand_in.post(url.path, body))
@@ -1,8 +1,21 @@
 """Dalton API Wrapper for WAX
 
-This module provides a Python wrapper for the Atomic Asset API, 
-with plans to expand to WAX and Atomic Market API endpoints.
+This module provides a Python wrapper for the Atomic Asset and Atomic Market
+APIs, and for the WAX chain API.
 
+The clients can be imported from the package, which loads daltonapi.api
+on first use.
 """
 
 __version__ = "0.5.0"
+
+# names imported from daltonapi.api when first used
+_LAZY = ("Atom", "Market", "Wax", "WaxTable")
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from . import api  # pylint: disable=import-outside-toplevel
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,9 +4,21 @@ This is the core module of the Dalton API wrapper, providing the Atom Class,
 which can be used to query the various API endpoints."""
 
 import json
-from typing import List, Union
-
-import requests
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlencode, urlparse
 
 from .tools.atomic_classes import (
     Asset,
@@ -15,52 +27,658 @@ from .tools.atomic_classes import (
     Collection,
     Transfer,
     AtomicBaseClass,
+    CollectionStats,
+    TemplateStats,
+    SchemaStats,
+    AccountStats,
+    AccountCollectionStats,
+    IPFS_GATEWAY,
+    set_gateway,
 )
 from .tools.atomic_errors import AtomicIDError, NoFiltersError, RequestFailedError
+from .tools.batching import chunk_values, encoded_length
+from .tools.flight import SingleFlight, flight_key
+from .tools.instrumentation import Instrumentation, QueryEvent
+from .tools.market_classes import Auction, BuyOffer, PricePoint, Sale
+from .tools.transport import RequestsTransport, Response, Transport
 
 from .tools.wax_classes import Account
 
+if TYPE_CHECKING:
+    from .tools.cache import ResponseCache
+    from .tools.catalog import Catalog
+    from .tools.paging import PageSizeController
 
-class Atom:
-    """API Wrapper Class for AtomicAssets"""
+# largest page of holders the accounts endpoint returns
+_HOLDER_PAGE_SIZE = 1000
 
-    def __init__(self, endpoint: str = ""):
-        """Creates an Atom object for accessing the AtomicAssets API
+# query parameter behind each argument that results can be grouped by
+_FILTER_NAMES = {
+    "owner": "owner",
+    "sender": "sender",
+    "recipient": "recipient",
+    "collection": "collection_name",
+    "schema": "schema_name",
+    "template": "template_id",
+}
+
+
+def _copy(result):
+    """Returns a copy of the lists and dicts of a shared result, so callers can't alter it
+
+    Model objects inside are shared rather than copied.
+    """
+    if isinstance(result, list):
+        return [_copy(item) for item in result]
+    if isinstance(result, dict):
+        return {key: _copy(value) for key, value in result.items()}
+    return result
+
+
+def _list_of(cls: type) -> Callable[[list], list]:
+    """Returns a function building a list of cls objects from API data"""
+    return lambda data: [cls(item) for item in data]
+
+
+class _Client(ABC):
+    """Request handling shared by the API clients"""
+
+    def _setup_requests(
+        self,
+        coalesce: bool,
+        instrumentation: Optional[Instrumentation],
+        retries: int,
+        transport: Optional[Transport],
+        cache: Optional["ResponseCache"] = None,
+    ):
+        """Sets up coalescing, instrumentation, retries, the transport and caching
 
         Args:
-            endpoint (str, optional): Sets API endpoint. Defaults to AtomicAssets hosted API.
+            coalesce (bool): Share one request between threads making identical
+                queries at the same time.
+            instrumentation (Instrumentation): Receives an event for every query.
+            retries (int): Times a request is retried after a connection error.
+            transport (Transport): Sends the requests, a RequestsTransport if None.
+            cache (ResponseCache, optional): Caches built results. Defaults to None.
         """
-        if endpoint:
-            self.endpoint = endpoint
-        else:
-            self.endpoint = "https://wax.api.atomicassets.io/atomicassets/v1/"
+        self._flight = SingleFlight() if coalesce else None
+        self.instrumentation = instrumentation
+        self.retries = retries
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.cache = cache
+        # size of the last response received by each thread
+        self._received = threading.local()
+
+    @abstractmethod
+    def _unwrap(self, status: int, data):
+        """Returns the payload of a decoded response, or raises RequestFailedError"""
+
+    def _label(self, endpoint: str) -> str:
+        """Returns the endpoint name used to aggregate statistics"""
+        return urlparse(endpoint).path.rstrip("/").rsplit("/", 1)[-1]
+
+    def _digest(self, content: bytes) -> str:
+        """Returns the digest telling whether a response body changed"""
+        # only clients with a cache digest responses
+        from .tools.cache import (  # pylint: disable=import-outside-toplevel
+            content_digest,
+        )
+
+        return content_digest(content)
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        data: Optional[dict] = None,
+        build: Optional[Callable] = None,
+    ):
+        """Makes a request, sharing it with identical concurrent requests
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Endpoint of query
+            params (dict, optional): Query string parameters. Defaults to None.
+            data (dict, optional): JSON body. Defaults to None.
+            build (callable, optional): Builds the returned objects from the payload.
+                Defaults to None.
+
+        Returns:
+            The payload, or what build returned for it
+        """
+        if self._flight is None:
+            return self._fetch(method, endpoint, params, data, build)
+        key = flight_key(method, endpoint, params if data is None else data)
+        start = time.perf_counter()
+        result, shared = self._flight.call(
+            key, lambda: self._fetch(method, endpoint, params, data, build)
+        )
+        if shared:
+            if self.instrumentation is not None:
+                total = time.perf_counter() - start
+                self.instrumentation.emit(
+                    QueryEvent(
+                        type(self).__name__,
+                        self._label(endpoint),
+                        endpoint,
+                        params if data is None else data,
+                        200,
+                        0,
+                        0.0,
+                        0.0,
+                        0.0,
+                        0.0,
+                        total,
+                        coalesced=True,
+                    )
+                )
+            result = _copy(result)
+        return result
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Optional[dict],
+        headers: Optional[dict] = None,
+    ) -> Tuple[Response, int]:
+        """Sends a request through the transport, retrying connection errors
+
+        Returns:
+            tuple: (response, number of retries needed)
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.transport.request(
+                    method, endpoint, params=params, json=data, headers=headers
+                )
+                return response, attempt
+            except self.transport.retry_errors:
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+
+    def _fetch(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Optional[dict],
+        build: Optional[Callable],
+    ):
+        """Sends a request, then decodes its payload and builds the result
+
+        With a cache, fresh results are returned without a request, and expired
+        ones are revalidated and reused when the response did not change.
+
+        Raises:
+            RequestFailedError: When the API reports the request failed
+        """
+        if self.instrumentation is None and self.cache is None:
+            response, _ = self._send(method, endpoint, params, data)
+            self._received.size = len(response.content)
+            result = self._unwrap(response.status_code, json.loads(response.content))
+            return result if build is None else build(result)
+
+        start = time.perf_counter()
+        status, size, retries, error, cache_hit = 0, 0, 0, None, False
+        connect = transfer = decode = built = 0.0
+        key = entry = None
+        try:
+            if self.cache is not None:
+                key = flight_key(method, endpoint, params if data is None else data)
+                entry = self.cache.get(key)
+                if entry is not None and self.cache.fresh(entry):
+                    self.cache.hit(entry)
+                    status, cache_hit = 200, True
+                    return _copy(entry.result)
+            response, retries = self._send(
+                method,
+                endpoint,
+                params,
+                data,
+                entry.validators() if entry is not None else None,
+            )
+            received = time.perf_counter()
+            status, size = response.status_code, len(response.content)
+            self._received.size = size
+            connect = min(response.elapsed, received - start)
+            transfer = received - start - connect
+            digest = self._digest(response.content) if key is not None else ""
+            if entry is not None and (
+                status == 304 or (status == 200 and digest == entry.digest)
+            ):
+                self.cache.hit(entry, revalidated=True)
+                cache_hit = True
+                return _copy(entry.result)
+            json_data = json.loads(response.content)
+            decoded = time.perf_counter()
+            decode = decoded - received
+            result = self._unwrap(status, json_data)
+            if build is not None:
+                result = build(result)
+            built = time.perf_counter() - decoded
+            if key is not None:
+                self.cache.store(key, result, response.headers or {}, digest)
+                return _copy(result)
+            return result
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.emit(
+                    QueryEvent(
+                        type(self).__name__,
+                        self._label(endpoint),
+                        endpoint,
+                        params if data is None else data,
+                        status,
+                        size,
+                        connect,
+                        transfer,
+                        decode,
+                        built,
+                        time.perf_counter() - start,
+                        retries=retries,
+                        cache_hit=cache_hit,
+                        error=error,
+                    )
+                )
+
+    def _adaptive_page(
+        self, paging: "PageSizeController", query: Callable[[int], Tuple[list, bool]]
+    ) -> Tuple[list, bool, int]:
+        """Fetches one page at the size paging chooses, recording how it went
+
+        Requests that time out, lose their connection or return a broken body
+        are retried at the smaller size chosen next, until the minimum size
+        fails too. Errors returned by the API are raised at once, as a smaller
+        page would fail the same way.
+
+        Args:
+            paging (PageSizeController): chooses the page size
+            query (callable): takes a page size, returns (rows, more rows follow)
+
+        Raises:
+            RequestFailedError: When the API returns an error
+
+        Returns:
+            tuple: (rows, more rows follow, page size requested)
+        """
+        while True:
+            size = paging.size
+            self._received.size = 0
+            start = time.perf_counter()
+            try:
+                rows, more = query(size)
+            except (json.JSONDecodeError, *self.transport.retry_errors):
+                paging.record(size, 0, time.perf_counter() - start, error=True)
+                if size <= paging.minimum:
+                    raise
+                continue
+            paging.record(
+                size,
+                len(rows),
+                time.perf_counter() - start,
+                self._received.size,
+                more,
+            )
+            return rows, more, size
+
+
+class _AtomicClient(_Client):
+    """Request handling shared by the AtomicAssets and AtomicMarket API clients
+
+    query, filter_value, filter_params and pages let the modules built on
+    the clients, such as the watcher and the exporters, make their own
+    queries. Their endpoints are relative to the client's endpoint.
+    """
+
+    def query(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        build: Optional[Callable] = None,
+    ):
+        """Queries an endpoint of the API, such as "assets"
 
-    def _query(self, endpoint: str, params=None) -> dict:
+        Identical queries made concurrently share one request and its result.
+
+        Args:
+            endpoint (str): endpoint after the client's endpoint
+            params (dict, optional): query parameters. Defaults to None.
+            build (callable, optional): Builds the returned objects from the data.
+                Defaults to None.
+
+        Raises:
+            RequestFailedError: API success returned with False
+
+        Returns:
+            The data of the response, or what build returned for it
+        """
+        return self._query(f"{self.endpoint}{endpoint}", params=params, build=build)
+
+    def filter_value(self, value) -> Union[str, List[str]]:
+        """Returns the ID of an object, or the IDs of a list of them, as filter values
+
+        Args:
+            value: object from the API, ID, or list of them
+
+        Returns:
+            str or list[str]: the IDs
+        """
+        return self._process_input(value)
+
+    def filter_params(self, fields: dict) -> dict:
+        """Returns the query parameters of filters, joining lists of values
+
+        Args:
+            fields (dict): filter name:value pairs, empty values are left out
+
+        Returns:
+            dict: query parameters
+        """
+        return self._filter_params(fields)
+
+    def pages(
+        self,
+        endpoint: str,
+        params: dict,
+        build: Callable,
+        sort: str,
+        limit: int = 100,
+        paging: Optional["PageSizeController"] = None,
+    ) -> Iterator[list]:
+        """Yields every page of a list endpoint, in ascending order of its numeric id
+
+        Args:
+            endpoint (str): endpoint after the client's endpoint, such as "assets"
+            params (dict): filters of the query
+            build (callable): Builds the list of objects from the data
+            sort (str): id field the results are sorted by, such as "asset_id"
+            limit (int, optional): results per page without paging. Defaults to 100.
+            paging (PageSizeController, optional): chooses the size of every page.
+                Defaults to None.
+
+        Yields:
+            list: the objects of each page
+        """
+        return self._pages(
+            f"{self.endpoint}{endpoint}", params, build, sort, limit, paging
+        )
+
+    def _query(self, endpoint: str, params=None, build: Optional[Callable] = None):
         """Internal function to make a query and return data
 
+        Identical queries made concurrently share one request and its result.
+
         Args:
             endpoint (str): Endpoint of query
             params (dict): Dictionary of parameters for the query
+            build (callable, optional): Builds the returned objects from the data
 
         Returns:
-            data (dict): Request data
+            data (dict): Request data, or what build returned for it
 
         Raises:
             RequestFailedError: API success returned with False - likely invalid endpoint
         """
         if params is None:
             params = {}
-        r = requests.get(endpoint, params=params)
-        data = json.loads(r.content)
+        if build is not None and self.gateways[0] != IPFS_GATEWAY:
+            build = self._gateway_build(build)
+        return self._request("GET", endpoint, params=params, build=build)
+
+    def _gateway_build(self, build: Callable) -> Callable:
+        """Returns build, pointing the media links of what it returns at the gateway"""
+
+        def build_with_gateway(data):
+            result = build(data)
+            for item in result if isinstance(result, list) else [result]:
+                set_gateway(item, self.gateways[0])
+            return result
+
+        return build_with_gateway
+
+    def _unwrap(self, status: int, data):
         if data["success"]:
             return data["data"]
         raise RequestFailedError
 
-    def _process_input(self, field) -> str:
+    def _digest(self, content: bytes) -> str:
+        # query_time changes on every response, so it is left out
+        end = content.rfind(b',"query_time"')
+        return super()._digest(content[:end] if end != -1 else content)
+
+    def _label(self, endpoint: str) -> str:
+        if endpoint.startswith(self.endpoint):
+            return endpoint[len(self.endpoint) :].lstrip("/").split("/")[0]
+        return super()._label(endpoint)
+
+    def _process_input(self, field) -> Union[str, List[str]]:
+        if isinstance(field, (list, tuple, set)):
+            return [str(self._process_input(item)) for item in field]
         if field.__class__.__bases__[0] == AtomicBaseClass:
             field = field.get_id()
         return field
 
+    def _filter_params(self, fields: dict) -> dict:
+        """Returns the query parameters of the filters given, joining lists of values"""
+        params = {}
+        for key, value in fields.items():
+            value = self._process_input(value)
+            if value not in ("", []):
+                params[key] = ",".join(value) if isinstance(value, list) else value
+        return params
+
+    def _pages(
+        self,
+        endpoint: str,
+        params: dict,
+        build: Callable,
+        sort: str,
+        limit: int = 100,
+        paging: Optional["PageSizeController"] = None,
+    ) -> Iterator[list]:
+        """Yields every page of a list query, in ascending order of its numeric id
+
+        Pages follow each other by that id rather than by page number, so the
+        page size can change between pages, and deep pages cost no more than
+        the first.
+
+        Args:
+            endpoint (str): Endpoint of query
+            params (dict): filters of the query
+            build (callable): Builds the list of objects from the data
+            sort (str): id field the results are sorted by, such as "asset_id"
+            limit (int, optional): results per page without paging. Defaults to 100.
+            paging (PageSizeController, optional): chooses the size of every page.
+                Defaults to None.
+
+        Yields:
+            list: the objects of each page
+        """
+        params = dict(params, sort=sort, order="asc", page=1)
+
+        def query(size: int) -> Tuple[list, bool]:
+            items = self._query(endpoint, params=dict(params, limit=size), build=build)
+            return items, len(items) == size
+
+        while True:
+            if paging is None:
+                items, more = query(limit)
+            else:
+                items, more, _ = self._adaptive_page(paging, query)
+            yield items
+            if not more:
+                return
+            params["lower_bound"] = str(int(items[-1].get_id()) + 1)
+
+
+class Atom(_AtomicClient):
+    """API Wrapper Class for AtomicAssets"""
+
+    def __init__(
+        self,
+        endpoint: str = "",
+        max_url_length: int = 4000,
+        coalesce: bool = True,
+        instrumentation: Optional[Instrumentation] = None,
+        retries: int = 0,
+        transport: Optional[Transport] = None,
+        cache: Optional["ResponseCache"] = None,
+        catalog: Optional["Catalog"] = None,
+        gateways: Optional[List[str]] = None,
+    ):
+        """Creates an Atom object for accessing the AtomicAssets API
+
+        Args:
+            endpoint (str, optional): Sets API endpoint. Defaults to AtomicAssets hosted API.
+            max_url_length (int, optional): Longest URL built when packing lists of
+                filter values into one request. Defaults to 4000.
+            coalesce (bool, optional): Share one request between threads making
+                identical queries at the same time. Defaults to True.
+            instrumentation (Instrumentation, optional): Receives an event for
+                every query. Defaults to None.
+            retries (int, optional): Times a request is retried after a connection
+                error. Defaults to 0.
+            transport (Transport, optional): Sends the requests. Defaults to a
+                RequestsTransport.
+            cache (ResponseCache, optional): Caches built results, revalidating
+                them when they expire. Defaults to None.
+            catalog (Catalog, optional): Collects the templates and schemas of
+                returned assets, and answers get_template and get_schema.
+                Defaults to None.
+            gateways (list, optional): IPFS gateway URLs ending with "/ipfs/", most
+                preferred first. Media links of returned objects use the first,
+                a MediaFetcher falls back to the others. Defaults to ipfs.io.
+        """
+        if endpoint:
+            self.endpoint = endpoint
+        else:
+            self.endpoint = "https://wax.api.atomicassets.io/atomicassets/v1/"
+        self.max_url_length = max_url_length
+        self.catalog = catalog
+        self.gateways = list(gateways) if gateways else [IPFS_GATEWAY]
+        self._setup_requests(coalesce, instrumentation, retries, transport, cache)
+
+    def pack(self, endpoint: str, fields: dict) -> List[dict]:
+        """Packs list valued filters into as few queries as the URL length allows
+
+        Args:
+            endpoint (str): endpoint after the client's endpoint, such as "transfers"
+            fields (dict): query parameters, filters may be lists of values
+
+        Returns:
+            list[dict]: query parameters of each request
+        """
+        return self._pack_fields(f"{self.endpoint}{endpoint}", fields)
+
+    def _pack_fields(
+        self, endpoint: str, fields: dict, max_length: Optional[int] = None
+    ) -> List[dict]:
+        """Packs list valued filters into as few queries as the URL length allows
+
+        The longest list is split across queries. When the other lists do not
+        fit beside even one of its values, they are split as well and the
+        queries cover every combination of the chunks.
+
+        Args:
+            endpoint (str): Endpoint of query
+            fields (dict): Query parameters, filters may be lists of values
+            max_length (int, optional): URL length limit. Defaults to max_url_length.
+
+        Returns:
+            list[dict]: Query parameters for each request
+        """
+        if max_length is None:
+            max_length = self.max_url_length
+        lists = {key: val for key, val in fields.items() if isinstance(val, list)}
+        joined = {
+            key: ",".join(val) if key in lists else val for key, val in fields.items()
+        }
+        if not lists or len(endpoint) + len(urlencode(joined)) + 1 <= max_length:
+            return [joined]
+        split = max(lists, key=lambda key: len(lists[key]))
+        values = lists[split]
+        rest = {key: val for key, val in fields.items() if key != split}
+        # the other filters must leave room for the longest single value
+        reserve = len(split) + 2 + max(encoded_length(value) for value in values)
+        packed = []
+        for base in self._pack_fields(endpoint, rest, max_length - reserve):
+            fixed = len(endpoint) + len(urlencode(base)) + len(split) + 3
+            for chunk in chunk_values(values, max_chars=max_length - fixed):
+                packed.append(dict(base, **{split: ",".join(chunk)}))
+        return packed
+
+    def _packed_query(
+        self, endpoint: str, fields: dict, build: Optional[Callable] = None
+    ) -> list:
+        """Runs a list query once per packed group of filter values
+
+        Args:
+            endpoint (str): Endpoint of query
+            fields (dict): Query parameters, filters may be lists of values
+            build (callable, optional): Builds a list of objects from each request's data
+
+        Returns:
+            list: Concatenated request data, or built objects
+        """
+        data = []
+        for params in self._pack_fields(endpoint, fields):
+            data.extend(self._query(endpoint, params=params, build=build))
+        return data
+
+    @staticmethod
+    def _matched_values(item: AtomicBaseClass, group_by: str) -> List[str]:
+        """Returns the filter values of one kind that an item matches
+
+        Args:
+            item (AtomicBaseClass): An Asset or Transfer
+            group_by (str): Filter argument name, e.g. "owner" or "template"
+
+        Returns:
+            list[str]: matched values
+        """
+        accounts = {
+            "owner": "_owner",
+            "sender": "_sender_name",
+            "recipient": "_recipient_name",
+        }
+        if group_by in accounts:
+            return [getattr(item, accounts[group_by])]
+        if isinstance(item, Transfer) and group_by in ("schema", "template"):
+            key = "schema_name" if group_by == "schema" else "template_id"
+            return [nft[group_by][key] for nft in item._assets if nft.get(group_by)]
+        entity = getattr(item, "_" + group_by, None)
+        return [] if entity is None else [str(entity.get_id())]
+
+    def _group(
+        self, items: List[AtomicBaseClass], values: Union[str, List[str]], group_by: str
+    ) -> Dict[str, list]:
+        """Groups results by the filter value each one matched
+
+        Args:
+            items (list): Assets or Transfers
+            values (str, list[str]): Filter values that were requested
+            group_by (str): Filter argument name the values belong to
+
+        Returns:
+            dict: value:list pairs, with an entry for every requested value
+        """
+        if not isinstance(values, list):
+            values = str(values).split(",")
+        groups = {value: [] for value in values}
+        for item in items:
+            for value in self._matched_values(item, group_by):
+                if value in groups:
+                    groups[value].append(item)
+        return groups
+
     def get_asset(self, asset_id: str) -> Asset:
         """Gets an atomic asset by ID
 
@@ -75,36 +693,53 @@ class Atom:
         """
         if not isinstance(asset_id, str) or not asset_id.isnumeric():
             raise AtomicIDError(asset_id)
-        data = self._query(f"{self.endpoint}assets/{asset_id}")
-        return Asset(data)
+        asset = self._query(f"{self.endpoint}assets/{asset_id}", build=Asset)
+        if self.catalog is not None:
+            self.catalog.add_assets([asset])
+        return asset
 
     def get_assets(
         self,
-        owner: str = "",
-        collection: Collection = "",
-        schema: Schema = "",
-        template: Template = "",
+        owner: Union[str, List[str]] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
         page: int = 1,
         order: str = "desc",
         limit=100,
-    ) -> List[Asset]:
+        group_by: str = "",
+    ) -> Union[List[Asset], Dict[str, List[Asset]]]:
         """Get a list of assets based on critera. Must have at least 1 criteria
 
+        Any criteria may be a list of values. Lists are packed into as few requests
+        as the URL length allows, and page and limit apply to each of those
+        requests, so the result joins one page of every request rather than
+        forming one page of all matches. iter_assets reads every match.
+
         Args:
-            owner (str, optional): account name. Defaults to "".
-            collection (str, Collection, optional): collection name. Defaults to "".
-            schema (str, Schema, optional): schema name. Defaults to "".
-            template (str, Template, optional): template ID. Defaults to "".
+            owner (str, list, optional): account name(s). Defaults to "".
+            collection (str, Collection, list, optional): collection name(s). Defaults to "".
+            schema (str, Schema, list, optional): schema name(s). Defaults to "".
+            template (str, Template, list, optional): template ID(s). Defaults to "".
             page (int, optional): start page. Defaults to 1
             order (str, optional): ordering. (asc/desc) - Defaults to "desc"
             limit (int, optional): maximum number of results to return. Defaults to 100.
+            group_by (str, optional): criteria to group results by, e.g. "owner". Defaults to "".
 
         Raises:
             NoFiltersError: Raised when no filters are passed
 
         Returns:
-            list[Asset]: List of Asset objects matching the criteria
+            list[Asset]: List of Asset objects matching the criteria, or a dict of
+            value:list[Asset] pairs when group_by is set
         """
+        assert group_by in (
+            "",
+            "owner",
+            "collection",
+            "schema",
+            "template",
+        ), "Assets can be grouped by owner, collection, schema or template"
         fields = {
             "owner": self._process_input(owner),
             "collection_name": self._process_input(collection),
@@ -112,15 +747,70 @@ class Atom:
             "template_id": self._process_input(template),
         }
         for key in list(fields.keys()):
-            if fields[key] == "":
+            if fields[key] in ("", []):
                 del fields[key]
         if len(fields) == 0:
             raise NoFiltersError
+        groups = fields.get(_FILTER_NAMES.get(group_by), "")
         fields["limit"] = limit
         fields["page"] = page
         fields["order"] = order
-        data = self._query(f"{self.endpoint}assets", params=fields)
-        return [Asset(nft) for nft in data]
+        assets = self._packed_query(
+            f"{self.endpoint}assets", fields, build=_list_of(Asset)
+        )
+        if self.catalog is not None:
+            self.catalog.add_assets(assets)
+        if group_by:
+            return self._group(assets, groups, group_by)
+        return assets
+
+    def iter_assets(
+        self,
+        owner: Union[str, List[str]] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        limit: int = 100,
+        paging: Optional["PageSizeController"] = None,
+    ) -> Iterator[Asset]:
+        """Yields every asset matching the criteria, fetching a page at a time
+
+        Pages follow each other by asset ID rather than by page number, so the
+        page size can change between pages, and deep pages cost no more than
+        the first. Assets are yielded in ascending asset ID order.
+
+        Args:
+            owner (str, list, optional): account name(s). Defaults to "".
+            collection (str, Collection, list, optional): collection name(s). Defaults to "".
+            schema (str, Schema, list, optional): schema name(s). Defaults to "".
+            template (str, Template, list, optional): template ID(s). Defaults to "".
+            limit (int, optional): assets per page without paging. Defaults to 100.
+            paging (PageSizeController, optional): chooses the size of every page
+                from the latency, size and errors of the previous ones, in place of
+                limit. Defaults to None.
+
+        Raises:
+            NoFiltersError: Raised when no filters are passed
+
+        Yields:
+            Asset: the matching assets
+        """
+        params = self._filter_params(
+            {
+                "owner": owner,
+                "collection_name": collection,
+                "schema_name": schema,
+                "template_id": template,
+            }
+        )
+        if len(params) == 0:
+            raise NoFiltersError
+        for assets in self._pages(
+            f"{self.endpoint}assets", params, _list_of(Asset), "asset_id", limit, paging
+        ):
+            if self.catalog is not None:
+                self.catalog.add_assets(assets)
+            yield from assets
 
     def get_asset_history(
         self, item: Union[Asset, str], page: int = 1
@@ -138,9 +828,9 @@ class Atom:
         if isinstance(item, Asset):
             item = item.get_id()
         params = {"asset_id": item, "page": page}
-        data = self._query(f"{self.endpoint}transfers", params=params)
-        data = [Transfer(t) for t in data]
-        return data
+        return self._query(
+            f"{self.endpoint}transfers", params=params, build=_list_of(Transfer)
+        )
 
     def get_collection(self, collection_id: str, verbose: bool = False) -> Collection:
         """Gets an atomic collection by ID
@@ -155,10 +845,12 @@ class Atom:
             Template: Corresponding object
         """
         assert isinstance(collection_id, str), "Collection ID should be passed as a str"
-        data = self._query(f"{self.endpoint}collections/{collection_id}")
-        if verbose:
-            print(data)
-        return Collection(data)
+        endpoint = f"{self.endpoint}collections/{collection_id}"
+        if not verbose:
+            return self._query(endpoint, build=Collection)
+        data = self._query(endpoint)
+        print(data)
+        return set_gateway(Collection(data), self.gateways[0])
 
     def get_template(
         self, collection_id: Union[Collection, str], template_id: str
@@ -183,9 +875,41 @@ class Atom:
             collection_id = collection_id.get_id()
         if not template_id.isnumeric():
             raise AtomicIDError(template_id)
+        if self.catalog is not None:
+            template = self.catalog.template(collection_id, template_id)
+            if template is not None:
+                return template
+
+        template = self._query(
+            f"{self.endpoint}templates/{collection_id}/{template_id}", build=Template
+        )
+        if self.catalog is not None:
+            self.catalog.add_template(collection_id, template)
+        return template
+
+    def get_templates(
+        self, collection_id: Union[Collection, str], page: int = 1, limit: int = 100
+    ) -> List[Template]:
+        """Gets a page of the templates of a collection
+
+        Args:
+            collection_id (Union[Collection, str]): Collection ID
+            page (int, optional): page number. Defaults to 1.
+            limit (int, optional): templates per page. Defaults to 100.
 
-        data = self._query(f"{self.endpoint}templates/{collection_id}/{template_id}")
-        return Template(data)
+        Returns:
+            list[Template]: List of Template objects
+        """
+        params = {
+            "collection_name": self._process_input(collection_id),
+            "page": page,
+            "limit": limit,
+            "order": "asc",
+            "sort": "created",
+        }
+        return self._query(
+            f"{self.endpoint}templates", params=params, build=_list_of(Template)
+        )
 
     def get_schema(
         self, collection_id: Union[Collection, str], schema_id: str
@@ -208,25 +932,63 @@ class Atom:
         ), "Collection ID should be passed as a str or a Collection object"
         if isinstance(collection_id, Collection):
             collection_id = collection_id.get_id()
+        if self.catalog is not None:
+            schema = self.catalog.schema(collection_id, schema_id)
+            if schema is not None:
+                return schema
+
+        schema = self._query(
+            f"{self.endpoint}schemas/{collection_id}/{schema_id}", build=Schema
+        )
+        if self.catalog is not None:
+            self.catalog.add_schema(collection_id, schema)
+        return schema
+
+    def get_schemas(
+        self, collection_id: Union[Collection, str], page: int = 1, limit: int = 100
+    ) -> List[Schema]:
+        """Gets a page of the schemas of a collection
 
-        data = self._query(f"{self.endpoint}schemas/{collection_id}/{schema_id}")
-        return Schema(data)
+        Args:
+            collection_id (Union[Collection, str]): Collection ID
+            page (int, optional): page number. Defaults to 1.
+            limit (int, optional): schemas per page. Defaults to 100.
+
+        Returns:
+            list[Schema]: List of Schema objects
+        """
+        params = {
+            "collection_name": self._process_input(collection_id),
+            "page": page,
+            "limit": limit,
+            "order": "asc",
+            "sort": "created",
+        }
+        return self._query(
+            f"{self.endpoint}schemas", params=params, build=_list_of(Schema)
+        )
 
     def get_holders(
         self,
-        collection: Collection = "",
-        schema: Schema = "",
-        template: Template = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
         page: int = 1,
         order: str = "desc",
         limit: int = 100,
     ):
         """Returns a list of accouts holding some entity (collection, schema, template)
 
+        Any criteria may be a list of values. Lists are packed into as few requests
+        as the URL length allows. When they take more than one request, every
+        request is paged to the end and the counts of an account found by several
+        of them are added together, before the ranking is paged with page and
+        limit.
+
         Args:
-            collection (str, Collection, optional): collection name. Defaults to "".
-            schema (str, Schema, optional): schema name. Defaults to "".
-            template (str, Template, optional): template ID. Defaults to "".
+            collection (str, Collection, list, optional): collection name(s). Defaults to "".
+            schema (str, Schema, list, optional): schema name(s). Defaults to "".
+            template (str, Template, list, optional): template ID(s). Defaults to "".
             page (int, optional): start page. Defaults to 1
             order (str, optional): ordering. (asc/desc) - Defaults to "desc"
             limit (int, optional): maximum number of results to return. Defaults to 100.
@@ -237,46 +999,187 @@ class Atom:
         Returns:
             list[dict]: List of dicts containing account names and number
             of matching assets held.
-        """    
+        """
         fields = {
             "collection_name": self._process_input(collection),
             "schema_name": self._process_input(schema),
             "template_id": self._process_input(template),
         }
         for key in list(fields.keys()):
-            if fields[key] == "":
+            if fields[key] in ("", []):
                 del fields[key]
         if len(fields) == 0:
             raise NoFiltersError
         fields["limit"] = limit
         fields["page"] = page
         fields["order"] = order
-        data = self._query(f"{self.endpoint}accounts", params=fields)
-        return data
+        packed = self._pack_fields(f"{self.endpoint}accounts", fields)
+        if len(packed) == 1:
+            return self._query(f"{self.endpoint}accounts", params=packed[0])
+        counts: Dict[str, int] = {}
+        for params in packed:
+            for holder in self._all_holders(params):
+                account = holder["account"]
+                counts[account] = counts.get(account, 0) + int(holder["assets"])
+        ranked = sorted(
+            counts.items(),
+            key=lambda pair: (pair[1], pair[0]),
+            reverse=order == "desc",
+        )
+        start = (page - 1) * limit
+        return [
+            {"account": account, "assets": str(count)}
+            for account, count in ranked[start : start + limit]
+        ]
+
+    def _all_holders(self, params: dict) -> List[dict]:
+        """Returns every holder row of one holder query, paging to the end
+
+        Args:
+            params (dict): Query parameters of the accounts endpoint
+
+        Returns:
+            list[dict]: holder rows of every page
+        """
+        params = dict(params, limit=_HOLDER_PAGE_SIZE, page=1)
+        rows: List[dict] = []
+        while True:
+            data = self._query(f"{self.endpoint}accounts", params=dict(params))
+            rows.extend(data)
+            if len(data) < _HOLDER_PAGE_SIZE:
+                return rows
+            params["page"] += 1
+
+    def get_collection_stats(
+        self, collection: Union[Collection, str]
+    ) -> CollectionStats:
+        """Gets asset, burn and template counts of a collection in one request
+
+        Args:
+            collection (Union[Collection, str]): Collection ID
+
+        Returns:
+            CollectionStats: Counts of the collection
+        """
+        name = self._process_input(collection)
+        return self._query(
+            f"{self.endpoint}collections/{name}/stats",
+            build=lambda data: CollectionStats(dict(data, collection_name=name)),
+        )
+
+    def get_template_stats(
+        self, collection: Union[Collection, str], template: Union[Template, str]
+    ) -> TemplateStats:
+        """Gets asset and burn counts of a template in one request
+
+        Args:
+            collection (Union[Collection, str]): Collection ID
+            template (Union[Template, str]): Template ID
+
+        Returns:
+            TemplateStats: Counts of the template
+        """
+        name, template_id = self._process_input(collection), self._process_input(
+            template
+        )
+        return self._query(
+            f"{self.endpoint}templates/{name}/{template_id}/stats",
+            build=lambda data: TemplateStats(
+                dict(data, collection_name=name, template_id=template_id)
+            ),
+        )
+
+    def get_schema_stats(
+        self, collection: Union[Collection, str], schema: Union[Schema, str]
+    ) -> SchemaStats:
+        """Gets asset, burn and template counts of a schema in one request
+
+        Args:
+            collection (Union[Collection, str]): Collection ID
+            schema (Union[Schema, str]): Schema name
+
+        Returns:
+            SchemaStats: Counts of the schema
+        """
+        name, schema_name = self._process_input(collection), self._process_input(schema)
+        return self._query(
+            f"{self.endpoint}schemas/{name}/{schema_name}/stats",
+            build=lambda data: SchemaStats(
+                dict(data, collection_name=name, schema_name=schema_name)
+            ),
+        )
+
+    def get_account_stats(self, account: str) -> AccountStats:
+        """Gets the number of assets an account holds per collection and template
+
+        Args:
+            account (str): account name
+
+        Returns:
+            AccountStats: Counts of the account
+        """
+        return self._query(
+            f"{self.endpoint}accounts/{account}",
+            build=lambda data: AccountStats(dict(data, account=account)),
+        )
+
+    def get_account_collection_stats(
+        self, account: str, collection: Union[Collection, str]
+    ) -> AccountCollectionStats:
+        """Gets the number of assets an account holds per template and schema of a collection
+
+        Args:
+            account (str): account name
+            collection (Union[Collection, str]): Collection ID
+
+        Returns:
+            AccountCollectionStats: Counts of the account in the collection
+        """
+        name = self._process_input(collection)
+        return self._query(
+            f"{self.endpoint}accounts/{account}/{name}",
+            build=lambda data: AccountCollectionStats(
+                dict(data, account=account, collection_name=name)
+            ),
+        )
 
     def get_burned(
         self,
-        owner: str = "",
-        collection: Collection = "",
-        schema: Schema = "",
-        template: Template = "",
+        owner: Union[str, List[str]] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
         limit=100,
-    ) -> List[Asset]:
+        group_by: str = "",
+    ) -> Union[List[Asset], Dict[str, List[Asset]]]:
         """Get a list of burned assets based on critera. Must have at least 1 criteria
 
+        Any criteria may be a list of values. Lists are packed into as few requests
+        as the URL length allows, and limit applies to each of those requests,
+        so up to limit assets come back per request.
+
         Args:
-            owner (str, optional): account name. Defaults to "".
-            collection (str, Collection, optional): collection name. Defaults to "".
-            schema (str, Schema, optional): schema name. Defaults to "".
-            template (str, Template, optional): template ID. Defaults to "".
+            owner (str, list, optional): account name(s). Defaults to "".
+            collection (str, Collection, list, optional): collection name(s). Defaults to "".
+            schema (str, Schema, list, optional): schema name(s). Defaults to "".
+            template (str, Template, list, optional): template ID(s). Defaults to "".
             limit (int, optional): maximum number of results to return. Defaults to 100.
+            group_by (str, optional): criteria to group results by, e.g. "owner". Defaults to "".
 
         Raises:
             NoFiltersError: Raised when no filters are passed
 
         Returns:
-            list[Asset]: List of Asset objects matching the criteria
+            list[Asset]: List of Asset objects matching the criteria, or a dict of
+            value:list[Asset] pairs when group_by is set
         """
+        assert group_by in (
+            "",
+            "owner",
+            "collection",
+            "schema",
+            "template",
+        ), "Assets can be grouped by owner, collection, schema or template"
         fields = {
             "owner": self._process_input(owner),
             "collection_name": self._process_input(collection),
@@ -284,102 +1187,471 @@ class Atom:
             "template_id": self._process_input(template),
         }
         for key in list(fields.keys()):
-            if fields[key] == "":
+            if fields[key] in ("", []):
                 del fields[key]
         if len(fields) == 0:
             raise NoFiltersError
+        groups = fields.get(_FILTER_NAMES.get(group_by), "")
         fields["limit"] = limit
         fields["burned"] = True
 
-        data = self._query(f"{self.endpoint}/assets", params=fields)
-        return [Asset(nft) for nft in data]
+        assets = self._packed_query(
+            f"{self.endpoint}/assets", fields, build=_list_of(Asset)
+        )
+        if group_by:
+            return self._group(assets, groups, group_by)
+        return assets
 
     # def get_transfer(self):
     #     pass
 
     def get_transfers(
         self,
-        sender: str = "",
-        recipient: str = "",
-        collection: Collection = "",
-        schema: Schema = "",
-        template: Template = "",
+        sender: Union[str, List[str]] = "",
+        recipient: Union[str, List[str]] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
         page: int = 1,
         order: str = "desc",
         limit=100,
-    ) -> List[Transfer]:
+        group_by: str = "",
+    ) -> Union[List[Transfer], Dict[str, List[Transfer]]]:
         """Search for transfers fulfilling a criteria
 
+        Any criteria may be a list of values. Lists are packed into as few requests
+        as the URL length allows, and page and limit apply to each of those
+        requests, so the result joins one page of every request rather than
+        forming one page of all matches.
+
         Args:
-            sender (str, optional): Sender address. Defaults to "".
-            recipient (str, optional): Recipient address. Defaults to "".
-            collection (str, Collection, optional): collection name. Defaults to "".
-            schema (str, Schema, optional): schema name. Defaults to "".
-            template (str, Template, optional): template ID. Defaults to "".
+            sender (str, list, optional): Sender address(es). Defaults to "".
+            recipient (str, list, optional): Recipient address(es). Defaults to "".
+            collection (str, Collection, list, optional): collection name(s). Defaults to "".
+            schema (str, Schema, list, optional): schema name(s). Defaults to "".
+            template (str, Template, list, optional): template ID(s). Defaults to "".
             page (int, optional): start page. Defaults to 1
             order (str, optional): ordering. (asc/desc) - Defaults to "desc"
             limit (int, optional): maximum number of results to return. Defaults to 100.
+            group_by (str, optional): criteria to group results by, e.g. "sender". Defaults to "".
 
         Raises:
             NoFiltersError: Raised when no criteria provided
 
         Returns:
-            list[Transfer]: List of Transfer objects matching the criteria
+            list[Transfer]: List of Transfer objects matching the criteria, or a dict
+            of value:list[Transfer] pairs when group_by is set
         """
-        assert (
-            sender != "" or recipient != ""
+        assert sender not in ("", []) or recipient not in (
+            "",
+            [],
         ), "Sender and recipient can't both be blank"
+        assert group_by in (
+            "",
+            "sender",
+            "recipient",
+            "collection",
+            "schema",
+            "template",
+        ), "Transfers can be grouped by sender, recipient, collection, schema or template"
         fields = {
             "collection_name": self._process_input(collection),
             "schema_name": self._process_input(schema),
             "template_id": self._process_input(template),
-            "sender": sender,
-            "recipient": recipient,
+            "sender": self._process_input(sender),
+            "recipient": self._process_input(recipient),
             "page": page,
         }
         for key in list(fields.keys()):
-            if fields[key] == "":
+            if fields[key] in ("", []):
                 del fields[key]
+        groups = fields.get(_FILTER_NAMES.get(group_by), "")
         fields["limit"] = limit
         fields["page"] = page
         fields["order"] = order
-        data = self._query(f"{self.endpoint}transfers", params=fields)
-        if data:
-            built_data = [Transfer(t) for t in data]
-            return built_data
-        return []
+        built_data = self._packed_query(
+            f"{self.endpoint}transfers", fields, build=_list_of(Transfer)
+        )
+        if group_by:
+            return self._group(built_data, groups, group_by)
+        return built_data
 
 
-class Wax:
-    """Class for the WAX API"""
+class Market(_AtomicClient):
+    """API Wrapper Class for AtomicMarket"""
 
-    def __init__(self, endpoint: str = ""):
+    def __init__(
+        self,
+        endpoint: str = "",
+        coalesce: bool = True,
+        instrumentation: Optional[Instrumentation] = None,
+        retries: int = 0,
+        transport: Optional[Transport] = None,
+        cache: Optional["ResponseCache"] = None,
+        gateways: Optional[List[str]] = None,
+    ):
+        """Creates a Market object for accessing the AtomicMarket API
+
+        Args:
+            endpoint (str, optional): Sets API endpoint. Defaults to AtomicMarket hosted API.
+            coalesce (bool, optional): Share one request between threads making
+                identical queries at the same time. Defaults to True.
+            instrumentation (Instrumentation, optional): Receives an event for
+                every query. Defaults to None.
+            retries (int, optional): Times a request is retried after a connection
+                error. Defaults to 0.
+            transport (Transport, optional): Sends the requests. Defaults to a
+                RequestsTransport.
+            cache (ResponseCache, optional): Caches built results, revalidating
+                them when they expire. Defaults to None.
+            gateways (list, optional): IPFS gateway URLs ending with "/ipfs/", most
+                preferred first. Defaults to ipfs.io.
+        """
         if endpoint:
             self.endpoint = endpoint
         else:
-            self.endpoint = "https://api.waxsweden.org/"
+            self.endpoint = "https://wax.api.atomicassets.io/atomicmarket/v1/"
+        self.gateways = list(gateways) if gateways else [IPFS_GATEWAY]
+        self._setup_requests(coalesce, instrumentation, retries, transport, cache)
+
+    def _get_one(self, kind: str, cls: type, item_id: str):
+        """Returns one sale, auction or buyoffer by ID"""
+        if not isinstance(item_id, str) or not item_id.isnumeric():
+            raise AtomicIDError(item_id)
+        return self._query(f"{self.endpoint}{kind}/{item_id}", build=cls)
+
+    @staticmethod
+    def _market_fields(
+        state, collection, schema, template, seller, buyer
+    ) -> Dict[str, Union[str, list]]:
+        return {
+            "state": state,
+            "collection_name": collection,
+            "schema_name": schema,
+            "template_id": template,
+            "seller": seller,
+            "buyer": buyer,
+        }
+
+    def _get_list(
+        self, kind: str, cls: type, fields: dict, page, limit, order, sort
+    ) -> list:
+        """Returns one page of sales, auctions or buyoffers"""
+        params = self._filter_params(fields)
+        params.update(page=page, limit=limit, order=order, sort=sort)
+        return self._query(f"{self.endpoint}{kind}", params=params, build=_list_of(cls))
+
+    def _iter_list(
+        self,
+        kind: str,
+        cls: type,
+        fields: dict,
+        limit: int,
+        paging: Optional["PageSizeController"],
+    ) -> Iterator:
+        """Yields every sale, auction or buyoffer matching the filters"""
+        for items in self._pages(
+            f"{self.endpoint}{kind}",
+            self._filter_params(fields),
+            _list_of(cls),
+            cls.id_field,
+            limit,
+            paging,
+        ):
+            yield from items
+
+    def get_sale(self, sale_id: str) -> Sale:
+        """Gets a sale by ID
+
+        Args:
+            sale_id (str): Sale ID
+
+        Raises:
+            AtomicIDError: Raised when an incorrect sale_id is passed
+
+        Returns:
+            Sale: Corresponding object
+        """
+        return self._get_one("sales", Sale, sale_id)
+
+    def get_sales(
+        self,
+        state: Union[int, str, list] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        seller: Union[str, List[str]] = "",
+        buyer: Union[str, List[str]] = "",
+        page: int = 1,
+        limit: int = 100,
+        order: str = "desc",
+        sort: str = "created",
+    ) -> List[Sale]:
+        """Get a page of sales based on criteria
+
+        Args:
+            state (int, str, list, optional): state code(s), named in
+                LISTING_STATES, such as 3 for sold. Defaults to "".
+            collection (str, Collection, list, optional): collection name(s). Defaults to "".
+            schema (str, Schema, list, optional): schema name(s). Defaults to "".
+            template (str, Template, list, optional): template ID(s). Defaults to "".
+            seller (str, list, optional): seller account name(s). Defaults to "".
+            buyer (str, list, optional): buyer account name(s). Defaults to "".
+            page (int, optional): start page. Defaults to 1
+            limit (int, optional): maximum number of results to return. Defaults to 100.
+            order (str, optional): ordering. (asc/desc) - Defaults to "desc"
+            sort (str, optional): field to sort by, such as "price" or "updated".
+                Defaults to "created".
+
+        Returns:
+            list[Sale]: List of Sale objects matching the criteria
+        """
+        fields = self._market_fields(state, collection, schema, template, seller, buyer)
+        return self._get_list("sales", Sale, fields, page, limit, order, sort)
+
+    def iter_sales(
+        self,
+        state: Union[int, str, list] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        seller: Union[str, List[str]] = "",
+        buyer: Union[str, List[str]] = "",
+        limit: int = 100,
+        paging: Optional["PageSizeController"] = None,
+    ) -> Iterator[Sale]:
+        """Yields every sale matching the criteria, fetching a page at a time
+
+        Sales are yielded in ascending sale ID order, and pages follow each
+        other by sale ID, so iterating a large market costs no more per page
+        than its first page. Filters are those of get_sales.
+
+        Args:
+            limit (int, optional): sales per page without paging. Defaults to 100.
+            paging (PageSizeController, optional): chooses the size of every page
+                in place of limit. Defaults to None.
+
+        Yields:
+            Sale: the matching sales
+        """
+        fields = self._market_fields(state, collection, schema, template, seller, buyer)
+        return self._iter_list("sales", Sale, fields, limit, paging)
+
+    def get_auction(self, auction_id: str) -> Auction:
+        """Gets an auction by ID
+
+        Args:
+            auction_id (str): Auction ID
+
+        Raises:
+            AtomicIDError: Raised when an incorrect auction_id is passed
+
+        Returns:
+            Auction: Corresponding object
+        """
+        return self._get_one("auctions", Auction, auction_id)
+
+    def get_auctions(
+        self,
+        state: Union[int, str, list] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        seller: Union[str, List[str]] = "",
+        buyer: Union[str, List[str]] = "",
+        page: int = 1,
+        limit: int = 100,
+        order: str = "desc",
+        sort: str = "created",
+    ) -> List[Auction]:
+        """Get a page of auctions based on criteria, taking the arguments of get_sales
+
+        Returns:
+            list[Auction]: List of Auction objects matching the criteria
+        """
+        fields = self._market_fields(state, collection, schema, template, seller, buyer)
+        return self._get_list("auctions", Auction, fields, page, limit, order, sort)
+
+    def iter_auctions(
+        self,
+        state: Union[int, str, list] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        seller: Union[str, List[str]] = "",
+        buyer: Union[str, List[str]] = "",
+        limit: int = 100,
+        paging: Optional["PageSizeController"] = None,
+    ) -> Iterator[Auction]:
+        """Yields every auction matching the criteria, in ascending auction ID order,
+        taking the arguments of iter_sales
+
+        Yields:
+            Auction: the matching auctions
+        """
+        fields = self._market_fields(state, collection, schema, template, seller, buyer)
+        return self._iter_list("auctions", Auction, fields, limit, paging)
 
-    def _query(self, endpoint: str, method: str = "POST", data=None):
+    def get_buyoffer(self, buyoffer_id: str) -> BuyOffer:
+        """Gets a buyoffer by ID
+
+        Args:
+            buyoffer_id (str): Buyoffer ID
+
+        Raises:
+            AtomicIDError: Raised when an incorrect buyoffer_id is passed
+
+        Returns:
+            BuyOffer: Corresponding object
+        """
+        return self._get_one("buyoffers", BuyOffer, buyoffer_id)
+
+    def get_buyoffers(
+        self,
+        state: Union[int, str, list] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        seller: Union[str, List[str]] = "",
+        buyer: Union[str, List[str]] = "",
+        page: int = 1,
+        limit: int = 100,
+        order: str = "desc",
+        sort: str = "created",
+    ) -> List[BuyOffer]:
+        """Get a page of buyoffers based on criteria, taking the arguments of get_sales
+
+        State codes are named in BUYOFFER_STATES.
+
+        Returns:
+            list[BuyOffer]: List of BuyOffer objects matching the criteria
+        """
+        fields = self._market_fields(state, collection, schema, template, seller, buyer)
+        return self._get_list("buyoffers", BuyOffer, fields, page, limit, order, sort)
+
+    def iter_buyoffers(
+        self,
+        state: Union[int, str, list] = "",
+        collection: Union[Collection, str, list] = "",
+        schema: Union[Schema, str, list] = "",
+        template: Union[Template, str, list] = "",
+        seller: Union[str, List[str]] = "",
+        buyer: Union[str, List[str]] = "",
+        limit: int = 100,
+        paging: Optional["PageSizeController"] = None,
+    ) -> Iterator[BuyOffer]:
+        """Yields every buyoffer matching the criteria, in ascending buyoffer ID
+        order, taking the arguments of iter_sales
+
+        Yields:
+            BuyOffer: the matching buyoffers
+        """
+        fields = self._market_fields(state, collection, schema, template, seller, buyer)
+        return self._iter_list("buyoffers", BuyOffer, fields, limit, paging)
+
+    def get_price_history(
+        self,
+        collection: Union[Collection, str] = "",
+        schema: Union[Schema, str] = "",
+        template: Union[Template, str] = "",
+    ) -> List[PricePoint]:
+        """Gets the daily median and average sale prices of assets
+
+        Args:
+            collection (str, Collection, optional): collection name. Defaults to "".
+            schema (str, Schema, optional): schema name. Defaults to "".
+            template (str, Template, optional): template ID. Defaults to "".
+
+        Raises:
+            NoFiltersError: Raised when no filters are passed
+
+        Returns:
+            list[PricePoint]: one PricePoint per day with sales
+        """
+        params = self._filter_params(
+            {
+                "collection_name": collection,
+                "schema_name": schema,
+                "template_id": template,
+            }
+        )
+        if len(params) == 0:
+            raise NoFiltersError
+        return self._query(
+            f"{self.endpoint}prices/sales/days",
+            params=params,
+            build=_list_of(PricePoint),
+        )
+
+
+class _ChainClient(_Client):
+    """Request handling shared by the WAX chain API clients"""
+
+    def _query(
+        self,
+        endpoint: str,
+        method: str = "POST",
+        data=None,
+        build: Optional[Callable] = None,
+    ):
         """Internal function to make a query and return data
 
+        Identical queries made concurrently share one request and its result.
+
         Args:
                 endpoint (str): Endpoint of query
                 data (dict): Dictionary of parameters for the query
+                build (callable, optional): Builds the returned objects from the data
 
         Returns:
-                data (dict): Request data
+                data (dict): Request data, or what build returned for it
 
         Raises:
                 RequestFailedError: API success returned with False - likely invalid endpoint
         """
         if data is None:
             data = {}
-        request_data = requests.request(method, endpoint, json=data)
-        json_data = json.loads(request_data.content)
-        if request_data.status_code == 200:
-            return json_data
+        return self._request(method, endpoint, data=data, build=build)
+
+    def _unwrap(self, status: int, data):
+        if status == 200:
+            return data
         raise RequestFailedError
 
+
+class Wax(_ChainClient):
+    """Class for the WAX API"""
+
+    def __init__(
+        self,
+        endpoint: str = "",
+        coalesce: bool = True,
+        instrumentation: Optional[Instrumentation] = None,
+        retries: int = 0,
+        transport: Optional[Transport] = None,
+        cache: Optional["ResponseCache"] = None,
+    ):
+        """Creates a Wax object for accessing the WAX chain API
+
+        Args:
+            endpoint (str, optional): Sets API endpoint. Defaults to WAX Sweden hosted API.
+            coalesce (bool, optional): Share one request between threads making
+                identical queries at the same time. Defaults to True.
+            instrumentation (Instrumentation, optional): Receives an event for
+                every query. Defaults to None.
+            retries (int, optional): Times a request is retried after a connection
+                error. Defaults to 0.
+            transport (Transport, optional): Sends the requests. Defaults to a
+                RequestsTransport.
+            cache (ResponseCache, optional): Caches built results, revalidating
+                them when they expire. Defaults to None.
+        """
+        if endpoint:
+            self.endpoint = endpoint
+        else:
+            self.endpoint = "https://api.waxsweden.org/"
+        self._setup_requests(coalesce, instrumentation, retries, transport, cache)
+
     def get_account(self, account_name: str):
         """[summary]
 
@@ -390,41 +1662,97 @@ class Wax:
             [type]: [description]
         """
         data = {"account_name": account_name}
-        account = self._query(f"{self.endpoint}v1/chain/get_account", data=data)
-        return Account(account)
+        return self._query(
+            f"{self.endpoint}v1/chain/get_account", data=data, build=Account
+        )
+
+    def get_info(self) -> dict:
+        """Returns the state of the chain, such as head_block_num and
+        last_irreversible_block_num
+
+        Returns:
+            dict: chain info
+        """
+        return self._query(f"{self.endpoint}v1/chain/get_info")
 
+    def get_block(self, block_num: int) -> dict:
+        """Returns a block with its transactions
+
+        Args:
+            block_num (int): block number
+
+        Raises:
+            RequestFailedError: When the node does not have the block
+
+        Returns:
+            dict: block, with the actions of each transaction
+        """
+        return self._query(
+            f"{self.endpoint}v1/chain/get_block", data={"block_num_or_id": block_num}
+        )
+
+    def get_accounts(
+        self,
+        account_names: List[str],
+        workers: int = 8,
+        errors: Optional[Dict[str, Exception]] = None,
+    ) -> Dict[str, Account]:
+        """Returns many accounts, fetched concurrently
+
+        The chain API returns one account per request, so the requests run on
+        `workers` threads. With a cache, fresh accounts are not fetched again.
+        An account that fails, whether refused by the API or lost to a
+        connection error, is left out without affecting the others.
+
+        Args:
+            account_names (list): account names, duplicates are fetched once
+            workers (int, optional): requests made at the same time. Defaults to 8.
+            errors (dict, optional): receives account_name:exception pairs of the
+                accounts that failed. Defaults to None.
 
-class WaxTable:
+        Returns:
+            dict: account_name:Account pairs, in the order given, without the
+            accounts that failed
+        """
+        names = list(dict.fromkeys(account_names))
+        accounts = {}
+        failures = (
+            RequestFailedError,
+            json.JSONDecodeError,
+            *self.transport.retry_errors,
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(self.get_account, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    accounts[name] = future.result()
+                except failures as exc:
+                    if errors is not None:
+                        errors[name] = exc
+        return accounts
+
+
+class WaxTable(_ChainClient):
     """Class for WAX Tables" """
 
-    def __init__(self, contract: str, table: str, endpoint: str = ""):
+    def __init__(
+        self,
+        contract: str,
+        table: str,
+        endpoint: str = "",
+        coalesce: bool = True,
+        instrumentation: Optional[Instrumentation] = None,
+        retries: int = 0,
+        transport: Optional[Transport] = None,
+        cache: Optional["ResponseCache"] = None,
+    ):
         self.contract = contract
         self.table = table
         if endpoint:
             self.endpoint = endpoint
         else:
             self.endpoint = "https://api.waxsweden.org/v1/chain/get_table_rows"
-
-    def _query(self, endpoint: str, method: str = "POST", data=None):
-        """Internal function to make a query and return data
-
-        Args:
-                endpoint (str): Endpoint of query
-                data (dict): Dictionary of parameters for the query
-
-        Returns:
-                data (dict): Request data
-
-        Raises:
-                RequestFailedError: API success returned with False - likely invalid endpoint
-        """
-        if data is None:
-            data = {}
-        request_data = requests.request(method, endpoint, json=data)
-        json_data = json.loads(request_data.content)
-        if request_data.status_code == 200:
-            return json_data
-        raise RequestFailedError
+        self._setup_requests(coalesce, instrumentation, retries, transport, cache)
 
     def get_table_row(self, scope: str, key: str):
         """Returns a table row using a scope and key
@@ -447,17 +1775,18 @@ class WaxTable:
             "lower_bound": key,
             "json": True,
         }
-        request_data = requests.post(self.endpoint, json=data)
-        json_data = json.loads(request_data.content)
-        if request_data.status_code == 200:
-            row = json_data["rows"]
-            if row:
-                return row[0]
-            return None
-        raise RequestFailedError
+        row = self._query(self.endpoint, data=data)["rows"]
+        if row:
+            return row[0]
+        return None
 
     def get_table_rows(
-        self, scope: str, search_params: dict, start_at: int = 1, limit: int = 1000
+        self,
+        scope: str,
+        search_params: dict,
+        start_at: int = 1,
+        limit: int = 1000,
+        paging: Optional["PageSizeController"] = None,
     ):
         """Returns a list of table rows matching search criteria. This can be a
         very slow process for large tables.
@@ -466,6 +1795,11 @@ class WaxTable:
             scope (str): Scope of table rows
             search_params (dict): Dict of column_name:value pairs
             start_at (int, optional): Row to start searching at. Defaults to 1.
+            limit (int, optional): rows per request without paging. Defaults to 1000.
+            paging (PageSizeController, optional): chooses the size of every request
+                from the latency, size and errors of the previous ones, in place of
+                limit. It shrinks the requests when the node returns fewer rows than
+                asked for. Defaults to None.
 
         Raises:
             RequestFailedError: When Request status code not 200
@@ -482,19 +1816,24 @@ class WaxTable:
         }
         hits = []
         next_key = start_at
+        json_data = {}
+
+        def query(size: int) -> Tuple[list, bool]:
+            json_data.update(self._query(self.endpoint, data=dict(data, limit=size)))
+            return json_data["rows"], json_data["more"]
+
         while True:
             data["lower_bound"] = next_key
-            request_data = requests.post(self.endpoint, json=data)
-            json_data = json.loads(request_data.content)
-            if request_data.status_code == 200:
-                rows = json_data["rows"]
-                for row in rows:
-                    if all(row[key] == val for key, val in search_params.items()):
-                        hits.append(row)
-                        continue
-                if json_data["more"]:
-                    next_key = json_data["next_key"]
+            if paging is None:
+                rows, more = query(limit)
+            else:
+                rows, more, _ = self._adaptive_page(paging, query)
+            for row in rows:
+                if all(row[key] == val for key, val in search_params.items()):
+                    hits.append(row)
                     continue
-                break
-            raise RequestFailedError
+            if more:
+                next_key = json_data["next_key"]
+                continue
+            break
         return hits
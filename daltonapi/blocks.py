@@ -0,0 +1,317 @@
+"""Blocks
+
+Reads a range of WAX blocks straight from a chain API node, for backfills
+that should not depend on an indexer. Blocks are fetched concurrently a
+window ahead of the one being processed, but delivered in order, and the
+last block processed is recorded in a checkpoint file, so an interrupted
+read resumes after it. AtomicAssets transfers map onto Transfer objects,
+which the provenance index and exports accept. Mints are only found on
+nodes whose blocks include inline actions: get_block on a standard node
+lists the signed actions alone, so logmint never appears there and mints
+are missed."""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from .api import Wax
+from .tools.atomic_classes import Transfer
+
+# AtomicAssets log actions of assets moved or created
+TRANSFER_ACTIONS = ("logtransfer", "logmint")
+
+# signed AtomicAssets action standing in for logtransfer, on nodes that leave
+# inline actions out
+FALLBACK_TRANSFER = "transfer"
+
+# logical transfer of each action name, used to filter transfers
+_LOGICAL_ACTIONS = {
+    "logtransfer": "logtransfer",
+    FALLBACK_TRANSFER: "logtransfer",
+    "logmint": "logmint",
+}
+
+# transfer ids of chain transfers are the block number times this, plus the
+# position of the action in the block
+BLOCK_STRIDE = 100000
+
+
+class Action(NamedTuple):
+    """An action of a transaction in a block"""
+
+    block_num: int
+    timestamp: int
+    txid: str
+    index: int
+    account: str
+    name: str
+    data: dict
+
+
+def block_time(timestamp: str) -> int:
+    """Returns a block timestamp, such as "2021-06-01T12:00:00.500", in milliseconds"""
+    when = datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc)
+    return int(round(when.timestamp() * 1000))
+
+
+def block_actions(block: dict) -> Iterator[Action]:
+    """Yields the actions of the executed transactions of a block, in order
+
+    Nodes list the actions each transaction was signed with. Inline actions,
+    such as the AtomicAssets log actions, are only included by nodes that
+    report them.
+
+    Args:
+        block (dict): block from Wax.get_block
+
+    Yields:
+        Action: each action
+    """
+    block_num = int(block["block_num"])
+    timestamp = block_time(block["timestamp"])
+    index = 0
+    for transaction in block.get("transactions", []):
+        trx = transaction.get("trx")
+        executed = transaction.get("status", "executed") == "executed"
+        # deferred transactions are listed by id only
+        if not executed or not isinstance(trx, dict):
+            continue
+        for action in trx["transaction"]["actions"]:
+            yield Action(
+                block_num,
+                timestamp,
+                trx["id"],
+                index,
+                action["account"],
+                action["name"],
+                action.get("data") or {},
+            )
+            index += 1
+
+
+def action_transfer(
+    action: Action, contract: str = "atomicassets"
+) -> Optional[Transfer]:
+    """Returns the Transfer made by an AtomicAssets action
+
+    Mints become transfers from an empty sender to the new owner. The
+    transfer action is mapped as well, for block_transfers to fall back on.
+
+    Args:
+        action (Action): action from block_actions
+        contract (str, optional): AtomicAssets contract. Defaults to "atomicassets".
+
+    Returns:
+        Transfer: the transfer, None for other actions
+    """
+    if action.account != contract or (
+        action.name not in TRANSFER_ACTIONS and action.name != FALLBACK_TRANSFER
+    ):
+        return None
+    data = action.data
+    if action.name == "logmint":
+        sender, recipient, memo = "", data["new_asset_owner"], ""
+        asset_ids = [data["asset_id"]]
+    else:
+        sender, recipient, memo = data["from"], data["to"], data.get("memo", "")
+        asset_ids = data["asset_ids"]
+    return Transfer(
+        {
+            "contract": contract,
+            "transfer_id": str(action.block_num * BLOCK_STRIDE + action.index),
+            "sender_name": sender,
+            "recipient_name": recipient,
+            "memo": memo,
+            "txid": action.txid,
+            "assets": [{"asset_id": str(asset_id)} for asset_id in asset_ids],
+            "collection_name": data.get("collection_name"),
+            "action": action.name,
+            "created_at_block": str(action.block_num),
+            "created_at_time": str(action.timestamp),
+        }
+    )
+
+
+def block_transfers(block: dict, contract: str = "atomicassets") -> Iterator[Transfer]:
+    """Yields the transfers and mints of a block, in order
+
+    They are read from the logtransfer and logmint actions. A transaction
+    without logtransfer, from a node that leaves inline actions out, falls
+    back on its transfer actions, so each transfer is counted once. Mints
+    can only be read from logmint, as mintasset does not carry the new
+    asset ID, so blocks from get_block on a standard node, which leaves
+    inline actions out, yield no mints.
+
+    Args:
+        block (dict): block from Wax.get_block
+        contract (str, optional): AtomicAssets contract. Defaults to "atomicassets".
+
+    Yields:
+        Transfer: each transfer or mint, with the action name in `_action`
+    """
+    for _, group in groupby(block_actions(block), key=lambda action: action.txid):
+        actions = [action for action in group if action.account == contract]
+        logged = any(action.name == "logtransfer" for action in actions)
+        for action in actions:
+            if action.name in TRANSFER_ACTIONS or (
+                action.name == FALLBACK_TRANSFER and not logged
+            ):
+                yield action_transfer(action, contract)
+
+
+class BlockReader:
+    """Streams a range of blocks in order, fetching a window of them concurrently"""
+
+    def __init__(
+        self,
+        wax: Wax,
+        window: int = 16,
+        contracts: Optional[Iterable[str]] = None,
+        actions: Optional[Iterable[str]] = None,
+        checkpoint: Optional[str] = None,
+        checkpoint_every: int = 100,
+    ):
+        """Creates a BlockReader
+
+        Args:
+            wax (Wax): client fetching the blocks
+            window (int, optional): blocks requested at the same time. Defaults to 16.
+            contracts (iterable, optional): accounts whose actions are kept, such as
+                ["atomicassets"]. Defaults to all.
+            actions (iterable, optional): action names kept, such as ["transfer"].
+                Defaults to all.
+            checkpoint (str, optional): file recording the last block processed.
+                Defaults to None.
+            checkpoint_every (int, optional): blocks between checkpoint writes.
+                Defaults to 100.
+        """
+        assert window > 0, "The window must hold at least one block"
+        self.wax = wax
+        self.window = window
+        self.contracts = set(contracts) if contracts is not None else None
+        self.actions = set(actions) if actions is not None else None
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        # last block whose actions were all delivered
+        self.last_block: Optional[int] = None
+        if checkpoint is not None and os.path.exists(checkpoint):
+            with open(checkpoint, encoding="utf-8") as file:
+                self.last_block = json.load(file)["last_block"]
+
+    def _save(self):
+        if self.checkpoint is None or self.last_block is None:
+            return
+        temp = f"{self.checkpoint}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump({"last_block": self.last_block}, file)
+        os.replace(temp, self.checkpoint)
+
+    def head(self, irreversible: bool = True) -> int:
+        """Returns the newest block number
+
+        Args:
+            irreversible (bool, optional): the newest block that can no longer be
+                forked out, rather than the head block. Defaults to True.
+        """
+        info = self.wax.get_info()
+        if irreversible:
+            return int(info["last_irreversible_block_num"])
+        return int(info["head_block_num"])
+
+    def blocks(self, start: int, end: Optional[int] = None) -> Iterator[dict]:
+        """Yields blocks in order, resuming after the checkpoint
+
+        A block counts as processed once the next one is requested, so the
+        checkpoint never passes a block still being worked on.
+
+        Args:
+            start (int): first block number
+            end (int, optional): last block number. Defaults to the last
+                irreversible block.
+
+        Yields:
+            dict: each block, as returned by Wax.get_block
+        """
+        if end is None:
+            end = self.head()
+        if self.last_block is not None:
+            start = max(start, self.last_block + 1)
+        numbers = iter(range(start, end + 1))
+        pending: deque = deque()
+        since_save = 0
+        with ThreadPoolExecutor(max_workers=self.window) as pool:
+            try:
+                for number in numbers:
+                    pending.append(pool.submit(self.wax.get_block, number))
+                    if len(pending) >= self.window:
+                        break
+                while pending:
+                    block = pending.popleft().result()
+                    number = next(numbers, None)
+                    if number is not None:
+                        pending.append(pool.submit(self.wax.get_block, number))
+                    yield block
+                    self.last_block = int(block["block_num"])
+                    since_save += 1
+                    if since_save >= self.checkpoint_every:
+                        self._save()
+                        since_save = 0
+            finally:
+                for future in pending:
+                    future.cancel()
+                self._save()
+
+    def _wanted(self, action: Action) -> bool:
+        return (self.contracts is None or action.account in self.contracts) and (
+            self.actions is None or action.name in self.actions
+        )
+
+    def read(self, start: int, end: Optional[int] = None) -> Iterator[Action]:
+        """Yields the actions of a block range that pass the filters, in order
+
+        Args:
+            start (int): first block number
+            end (int, optional): last block number. Defaults to the last
+                irreversible block.
+
+        Yields:
+            Action: each action kept
+        """
+        for block in self.blocks(start, end):
+            for action in block_actions(block):
+                if self._wanted(action):
+                    yield action
+
+    def transfers(
+        self, start: int, end: Optional[int] = None, contract: str = "atomicassets"
+    ) -> Iterator[Transfer]:
+        """Yields the AtomicAssets transfers and mints of a block range, in order
+
+        Mints are only yielded by nodes that include inline actions in their
+        blocks, see block_transfers. The actions filter applies to the logical
+        transfer, so "logtransfer" also keeps transfers read from the transfer
+        action, and "transfer" keeps those read from logtransfer.
+
+        Args:
+            start (int): first block number
+            end (int, optional): last block number. Defaults to the last
+                irreversible block.
+            contract (str, optional): AtomicAssets contract. Defaults to "atomicassets".
+
+        Yields:
+            Transfer: each transfer or mint, with the action name in `_action`
+        """
+        kinds = None
+        if self.actions is not None:
+            kinds = {_LOGICAL_ACTIONS.get(name, name) for name in self.actions}
+        for block in self.blocks(start, end):
+            for transfer in block_transfers(block, contract):
+                action = transfer._action  # pylint: disable=protected-access
+                if (self.contracts is None or contract in self.contracts) and (
+                    kinds is None or _LOGICAL_ACTIONS[action] in kinds
+                ):
+                    yield transfer
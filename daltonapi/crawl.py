@@ -0,0 +1,302 @@
+"""Crawl
+
+Resumable crawl of a whole collection. The work is cut into shards, such
+as the assets of one schema, which worker processes fetch and decode into
+part files. Finished parts are appended to one NDJSON output file, and a
+checkpoint records them, so a failed run resumes where it stopped. All
+workers share one request rate budget."""
+
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .api import Atom
+from .tools.atomic_classes import Asset, Template
+from .tools.transport import RequestsTransport, Transport
+
+KINDS = ("templates", "holders", "assets")
+
+
+class SharedRateLimit:
+    """Request rate budget shared by the processes of a crawl"""
+
+    def __init__(self, rate: float):
+        """Creates a SharedRateLimit
+
+        Args:
+            rate (float): requests per second across all processes
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = multiprocessing.Value("d", 0.0, lock=False)
+        self._lock = multiprocessing.Lock()
+
+    def wait(self):
+        """Blocks until the next request fits in the budget"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# state of a worker process, set up by _init_worker
+_WORKER: dict = {}
+
+
+def _init_worker(settings: dict, limit: SharedRateLimit, page_size: int):
+    """Creates the Atom of a worker process from the settings of the job's Atom"""
+    factory = settings["transport_factory"]
+    _WORKER["atom"] = Atom(
+        settings["endpoint"],
+        coalesce=False,
+        retries=settings["retries"],
+        transport=factory() if factory is not None else None,
+    )
+    _WORKER["limit"] = limit
+    _WORKER["page_size"] = page_size
+
+
+def _pages(endpoint: str, params: dict, keyset: str = "") -> Iterator[list]:
+    """Yields every page of a list query within the shared rate budget
+
+    With keyset, pages follow each other by that numeric id rather than by
+    page number, so deep pages cost no more than the first.
+    """
+    atom, limit, size = _WORKER["atom"], _WORKER["limit"], _WORKER["page_size"]
+    params = dict(params, limit=size, page=1)
+    if keyset:
+        params.update(sort=keyset, order="asc")
+    while True:
+        limit.wait()
+        rows = atom.query(endpoint, params=params)
+        yield rows
+        if len(rows) < size:
+            return
+        if keyset:
+            params["lower_bound"] = str(int(rows[-1][keyset]) + 1)
+        else:
+            params["page"] += 1
+
+
+def _crawl_shard(shard: dict, path: str) -> Tuple[str, int]:
+    """Fetches one shard into a part file, run in a worker process
+
+    Returns:
+        tuple: (shard key, rows written)
+    """
+    kind = shard["kind"]
+    if kind == "assets":
+        pages = _pages("assets", shard["params"], keyset="asset_id")
+    elif kind == "templates":
+        pages = _pages("templates", shard["params"])
+    else:
+        pages = _pages("accounts", shard["params"])
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for rows in pages:
+            for row in rows:
+                file.write(json.dumps({"kind": kind, "data": row}) + "\n")
+            count += len(rows)
+    return shard["key"], count
+
+
+class CrawlJob:
+    """Snapshot of the templates, holders and assets of a collection
+
+    Assets are sharded by schema or by template, templates and holders are
+    one shard each. Call run to crawl, and again after a failure to resume.
+    """
+
+    def __init__(
+        self,
+        atom: Atom,
+        collection: str,
+        output: str,
+        kinds=KINDS,
+        shard_by: str = "schema",
+        workers: int = 4,
+        rate: float = 10.0,
+        page_size: int = 100,
+        checkpoint: Optional[str] = None,
+        transport_factory: Optional[Callable[[], Transport]] = None,
+    ):
+        """Creates a CrawlJob
+
+        Workers build their own Atom with the endpoint and retries of `atom`,
+        and a transport from `transport_factory`. Its cache, catalog and
+        instrumentation stay in the main process.
+
+        Args:
+            atom (Atom): Atom used to plan the shards
+            collection (str): collection name
+            output (str): NDJSON file the results are written to
+            kinds (tuple, optional): what to crawl, of "templates", "holders" and
+                "assets". Defaults to all three.
+            shard_by (str, optional): "schema" or "template", how assets are sharded.
+                Assets without a template are missed when sharding by template.
+                Defaults to "schema".
+            workers (int, optional): worker processes. Defaults to 4.
+            rate (float, optional): requests per second across all workers, 0 for
+                no limit. Defaults to 10.
+            page_size (int, optional): rows per request. Defaults to 100.
+            checkpoint (str, optional): progress file. Defaults to output + ".checkpoint".
+            transport_factory (callable, optional): picklable callable returning the
+                transport of each worker. Defaults to a RequestsTransport with the
+                timeout of the atom's, which must then be a RequestsTransport.
+        """
+        assert shard_by in ("schema", "template"), "Shard by schema or template"
+        assert set(kinds) <= set(KINDS), f"Kinds can be {', '.join(KINDS)}"
+        if transport_factory is None:
+            assert isinstance(
+                atom.transport, RequestsTransport
+            ), "Workers can't copy this transport, pass a transport_factory"
+            transport_factory = partial(RequestsTransport, atom.transport.timeout)
+        self.atom = atom
+        self.collection = collection
+        self.output = output
+        self.kinds = tuple(kinds)
+        self.shard_by = shard_by
+        self.workers = workers
+        self.rate = rate
+        self.page_size = page_size
+        self.transport_factory = transport_factory
+        self.checkpoint = checkpoint or f"{output}.checkpoint"
+        self.parts = f"{output}.parts"
+
+    def _worker_settings(self) -> dict:
+        """Returns what workers build their Atom from"""
+        return {
+            "endpoint": self.atom.endpoint,
+            "retries": self.atom.retries,
+            "transport_factory": self.transport_factory,
+        }
+
+    def _job(self) -> dict:
+        """Returns what identifies the job in its checkpoint"""
+        return {
+            "collection": self.collection,
+            "kinds": list(self.kinds),
+            "shard_by": self.shard_by,
+        }
+
+    def _plan(self) -> List[dict]:
+        """Returns the shards of the job"""
+        shards = []
+        collection = {"collection_name": self.collection}
+        for kind in self.kinds:
+            if kind != "assets":
+                shards.append({"key": kind, "kind": kind, "params": collection})
+                continue
+            if self.shard_by == "schema":
+                fetch, field = self.atom.get_schemas, "schema_name"
+            else:
+                fetch, field = self.atom.get_templates, "template_id"
+            page = 1
+            while True:
+                items = fetch(self.collection, page=page, limit=self.page_size)
+                for item in items:
+                    params = dict(collection, **{field: item.get_id()})
+                    key = f"assets:{field}={item.get_id()}"
+                    shards.append({"key": key, "kind": kind, "params": params})
+                if len(items) < self.page_size:
+                    break
+                page += 1
+        return shards
+
+    def _load(self) -> dict:
+        """Returns the saved progress, or a new plan"""
+        if os.path.exists(self.checkpoint):
+            with open(self.checkpoint, encoding="utf-8") as file:
+                state = json.load(file)
+            if state["job"] != self._job():
+                raise ValueError(f"Checkpoint {self.checkpoint} belongs to another job")
+            return state
+        return {
+            "job": self._job(),
+            "shards": self._plan(),
+            "done": {},
+            "offset": 0,
+        }
+
+    def _save(self, state: dict):
+        temp = f"{self.checkpoint}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(temp, self.checkpoint)
+
+    def run(self) -> Dict[str, int]:
+        """Crawls the shards not finished yet
+
+        Raises:
+            Exception: The first error of a failed shard, after the other
+                shards finished and were recorded
+
+        Returns:
+            dict: rows written per shard
+        """
+        state = self._load()
+        self._save(state)
+        os.makedirs(self.parts, exist_ok=True)
+        mode = "r+b" if os.path.exists(self.output) else "wb"
+        error = None
+        with open(self.output, mode) as output:
+            # drop anything appended after the last recorded shard
+            output.truncate(state["offset"])
+            output.seek(state["offset"])
+            limit = SharedRateLimit(self.rate)
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._worker_settings(), limit, self.page_size),
+            ) as pool:
+                running = {}
+                for index, shard in enumerate(state["shards"]):
+                    if shard["key"] in state["done"]:
+                        continue
+                    path = os.path.join(self.parts, f"{index}.ndjson")
+                    running[pool.submit(_crawl_shard, shard, path)] = path
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = running.pop(future)
+                        try:
+                            key, count = future.result()
+                        except Exception as exc:  # pylint: disable=broad-except
+                            error = error or exc
+                            continue
+                        with open(path, "rb") as part:
+                            shutil.copyfileobj(part, output)
+                        output.flush()
+                        os.remove(path)
+                        state["done"][key] = count
+                        state["offset"] = output.tell()
+                        self._save(state)
+        if error is not None:
+            raise error
+        shutil.rmtree(self.parts, ignore_errors=True)
+        return state["done"]
+
+    @staticmethod
+    def read(path: str) -> Iterator[Tuple[str, object]]:
+        """Reads a crawl output file one row at a time
+
+        Args:
+            path (str): NDJSON file written by run
+
+        Yields:
+            tuple: (kind, Asset, Template or holder dict)
+        """
+        builders = {"assets": Asset, "templates": Template}
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                row = json.loads(line)
+                build = builders.get(row["kind"])
+                yield row["kind"], build(row["data"]) if build else row["data"]
@@ -0,0 +1,191 @@
+"""Export
+
+Time-window sharded export of transfers. A time range is split into
+windows queried concurrently with the `after`/`before` filters; windows
+holding more transfers than a few pages are split further, so offsets stay
+shallow. Transfers are emitted oldest first, and progress can be saved to a
+checkpoint file to resume an interrupted export."""
+
+import bisect
+import heapq
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .tools.atomic_classes import Transfer
+
+
+def _millis(value: Union[int, float, datetime]) -> int:
+    """Returns a timestamp in milliseconds"""
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+class TransferExport:
+    """Every transfer matching some filters within [start, end), oldest first
+
+    Iterate over the export to run it. The range is cut into windows of
+    `window` milliseconds, fetched by `workers` threads. A window still full
+    after `max_pages` pages keeps the transfers before the newest timestamp
+    read, and the rest of the window is split in two.
+    """
+
+    def __init__(
+        self,
+        atom,
+        start: Union[int, datetime],
+        end: Union[int, datetime],
+        collection="",
+        schema="",
+        template="",
+        sender="",
+        recipient="",
+        window: int = 86400000,
+        limit: int = 100,
+        max_pages: int = 10,
+        workers: int = 8,
+        checkpoint: Optional[str] = None,
+    ):
+        """Creates a TransferExport
+
+        Args:
+            atom (Atom): Atom used to query the AtomicAssets API
+            start (int, datetime): start of the range, in milliseconds
+            end (int, datetime): end of the range, excluded, in milliseconds
+            collection (str, Collection, optional): collection name. Defaults to "".
+            schema (str, Schema, optional): schema name. Defaults to "".
+            template (str, Template, optional): template ID. Defaults to "".
+            sender (str, optional): sender account. Defaults to "".
+            recipient (str, optional): recipient account. Defaults to "".
+            window (int, optional): initial window length in milliseconds.
+                Defaults to one day.
+            limit (int, optional): transfers per page. Defaults to 100.
+            max_pages (int, optional): pages read from a window before it is split.
+                Defaults to 10.
+            workers (int, optional): windows fetched at the same time. Defaults to 8.
+            checkpoint (str, optional): file recording how far the export got.
+                Defaults to None.
+
+        Raises:
+            ValueError: When the checkpoint belongs to a different export
+        """
+        self.atom = atom
+        self.start = _millis(start)
+        self.end = _millis(end)
+        assert self.start < self.end, "Start of the range must be before its end"
+        self.filters = atom.filter_params(
+            {
+                "collection_name": collection,
+                "schema_name": schema,
+                "template_id": template,
+                "sender": sender,
+                "recipient": recipient,
+            }
+        )
+        self.window = window
+        self.limit = limit
+        self.max_pages = max_pages
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.resume_from = self.start
+        self.requests = 0
+        self.windows = 0
+        self.splits = 0
+        self._lock = threading.Lock()
+        if checkpoint is not None and os.path.exists(checkpoint):
+            with open(checkpoint, encoding="utf-8") as file:
+                saved = json.load(file)
+            if saved["job"] != self._job():
+                raise ValueError(f"Checkpoint {checkpoint} belongs to another export")
+            self.resume_from = saved["done"]
+
+    def _job(self) -> dict:
+        """Returns what identifies the export in its checkpoint"""
+        return {"start": self.start, "end": self.end, "filters": self.filters}
+
+    def _save(self, done: int):
+        """Records that every transfer before done was emitted"""
+        if self.checkpoint is None:
+            return
+        temp = f"{self.checkpoint}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump({"job": self._job(), "done": done}, file)
+        os.replace(temp, self.checkpoint)
+
+    def _fetch(self, start: int, end: int) -> Tuple[int, List[Transfer], bool]:
+        """Fetches a window
+
+        Returns:
+            tuple: (end of the part covered, its transfers, whether the rest
+            of the window still has to be fetched)
+        """
+        params = dict(
+            self.filters,
+            after=start - 1,
+            before=end,
+            limit=self.limit,
+            order="asc",
+            sort="created",
+        )
+        transfers: List[Transfer] = []
+        page = 1
+        while True:
+            data = self.atom.query(
+                "transfers",
+                params=dict(params, page=page),
+                build=lambda rows: [Transfer(row) for row in rows],
+            )
+            with self._lock:
+                self.requests += 1
+            transfers.extend(data)
+            if len(data) < self.limit:
+                return end, transfers, False
+            if page >= self.max_pages:
+                newest = transfers[-1].timestamp
+                # a single millisecond can't be split, so it is paged through
+                if newest > start:
+                    kept = [t for t in transfers if t.timestamp < newest]
+                    return newest, kept, True
+            page += 1
+
+    def __iter__(self) -> Iterator[Transfer]:
+        """Runs the export, yielding transfers oldest first"""
+        queue: List[Tuple[int, int]] = []
+        for start in range(self.resume_from, self.end, self.window):
+            queue.append((start, min(start + self.window, self.end)))
+        # start of every window -> its end and transfers, None until fetched
+        results: Dict[int, Optional[Tuple[int, List[Transfer]]]] = {
+            start: None for start, _ in queue
+        }
+        order = [start for start, _ in queue]
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                while queue and len(running) < self.workers:
+                    start, end = heapq.heappop(queue)
+                    running[pool.submit(self._fetch, start, end)] = (start, end)
+                while order and results[order[0]] is not None:
+                    covered, transfers = results.pop(order.pop(0))
+                    yield from transfers
+                    self._save(covered)
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, end = running.pop(future)
+                    covered, transfers, more = future.result()
+                    results[start] = (covered, transfers)
+                    self.windows += 1
+                    if not more:
+                        continue
+                    self.splits += 1
+                    middle = covered + (end - covered) // 2
+                    parts = [(covered, middle), (middle, end)]
+                    for part in parts if middle > covered else [(covered, end)]:
+                        results[part[0]] = None
+                        bisect.insort(order, part[0])
+                        heapq.heappush(queue, part)
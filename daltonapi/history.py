@@ -0,0 +1,117 @@
+"""History
+
+Bulk transfer history for many assets. Asset ids are packed into few
+`transfers` queries, every page is fetched, and transfers that moved
+several assets are kept once in a merged, time-ordered timeline."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .tools.atomic_classes import Asset, Transfer
+from .tools.atomic_errors import AtomicIDError
+
+
+class AssetTimeline:
+    """Deduplicated transfers of many assets, oldest first"""
+
+    def __init__(self, transfers: Iterable[Transfer]):
+        """Creates an AssetTimeline
+
+        Args:
+            transfers (Iterable[Transfer]): transfers in any order, duplicates allowed
+        """
+        unique = {transfer.get_id(): transfer for transfer in transfers}
+        self.transfers: List[Transfer] = sorted(
+            unique.values(), key=lambda t: (t.timestamp, int(t.get_id()))
+        )
+        self.index: Dict[str, List[int]] = {}
+        for position, transfer in enumerate(self.transfers):
+            for nft in transfer._assets:  # pylint: disable=protected-access
+                self.index.setdefault(nft["asset_id"], []).append(position)
+
+    def history(self, asset: Union[Asset, str]) -> List[Transfer]:
+        """Returns the transfers of one asset, oldest first
+
+        Args:
+            asset (Union[Asset, str]): An Asset Object or a string with the asset id
+
+        Returns:
+            list[Transfer]: transfers that moved the asset
+        """
+        if isinstance(asset, Asset):
+            asset = asset.get_id()
+        return [self.transfers[position] for position in self.index.get(asset, [])]
+
+    def __len__(self):
+        return len(self.transfers)
+
+    def __iter__(self):
+        return iter(self.transfers)
+
+    def __repr__(self):
+        return f"AssetTimeline({len(self)} transfers, {len(self.index)} assets)"
+
+
+def fetch_asset_histories(
+    atom, items: Iterable[Union[Asset, str]], limit: int = 100, workers: int = 8
+) -> AssetTimeline:
+    """Fetches the full transfer history of many assets concurrently
+
+    Pages are requested in waves of `workers` pages, shared between the packed
+    queries still being paged, until each query returns a page with fewer than
+    `limit` transfers.
+
+    Args:
+        atom (Atom): Atom used to query the AtomicAssets API
+        items (Iterable[Union[Asset, str]]): Asset Objects or strings with asset ids
+        limit (int, optional): transfers per page. Defaults to 100.
+        workers (int, optional): pages fetched at the same time. Defaults to 8.
+
+    Raises:
+        AtomicIDError: Raised when an incorrect asset id is passed
+
+    Returns:
+        AssetTimeline: merged history of all the assets
+    """
+    asset_ids = []
+    for item in items:
+        if isinstance(item, Asset):
+            item = item.get_id()
+        if not isinstance(item, str) or not item.isnumeric():
+            raise AtomicIDError(item)
+        asset_ids.append(item)
+    if not asset_ids:
+        return AssetTimeline([])
+
+    fields = {"asset_id": asset_ids, "limit": limit, "order": "asc", "sort": "created"}
+    groups = atom.pack("transfers", fields)
+
+    def build(data: list) -> List[Transfer]:
+        return [Transfer(t) for t in data]
+
+    def fetch(job: Tuple[int, int]) -> List[Transfer]:
+        group, page = job
+        return atom.query(
+            "transfers", params=dict(groups[group], page=page), build=build
+        )
+
+    transfers: List[Transfer] = []
+    next_page = [1] * len(groups)
+    active = list(range(len(groups)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while active:
+            wave = max(1, workers // len(active))
+            jobs = [
+                (group, page)
+                for group in active
+                for page in range(next_page[group], next_page[group] + wave)
+            ]
+            finished = set()
+            for (group, _), data in zip(jobs, pool.map(fetch, jobs)):
+                transfers.extend(data)
+                if len(data) < limit:
+                    finished.add(group)
+            for group in active:
+                next_page[group] += wave
+            active = [group for group in active if group not in finished]
+    return AssetTimeline(transfers)
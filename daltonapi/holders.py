@@ -0,0 +1,182 @@
+"""Holders
+
+Full holder snapshots of a collection, schema or template. Holder pages are
+fetched concurrently and merged into a compact account:count mapping, which
+can be saved to disk and compared against other snapshots."""
+
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+from .tools.atomic_errors import NoFiltersError
+
+# query parameter of each filter
+_FIELDS = {
+    "collection": "collection_name",
+    "schema": "schema_name",
+    "template": "template_id",
+}
+
+
+class HolderDiff(NamedTuple):
+    """Differences between two holder snapshots"""
+
+    new: Dict[str, int]
+    exited: Dict[str, int]
+    changed: Dict[str, Tuple[int, int]]
+
+
+class HolderSnapshot:
+    """Number of matching assets held by every holder of an entity"""
+
+    def __init__(
+        self,
+        holders: Dict[str, int],
+        filters: Optional[dict] = None,
+        taken_at: Optional[float] = None,
+    ):
+        """Creates a HolderSnapshot
+
+        Args:
+            holders (dict): account:asset count pairs
+            filters (dict, optional): filters the snapshot was taken with. Defaults to None.
+            taken_at (float, optional): unix time of the snapshot. Defaults to now.
+        """
+        self.holders = holders
+        self.filters = filters or {}
+        self.taken_at = time.time() if taken_at is None else taken_at
+
+    @property
+    def total(self) -> int:
+        """Returns the number of assets held across all holders
+
+        Returns:
+            int: total assets
+        """
+        return sum(self.holders.values())
+
+    def diff(self, newer: "HolderSnapshot") -> HolderDiff:
+        """Compares this snapshot with a newer one
+
+        Args:
+            newer (HolderSnapshot): the later snapshot
+
+        Returns:
+            HolderDiff: new holders, exited holders and changed (old, new) counts
+        """
+        old, new = self.holders, newer.holders
+        return HolderDiff(
+            new={account: new[account] for account in new.keys() - old.keys()},
+            exited={account: old[account] for account in old.keys() - new.keys()},
+            changed={
+                account: (old[account], new[account])
+                for account in old.keys() & new.keys()
+                if old[account] != new[account]
+            },
+        )
+
+    def save(self, path: str):
+        """Saves the snapshot as a gzipped file of tab separated lines
+
+        Args:
+            path (str): file to write
+        """
+        header = {"filters": self.filters, "taken_at": self.taken_at}
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(json.dumps(header) + "\n")
+            file.writelines(f"{acc}\t{count}\n" for acc, count in self.holders.items())
+
+    @classmethod
+    def load(cls, path: str) -> "HolderSnapshot":
+        """Loads a snapshot written by save
+
+        Args:
+            path (str): file to read
+
+        Returns:
+            HolderSnapshot: the saved snapshot
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline())
+            holders = {}
+            for line in file:
+                account, count = line.rstrip("\n").split("\t")
+                holders[account] = int(count)
+        return cls(holders, header["filters"], header["taken_at"])
+
+    def __len__(self):
+        return len(self.holders)
+
+    def __contains__(self, account):
+        return account in self.holders
+
+    def __getitem__(self, account) -> int:
+        return self.holders[account]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.holders)
+
+    def __repr__(self):
+        return f"HolderSnapshot({len(self)} holders, {self.total} assets)"
+
+
+def take_holder_snapshot(
+    atom,
+    collection="",
+    schema="",
+    template="",
+    limit: int = 1000,
+    workers: int = 8,
+) -> HolderSnapshot:
+    """Fetches every holder page of an entity concurrently
+
+    Pages are requested in waves of `workers` pages, until a page comes back
+    with fewer than `limit` holders. Lists of values that need more than one
+    request are paged request by request, and the counts of an account held
+    under several of them are added together.
+
+    Args:
+        atom (Atom): Atom used to query the AtomicAssets API
+        collection (str, Collection, list, optional): collection name(s). Defaults to "".
+        schema (str, Schema, list, optional): schema name(s). Defaults to "".
+        template (str, Template, list, optional): template ID(s). Defaults to "".
+        limit (int, optional): holders per page. Defaults to 1000.
+        workers (int, optional): pages fetched at the same time. Defaults to 8.
+
+    Raises:
+        NoFiltersError: Raised when no filters are passed
+
+    Returns:
+        HolderSnapshot: account:count mapping of every holder
+    """
+    filters = {
+        "collection": atom.filter_value(collection),
+        "schema": atom.filter_value(schema),
+        "template": atom.filter_value(template),
+    }
+    filters = {key: val for key, val in filters.items() if val}
+    if not filters:
+        raise NoFiltersError
+    fields = {_FIELDS[key]: val for key, val in filters.items()}
+    fields.update(limit=limit, order="desc")
+
+    holders: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for params in atom.pack("accounts", fields):
+
+            def fetch(page: int, params=params) -> list:
+                return atom.query("accounts", params=dict(params, page=page))
+
+            page = 1
+            while True:
+                pages = list(pool.map(fetch, range(page, page + workers)))
+                for rows in pages:
+                    for row in rows:
+                        account = row["account"]
+                        holders[account] = holders.get(account, 0) + int(row["assets"])
+                if any(len(rows) < limit for rows in pages):
+                    break
+                page += workers
+    return HolderSnapshot(holders, filters)
@@ -0,0 +1,263 @@
+"""Media
+
+Concurrent download of the IPFS media of assets, templates and collections
+into a content-addressed disk cache. Files are named by CID, so a CID is
+fetched once however many assets use it, and the least recently used files
+are evicted once the cache grows past its size limit."""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import quote, unquote
+
+from .tools.atomic_classes import IPFS_GATEWAY
+from .tools.atomic_errors import MediaFetchError
+from .tools.flight import SingleFlight
+from .tools.transport import RequestsTransport, Transport
+
+
+def media_cids(items: Iterable, keys: Optional[List[str]] = None) -> List[str]:
+    """Returns the distinct IPFS hashes of some objects, in order of appearance
+
+    Args:
+        items (iterable): Asset, Template or Collection objects, or CID strings
+        keys (list, optional): media properties to include, such as ["img"].
+            Defaults to all.
+
+    Returns:
+        list: CIDs
+    """
+    cids: Dict[str, None] = {}
+    for item in items:
+        if isinstance(item, str):
+            cids[item] = None
+        else:
+            for key, cid in item.media_cids.items():
+                if keys is None or key in keys:
+                    cids[cid] = None
+    return list(cids)
+
+
+class MediaCache:
+    """Files named by CID in a directory, evicting the least recently used
+
+    The directory can be shared between runs, recency is kept in the
+    modification times of the files.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        """Creates a MediaCache, indexing files already in the directory
+
+        Args:
+            directory (str): cache directory, created if missing
+            max_bytes (int, optional): total size of the files kept. Defaults to 1 GiB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evicted = 0
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        for shard in os.scandir(directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, unquote(entry.name), stat.st_size))
+        for _, cid, size in sorted(found):
+            self._files[cid] = size
+            self.size += size
+
+    def path(self, cid: str) -> str:
+        """Returns where the file of a CID is kept"""
+        name = quote(cid, safe="")
+        return os.path.join(self.directory, name[-2:], name)
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, cid: str) -> Optional[str]:
+        """Returns the path of a cached file, marking it as recently used
+
+        Args:
+            cid (str): IPFS hash
+
+        Returns:
+            str: file path, None if not cached
+        """
+        with self._lock:
+            if cid not in self._files:
+                return None
+            self._files.move_to_end(cid)
+        path = self.path(cid)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.size -= self._files.pop(cid, 0)
+            return None
+        return path
+
+    def put(self, cid: str, content: bytes) -> str:
+        """Stores a file, then evicts the least recently used files over the limit
+
+        Args:
+            cid (str): IPFS hash
+            content (bytes): file content
+
+        Returns:
+            str: file path
+        """
+        path = self.path(cid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+        with os.fdopen(handle, "wb") as file:
+            file.write(content)
+        os.replace(temp, path)
+        with self._lock:
+            self.size += len(content) - self._files.pop(cid, 0)
+            self._files[cid] = len(content)
+            evict = []
+            while self.size > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self.size -= size
+                evict.append(old)
+            self.evicted += len(evict)
+        for old in evict:
+            try:
+                os.remove(self.path(old))
+            except FileNotFoundError:
+                pass
+        return path
+
+    def clear(self):
+        """Removes every cached file"""
+        with self._lock:
+            cids, self._files = list(self._files), OrderedDict()
+            self.size = 0
+        for cid in cids:
+            try:
+                os.remove(self.path(cid))
+            except FileNotFoundError:
+                pass
+
+
+class MediaResult(NamedTuple):
+    """Outcome of MediaFetcher.fetch_all"""
+
+    paths: Dict[str, str]
+    errors: Dict[str, Exception]
+
+
+class MediaFetcher:
+    """Downloads media into a MediaCache through a list of IPFS gateways
+
+    Each CID is tried on the gateways in order until one returns it.
+    Concurrent fetches of the same CID share one download.
+    """
+
+    def __init__(
+        self,
+        cache: MediaCache,
+        gateways: Optional[List[str]] = None,
+        workers: int = 8,
+        max_file_bytes: Optional[int] = None,
+        transport: Optional[Transport] = None,
+    ):
+        """Creates a MediaFetcher
+
+        Args:
+            cache (MediaCache): where files are kept
+            gateways (list, optional): gateway URLs ending with "/ipfs/", such as
+                atom.gateways. Defaults to ipfs.io.
+            workers (int, optional): downloads run at the same time by fetch_all.
+                Defaults to 8.
+            max_file_bytes (int, optional): larger files are not cached.
+                Defaults to no limit.
+            transport (Transport, optional): Sends the requests. Defaults to a
+                RequestsTransport.
+        """
+        self.cache = cache
+        self.gateways = list(gateways) if gateways else [IPFS_GATEWAY]
+        self.workers = workers
+        self.max_file_bytes = max_file_bytes
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.downloads = 0
+        self.hits = 0
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    def fetch(self, cid: str) -> str:
+        """Returns the path of a file, downloading it unless cached
+
+        Args:
+            cid (str): IPFS hash
+
+        Raises:
+            MediaFetchError: When no gateway returned the file, or it is too large
+
+        Returns:
+            str: file path
+        """
+        path = self.cache.get(cid)
+        if path is not None:
+            with self._lock:
+                self.hits += 1
+            return path
+        return self._flight.do(cid, lambda: self._download(cid))
+
+    def _download(self, cid: str) -> str:
+        # another thread may have finished the download just before
+        path = self.cache.get(cid)
+        if path is not None:
+            return path
+        reason = "no gateway"
+        for gateway in self.gateways:
+            try:
+                response = self.transport.request("GET", f"{gateway}{cid}")
+            except self.transport.retry_errors as exc:
+                reason = f"{gateway} failed with {exc!r}"
+                continue
+            if response.status_code != 200:
+                reason = f"{gateway} returned status {response.status_code}"
+                continue
+            if self.max_file_bytes and len(response.content) > self.max_file_bytes:
+                raise MediaFetchError(cid, f"larger than {self.max_file_bytes} bytes")
+            with self._lock:
+                self.downloads += 1
+            return self.cache.put(cid, response.content)
+        raise MediaFetchError(cid, reason)
+
+    def fetch_all(
+        self, items: Iterable, keys: Optional[List[str]] = None
+    ) -> MediaResult:
+        """Fetches the media of many objects concurrently, each CID once
+
+        Args:
+            items (iterable): Asset, Template or Collection objects, or CID strings
+            keys (list, optional): media properties to fetch, such as ["img"].
+                Defaults to all.
+
+        Returns:
+            MediaResult: CID:path pairs of the files fetched, and CID:error pairs
+            of the others
+        """
+        paths, errors = {}, {}
+        cids = media_cids(items, keys)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {cid: pool.submit(self.fetch, cid) for cid in cids}
+            for cid, future in futures.items():
+                try:
+                    paths[cid] = future.result()
+                except (MediaFetchError, *self.transport.retry_errors) as exc:
+                    errors[cid] = exc
+        return MediaResult(paths, errors)
@@ -0,0 +1,242 @@
+"""Monitor
+
+Scheduled refresh of the balances and CPU, NET and RAM usage of a fixed
+set of WAX accounts. Every refresh fetches the accounts concurrently,
+flags the accounts past their thresholds, and stores the values in one
+array per field rather than one object per account."""
+
+import math
+import time
+from array import array
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from .tools.wax_classes import Account
+
+# columns of a ResourceReport
+FIELDS = (
+    "balance",
+    "cpu_staked",
+    "net_staked",
+    "cpu_used",
+    "cpu_max",
+    "net_used",
+    "net_max",
+    "ram_used",
+    "ram_quota",
+)
+
+# used and limit columns of the resources with usage thresholds
+USAGE = {
+    "cpu": ("cpu_used", "cpu_max"),
+    "net": ("net_used", "net_max"),
+    "ram": ("ram_used", "ram_quota"),
+}
+
+
+def _values(account: Account) -> tuple:
+    """Returns the FIELDS values of an account"""
+    staked = account.staked_balance
+    return (
+        account.balance,
+        staked["cpu"],
+        staked["net"],
+        *account.cpu,
+        *account.net,
+        *account.ram,
+    )
+
+
+class Breach(NamedTuple):
+    """An account past one of its thresholds"""
+
+    account: str
+    resource: str
+    value: float
+    threshold: float
+    new: bool
+
+
+class ResourceReport:
+    """Resources of the monitored accounts at one refresh, one array per field
+
+    Values of accounts the API failed to return are NaN.
+    """
+
+    def __init__(
+        self,
+        taken_at: float,
+        accounts: List[str],
+        columns: Dict[str, array],
+        missing: List[str],
+        breaches: List[Breach],
+    ):
+        """Creates a ResourceReport
+
+        Args:
+            taken_at (float): time of the refresh, in seconds
+            accounts (list): account names, in the order of the columns
+            columns (dict): field:array pairs, for each of FIELDS
+            missing (list): accounts the API failed to return
+            breaches (list): thresholds breached
+        """
+        self.taken_at = taken_at
+        self.accounts = accounts
+        self.columns = columns
+        self.missing = missing
+        self.breaches = breaches
+        self._positions = {name: index for index, name in enumerate(accounts)}
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def column(self, field: str) -> array:
+        """Returns the values of one of FIELDS, such as balance or ram_used"""
+        return self.columns[field]
+
+    def usage(self, resource: str) -> array:
+        """Returns the used share of "cpu", "net" or "ram" of every account
+
+        Args:
+            resource (str): "cpu", "net" or "ram"
+
+        Returns:
+            array: ratios from 0, 0 for unlimited resources
+        """
+        used, limit = (self.columns[field] for field in USAGE[resource])
+        return array("d", (u / m if m > 0 else 0.0 for u, m in zip(used, limit)))
+
+    def row(self, account: str) -> Dict[str, float]:
+        """Returns the values of one account
+
+        Args:
+            account (str): account name
+
+        Returns:
+            dict: field:value pairs
+        """
+        index = self._positions[account]
+        return {field: values[index] for field, values in self.columns.items()}
+
+    def __repr__(self):
+        return (
+            f"ResourceReport({len(self)} accounts, {len(self.missing)} missing, "
+            f"{len(self.breaches)} breaches)"
+        )
+
+
+class ResourceMonitor:
+    """Refreshes a fixed set of accounts every interval, flagging threshold breaches
+
+    Thresholds are given per resource. "cpu", "net" and "ram" are breached
+    when the used share reaches them, "balance" when the liquid balance
+    falls below it.
+    """
+
+    def __init__(
+        self,
+        wax,
+        accounts: List[str],
+        interval: float = 60.0,
+        thresholds: Optional[Dict[str, float]] = None,
+        workers: int = 8,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Creates a ResourceMonitor
+
+        Args:
+            wax (Wax): Wax client used to fetch the accounts. A cache with a ttl
+                longer than the interval would return stale accounts.
+            accounts (list): account names
+            interval (float, optional): seconds between refreshes. Defaults to 60.
+            thresholds (dict, optional): resource:threshold pairs, of "cpu", "net",
+                "ram" and "balance". Defaults to 0.9 for cpu, net and ram.
+            workers (int, optional): requests made at the same time. Defaults to 8.
+            clock (callable, optional): time source, in seconds. Defaults to time.time.
+            sleep (callable, optional): waits a number of seconds of the clock.
+                Defaults to time.sleep.
+        """
+        if thresholds is None:
+            thresholds = {"cpu": 0.9, "net": 0.9, "ram": 0.9}
+        for resource in thresholds:
+            assert resource in (*USAGE, "balance"), f"No threshold for {resource}"
+        self.wax = wax
+        self.accounts = list(dict.fromkeys(accounts))
+        self.interval = interval
+        self.thresholds = dict(thresholds)
+        self.workers = workers
+        self.refreshes = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._breached = set()
+        self._callbacks: List[Callable[[Breach], None]] = []
+
+    def add_callback(self, callback: Callable[[Breach], None]):
+        """Registers a function called with every breach of every refresh
+
+        Args:
+            callback (callable): function taking a Breach
+        """
+        self._callbacks.append(callback)
+
+    def refresh(self) -> ResourceReport:
+        """Fetches every account once
+
+        Returns:
+            ResourceReport: the values and breaches of this refresh
+        """
+        taken_at = self._clock()
+        fetched = self.wax.get_accounts(self.accounts, workers=self.workers)
+        columns = {field: array("d") for field in FIELDS}
+        missing = []
+        for name in self.accounts:
+            account = fetched.get(name)
+            if account is None:
+                missing.append(name)
+                values = (math.nan,) * len(FIELDS)
+            else:
+                values = _values(account)
+            for field, value in zip(FIELDS, values):
+                columns[field].append(value)
+        report = ResourceReport(taken_at, self.accounts, columns, missing, [])
+        breached = set()
+        for resource, threshold in self.thresholds.items():
+            if resource == "balance":
+                values = columns["balance"]
+                past = [value < threshold for value in values]
+            else:
+                values = report.usage(resource)
+                past = [value >= threshold for value in values]
+            for name, value, over in zip(self.accounts, values, past):
+                if over:
+                    key = (name, resource)
+                    breached.add(key)
+                    new = key not in self._breached
+                    report.breaches.append(
+                        Breach(name, resource, value, threshold, new)
+                    )
+        self._breached = breached
+        self.refreshes += 1
+        for breach in report.breaches:
+            for callback in self._callbacks:
+                callback(breach)
+        return report
+
+    def reports(self, max_refreshes: Optional[int] = None) -> Iterator[ResourceReport]:
+        """Refreshes on a fixed schedule, yielding every report
+
+        Args:
+            max_refreshes (int, optional): stop after this many refreshes.
+                Defaults to None.
+
+        Yields:
+            ResourceReport: the report of each refresh
+        """
+        count = 0
+        next_due = self._clock()
+        while max_refreshes is None or count < max_refreshes:
+            yield self.refresh()
+            count += 1
+            next_due += self.interval
+            if max_refreshes is None or count < max_refreshes:
+                self._sleep(max(0.0, next_due - self._clock()))
@@ -0,0 +1,250 @@
+"""Pricing
+
+Incremental aggregation of AtomicMarket sales. Each sale added updates the
+rolling floor price and volume, and the OHLC bars, of its templates or
+collection, so prices stay current without recomputing from every sale.
+The rolling window ends at the latest sale seen, so the figures of a
+backfill match those of a live feed."""
+
+import heapq
+from bisect import insort
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .tools.market_classes import Sale
+
+
+class Bar:
+    """Open, high, low and close price and volume of one interval"""
+
+    __slots__ = ("start", "open", "high", "low", "close", "volume", "sales", "_span")
+
+    def __init__(self, start: int, time: int, price: float):
+        """Creates a Bar from its first sale
+
+        Args:
+            start (int): start of the interval, to millisecond precision
+            time (int): time of the sale, to millisecond precision
+            price (float): price of the sale
+        """
+        self.start = start
+        self.open = self.high = self.low = self.close = self.volume = price
+        self.sales = 1
+        self._span = [time, time]
+
+    def add(self, time: int, price: float):
+        """Adds a sale, which may be older than the ones already added"""
+        if time < self._span[0]:
+            self._span[0], self.open = time, price
+        if time >= self._span[1]:
+            self._span[1], self.close = time, price
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.volume += price
+        self.sales += 1
+
+    def __repr__(self):
+        return (
+            f"Bar({self.start}, open={self.open}, high={self.high}, low={self.low}, "
+            f"close={self.close}, volume={self.volume}, sales={self.sales})"
+        )
+
+
+class _Series:
+    """Sales of one template or collection"""
+
+    def __init__(self):
+        # (time, price) in the window, oldest first
+        self.window: deque = deque()
+        # (price, time) in the window, cheapest first, with expired ones left in
+        self.prices: List[Tuple[float, int]] = []
+        self.volume = 0.0
+        self.last: Optional[float] = None
+        self.last_time = -1
+        self.bars: Dict[int, Bar] = {}
+
+    def expire(self, cutoff: int):
+        while self.window and self.window[0][0] < cutoff:
+            self.volume -= self.window.popleft()[1]
+        while self.prices and self.prices[0][1] < cutoff:
+            heapq.heappop(self.prices)
+        if not self.window:
+            self.volume = 0.0
+
+
+class SalesAggregator:
+    """Keeps the rolling floor price, volume and OHLC bars of completed sales
+
+    Sales are keyed by template, splitting the price of bundles evenly
+    between their assets, or by collection. Sales not completed, priced in
+    another token, or added before are skipped. Sales are remembered for
+    the longer of the window and the bars kept, and sales older than that
+    are skipped too, so memory stays bounded on an endless feed.
+    """
+
+    def __init__(
+        self,
+        by: str = "template",
+        window: float = 86400.0,
+        bar_seconds: float = 3600.0,
+        max_bars: int = 168,
+        token: str = "WAX",
+    ):
+        """Creates a SalesAggregator
+
+        Args:
+            by (str, optional): "template" or "collection". Defaults to "template".
+            window (float, optional): seconds of sales the floor and volume cover.
+                Defaults to 86400.
+            bar_seconds (float, optional): interval of each bar. Defaults to 3600.
+            max_bars (int, optional): bars kept per key, the oldest are dropped,
+                0 to keep every bar and sale. Defaults to 168.
+            token (str, optional): token symbol of the sales counted. Defaults to "WAX".
+        """
+        assert by in ("template", "collection"), f"Sales can't be keyed by {by}"
+        self.by = by
+        self.window = window
+        self.bar_seconds = bar_seconds
+        self.max_bars = max_bars
+        self.token = token
+        # time of the latest sale added, to millisecond precision
+        self.now = 0
+        self._series: Dict[str, _Series] = {}
+        # ids of the sales remembered, and a heap of their (time, id), oldest first
+        self._seen: Set[str] = set()
+        self._seen_times: List[Tuple[int, str]] = []
+
+    def _horizon(self) -> Optional[float]:
+        """Returns the time before which sales are forgotten, None to keep all"""
+        if not self.max_bars:
+            return None
+        keep = max(self.window, self.bar_seconds * self.max_bars) * 1000
+        return self.now - keep
+
+    def _forget(self, horizon: float):
+        while self._seen_times and self._seen_times[0][0] < horizon:
+            self._seen.discard(heapq.heappop(self._seen_times)[1])
+
+    def _shares(self, sale: Sale) -> List[Tuple[str, float]]:
+        """Returns the (key, price) pairs a sale counts towards"""
+        if self.by == "collection":
+            return [(sale.collection_name, sale.price)]
+        templates = sale.template_ids
+        share = sale.price / len(templates)
+        return [(template, share) for template in templates if template is not None]
+
+    def add(self, sale: Sale) -> bool:
+        """Adds a sale
+
+        Args:
+            sale (Sale): sale from Market.get_sales or Market.iter_sales
+
+        Returns:
+            bool: whether the sale was counted
+        """
+        time = sale.completed_at
+        if time is None or sale.token != self.token or sale.key in self._seen:
+            return False
+        self.now = max(self.now, time)
+        horizon = self._horizon()
+        if horizon is not None:
+            if time < horizon:
+                return False
+            self._forget(horizon)
+        self._seen.add(sale.key)
+        heapq.heappush(self._seen_times, (time, sale.key))
+        cutoff = self.now - self.window * 1000
+        bar_ms = int(self.bar_seconds * 1000)
+        start = time - time % bar_ms
+        for key, price in self._shares(sale):
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            if time >= series.last_time:
+                series.last, series.last_time = price, time
+            if time >= cutoff:
+                if series.window and time < series.window[-1][0]:
+                    insort(series.window, (time, price))
+                else:
+                    series.window.append((time, price))
+                heapq.heappush(series.prices, (price, time))
+                series.volume += price
+            series.expire(cutoff)
+            bar = series.bars.get(start)
+            if bar is None:
+                series.bars[start] = Bar(start, time, price)
+                while self.max_bars and len(series.bars) > self.max_bars:
+                    del series.bars[min(series.bars)]
+            else:
+                bar.add(time, price)
+        return True
+
+    def update(self, sales: Iterable[Sale]) -> int:
+        """Adds many sales, such as the sales yielded by Market.iter_sales
+
+        Returns:
+            int: the number of sales counted
+        """
+        return sum(self.add(sale) for sale in sales)
+
+    def keys(self) -> List[str]:
+        """Returns the templates or collections with sales"""
+        return list(self._series)
+
+    def _current(self, key: str) -> Optional[_Series]:
+        series = self._series.get(key)
+        if series is not None:
+            series.expire(self.now - self.window * 1000)
+        return series
+
+    def floor(self, key: str) -> Optional[float]:
+        """Returns the lowest price in the window
+
+        Args:
+            key (str): template ID or collection name
+
+        Returns:
+            float: price, None without sales in the window
+        """
+        series = self._current(key)
+        if series is None or not series.prices:
+            return None
+        return series.prices[0][0]
+
+    def volume(self, key: str) -> float:
+        """Returns the total price of the sales in the window"""
+        series = self._current(key)
+        return series.volume if series is not None else 0.0
+
+    def sales(self, key: str) -> int:
+        """Returns the number of sales in the window"""
+        series = self._current(key)
+        return len(series.window) if series is not None else 0
+
+    def last(self, key: str) -> Optional[float]:
+        """Returns the price of the latest sale, None without sales"""
+        series = self._series.get(key)
+        return series.last if series is not None else None
+
+    def bars(self, key: str) -> List[Bar]:
+        """Returns the bars kept, oldest first"""
+        series = self._series.get(key)
+        if series is None:
+            return []
+        return [series.bars[start] for start in sorted(series.bars)]
+
+    def summary(self) -> Dict[str, dict]:
+        """Returns the floor, volume, sales and last price of every key
+
+        Returns:
+            dict: key:figures pairs
+        """
+        return {
+            key: {
+                "floor": self.floor(key),
+                "volume": self.volume(key),
+                "sales": self.sales(key),
+                "last": self.last(key),
+            }
+            for key in self._series
+        }
@@ -0,0 +1,277 @@
+"""Provenance
+
+Point-in-time ownership index built from transfer data"""
+
+import bisect
+import gzip
+import json
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .tools.atomic_classes import Transfer
+
+# (created_at_time, transfer_id, sender, recipient)
+_Move = Tuple[int, int, str, str]
+
+# events of an account between stored copies of its holdings
+_CHECKPOINT_EVERY = 128
+
+
+class _Ledger(NamedTuple):
+    """Holdings of one account over time, as sorted events and checkpoints"""
+
+    # (time, transfer_id) of each event, for bisect
+    keys: List[Tuple[int, int]]
+    # (time, transfer_id, asset_id, gained) events, oldest first
+    events: List[Tuple[int, int, str, bool]]
+    # holdings before every _CHECKPOINT_EVERY-th event
+    checkpoints: List[FrozenSet[str]]
+
+
+class ProvenanceIndex:
+    """Answers who owned an asset, or what an account held, at a point in time
+
+    Times are AtomicAssets timestamps in milliseconds. Ownership only covers
+    what the indexed transfers show, so an asset is unknown before its first
+    indexed transfer unless that transfer names a sender.
+    """
+
+    def __init__(self, transfers: Iterable[Transfer] = ()):
+        """Creates a ProvenanceIndex
+
+        Args:
+            transfers (Iterable[Transfer], optional): transfers to index. Defaults to ().
+        """
+        self._seen: Set[str] = set()
+        # per asset: sorted moves, plus their sort keys for bisect
+        self._moves: Dict[str, List[_Move]] = {}
+        self._move_keys: Dict[str, List[Tuple[int, int]]] = {}
+        # per account: assets it sent or received
+        self._assets_of: Dict[str, Set[str]] = {}
+        # per account: holdings over time, rebuilt after its assets move
+        self._ledgers: Dict[str, _Ledger] = {}
+        self.extend(transfers)
+
+    def add(self, transfer: Transfer) -> bool:
+        """Adds one transfer, in any order relative to those already indexed
+
+        Args:
+            transfer (Transfer): transfer to index
+
+        Returns:
+            bool: False when the transfer was already indexed
+        """
+        return self.extend([transfer]) == 1
+
+    def extend(self, transfers: Iterable[Transfer]) -> int:
+        """Adds many transfers, in any order relative to those already indexed
+
+        Args:
+            transfers (Iterable[Transfer]): transfers to index
+
+        Returns:
+            int: number of transfers that were new
+        """
+        rows = []
+        for transfer in transfers:
+            transfer_id = transfer.get_id()
+            if transfer_id in self._seen:
+                continue
+            self._seen.add(transfer_id)
+            nfts = transfer._assets  # pylint: disable=protected-access
+            rows.append(
+                (
+                    int(transfer_id),
+                    transfer.timestamp,
+                    transfer.sender,
+                    transfer.recipient,
+                    [nft["asset_id"] for nft in nfts],
+                )
+            )
+        self._insert_rows(rows)
+        return len(rows)
+
+    def _insert_rows(self, rows: List[tuple]):
+        """Inserts (transfer_id, time, sender, recipient, asset_ids) rows
+
+        A single row is placed with bisect, larger batches are appended and
+        the touched arrays sorted once.
+        """
+        touched_assets = set()
+        if len(rows) == 1:
+            transfer_id, when, sender, recipient, assets = rows[0]
+            for asset_id in assets:
+                keys = self._move_keys.setdefault(asset_id, [])
+                position = bisect.bisect_right(keys, (when, transfer_id))
+                keys.insert(position, (when, transfer_id))
+                self._moves.setdefault(asset_id, []).insert(
+                    position, (when, transfer_id, sender, recipient)
+                )
+                touched_assets.add(asset_id)
+        else:
+            for transfer_id, when, sender, recipient, assets in rows:
+                for asset_id in assets:
+                    self._moves.setdefault(asset_id, []).append(
+                        (when, transfer_id, sender, recipient)
+                    )
+                    touched_assets.add(asset_id)
+            for asset_id in touched_assets:
+                self._moves[asset_id].sort()
+                self._move_keys[asset_id] = [move[:2] for move in self._moves[asset_id]]
+        for _, _, sender, recipient, assets in rows:
+            for account in (sender, recipient):
+                self._assets_of.setdefault(account, set()).update(assets)
+        # a new move can change who held the asset between the moves around it
+        for asset_id in touched_assets:
+            for _, _, sender, recipient in self._moves[asset_id]:
+                self._ledgers.pop(sender, None)
+                self._ledgers.pop(recipient, None)
+
+    def owner_at(self, asset_id: str, when: int) -> Optional[str]:
+        """Returns the owner of an asset at a point in time
+
+        Args:
+            asset_id (str): asset id
+            when (int): timestamp in milliseconds
+
+        Returns:
+            str: account name, or None when unknown
+        """
+        keys = self._move_keys.get(asset_id)
+        if not keys:
+            return None
+        # transfers at exactly `when` have already happened
+        position = bisect.bisect_right(keys, (when, float("inf")))
+        if position == 0:
+            return self._moves[asset_id][0][2] or None
+        return self._moves[asset_id][position - 1][3]
+
+    def holdings_at(self, account: str, when: int) -> Set[str]:
+        """Returns the assets an account held at a point in time
+
+        Holdings are replayed from the nearest stored copy before `when`, so
+        the cost does not grow with the length of the account's history.
+
+        Args:
+            account (str): account name
+            when (int): timestamp in milliseconds
+
+        Returns:
+            set[str]: asset ids
+        """
+        ledger = self._ledger(account)
+        end = bisect.bisect_right(ledger.keys, (when, float("inf")))
+        start = end - end % _CHECKPOINT_EVERY
+        holdings = set(ledger.checkpoints[start // _CHECKPOINT_EVERY])
+        for _, _, asset_id, gained in ledger.events[start:end]:
+            if gained:
+                holdings.add(asset_id)
+            else:
+                holdings.discard(asset_id)
+        return holdings
+
+    def _ledger(self, account: str) -> _Ledger:
+        """Returns the ledger of an account, building it if its assets moved
+
+        An asset leaves whoever owned it before each move, which is the
+        sender of its first indexed move before any receipt, so holdings
+        agree with owner_at even where the indexed moves have gaps.
+        """
+        ledger = self._ledgers.get(account)
+        if ledger is not None:
+            return ledger
+        held: Set[str] = set()
+        events = []
+        for asset_id in self._assets_of.get(account, ()):
+            moves = self._moves[asset_id]
+            owner = moves[0][2]
+            if owner == account:
+                held.add(asset_id)
+            for when, transfer_id, _, recipient in moves:
+                if owner == account:
+                    events.append((when, transfer_id, asset_id, False))
+                if recipient == account:
+                    events.append((when, transfer_id, asset_id, True))
+                owner = recipient
+        events.sort()
+        checkpoints = []
+        for position, (_, _, asset_id, gained) in enumerate(events):
+            if position % _CHECKPOINT_EVERY == 0:
+                checkpoints.append(frozenset(held))
+            if gained:
+                held.add(asset_id)
+            else:
+                held.discard(asset_id)
+        if len(events) % _CHECKPOINT_EVERY == 0:
+            checkpoints.append(frozenset(held))
+        ledger = _Ledger([event[:2] for event in events], events, checkpoints)
+        self._ledgers[account] = ledger
+        return ledger
+
+    def history(self, asset_id: str) -> List[_Move]:
+        """Returns the indexed moves of an asset, oldest first
+
+        Args:
+            asset_id (str): asset id
+
+        Returns:
+            list[tuple]: (time, transfer id, sender, recipient) tuples
+        """
+        return list(self._moves.get(asset_id, []))
+
+    def to_dict(self) -> dict:
+        """Returns the index as compact rows, one per transfer
+
+        Returns:
+            dict: serializable form of the index
+        """
+        rows: Dict[int, list] = {}
+        for asset_id, moves in self._moves.items():
+            for when, transfer_id, sender, recipient in moves:
+                row = rows.setdefault(
+                    transfer_id, [transfer_id, when, sender, recipient, []]
+                )
+                row[4].append(asset_id)
+        return {"version": 1, "transfers": list(rows.values())}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProvenanceIndex":
+        """Rebuilds an index from to_dict output
+
+        Args:
+            data (dict): serialized index
+
+        Returns:
+            ProvenanceIndex: the rebuilt index
+        """
+        index = cls()
+        index._seen.update(str(row[0]) for row in data["transfers"])
+        index._insert_rows([tuple(row) for row in data["transfers"]])
+        return index
+
+    def save(self, path: str):
+        """Saves the index as gzipped JSON
+
+        Args:
+            path (str): file to write
+        """
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "ProvenanceIndex":
+        """Loads an index written by save
+
+        Args:
+            path (str): file to read
+
+        Returns:
+            ProvenanceIndex: the saved index
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __repr__(self):
+        return f"ProvenanceIndex({len(self)} transfers, {len(self._moves)} assets)"
@@ -0,0 +1,340 @@
+"""Stream
+
+Client for the AtomicAssets live stream of transfers, assets and offers,
+which replaces polling the list endpoints. Events arrive over Socket.IO on
+Engine.IO long-polling, using only the standard library, and are decoded
+into Transfer, Asset and Offer objects. After a dropped connection the
+stream reconnects, and fetches the new transfers, assets and offers it
+missed from the REST endpoints before resuming live."""
+
+import json
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+from urllib.request import Request, urlopen
+
+from .api import Atom
+from .tools.atomic_classes import Asset, Offer, Transfer
+from .tools.atomic_errors import RequestFailedError, StreamError
+
+# Socket.IO namespace of each stream
+NAMESPACES = {
+    "transfers": "/atomicassets/v1/transfers",
+    "assets": "/atomicassets/v1/assets",
+    "offers": "/atomicassets/v1/offers",
+}
+
+# model class and payload field of the events decoded into objects
+EVENTS = {
+    "new_transfer": (Transfer, "transfer"),
+    "new_asset": (Asset, "asset"),
+    "update_asset": (Asset, "asset"),
+    "new_offer": (Offer, "offer"),
+    "update_offer": (Offer, "offer"),
+}
+
+# (endpoint, sort, event) of the REST query filling gaps in each stream
+BACKFILL = {
+    "transfers": ("transfers", "created", "new_transfer"),
+    "assets": ("assets", "asset_id", "new_asset"),
+    "offers": ("offers", "created", "new_offer"),
+}
+
+_RECORD_SEPARATOR = "\x1e"
+
+_STREAMS = {namespace: stream for stream, namespace in NAMESPACES.items()}
+
+
+class StreamEvent(NamedTuple):
+    """An event of the live stream"""
+
+    stream: str
+    name: str
+    item: Optional[object]
+    data: dict
+    backfilled: bool = False
+
+
+class _Polling:
+    """Engine.IO version 4 session over HTTP long-polling"""
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+        self.sid: Optional[str] = None
+        self.ping_timeout = 0.0
+        self._count = 0
+
+    def _call(self, data: Optional[str] = None) -> str:
+        self._count += 1
+        query = {"EIO": "4", "transport": "polling", "t": str(self._count)}
+        if self.sid is not None:
+            query["sid"] = self.sid
+        request = Request(
+            f"{self.url}?{urlencode(query)}",
+            data=None if data is None else data.encode(),
+            headers={"Content-Type": "text/plain;charset=UTF-8"},
+            method="GET" if data is None else "POST",
+        )
+        with urlopen(request, timeout=self.timeout + self.ping_timeout) as response:
+            return response.read().decode()
+
+    def open(self):
+        """Starts a session"""
+        packet = self._call().split(_RECORD_SEPARATOR)[0]
+        if not packet.startswith("0"):
+            raise ConnectionError(f"unexpected handshake {packet[:40]!r}")
+        session = json.loads(packet[1:])
+        self.sid = session["sid"]
+        self.ping_timeout = (session["pingInterval"] + session["pingTimeout"]) / 1000
+
+    def send(self, packets: List[str]):
+        """Sends packets, such as "3" to answer a ping"""
+        self._call(_RECORD_SEPARATOR.join(packets))
+
+    def receive(self) -> List[str]:
+        """Waits for packets, returning them once any arrive or a ping is due"""
+        return self._call().split(_RECORD_SEPARATOR)
+
+
+def _parse(packet: str) -> Tuple[str, str, object]:
+    """Returns the (Socket.IO type, namespace, data) of an Engine.IO message"""
+    kind, rest = packet[1], packet[2:]
+    namespace = "/"
+    if rest.startswith("/"):
+        namespace, _, rest = rest.partition(",")
+    while rest[:1].isdigit():
+        # acknowledgement id, not used by the live stream
+        rest = rest[1:]
+    return kind, namespace, json.loads(rest) if rest else None
+
+
+class EventStream:
+    """Iterates the events of the AtomicAssets live stream
+
+    Iterate the stream, or async iterate it from a coroutine, to receive
+    StreamEvent tuples. New transfers, assets and offers missed while
+    disconnected are fetched from the REST endpoints, and delivered first
+    with backfilled set. Events updating assets and offers can not be
+    recovered that way. `last_ids` can be saved and passed back as `since`
+    to resume after a restart.
+    """
+
+    def __init__(
+        self,
+        atom: Atom,
+        streams: Tuple[str, ...] = ("transfers",),
+        url: str = "",
+        collection: str = "",
+        since: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        max_reconnects: Optional[int] = None,
+    ):
+        """Creates an EventStream, which connects when first iterated
+
+        Args:
+            atom (Atom): client used for the REST backfill
+            streams (tuple, optional): streams of NAMESPACES to subscribe to.
+                Defaults to ("transfers",).
+            url (str, optional): Socket.IO server. Defaults to the host of the
+                atom endpoint.
+            collection (str, optional): only deliver events of this collection.
+                Defaults to "".
+            since (dict, optional): stream:id pairs, such as a saved `last_ids`,
+                to backfill from when first connecting. Defaults to None.
+            timeout (float, optional): seconds to wait for the server, on top of
+                its ping interval while polling. Defaults to 10.
+            reconnect_delay (float, optional): seconds before the first reconnect,
+                doubled for each failed attempt. Defaults to 1.
+            max_reconnect_delay (float, optional): longest wait between
+                reconnects. Defaults to 30.
+            max_reconnects (int, optional): failed connects in a row before
+                StreamError is raised. Defaults to no limit.
+        """
+        for stream in streams:
+            assert stream in NAMESPACES, f"No live stream of {stream}"
+        if not url:
+            endpoint = urlparse(atom.endpoint)
+            url = f"{endpoint.scheme}://{endpoint.netloc}/"
+        self.atom = atom
+        self.streams = tuple(streams)
+        self.url = url
+        self.collection = collection
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_reconnects = max_reconnects
+        # id of the latest new transfer, asset or offer delivered, by stream
+        self.last_ids: Dict[str, str] = dict(since or {})
+        self.connects = 0
+        self._session: Optional[_Polling] = None
+        self._closed = False
+
+    def _connect(self) -> List[StreamEvent]:
+        """Opens a session, subscribes, and returns the events missed since last_ids"""
+        delay, failures = self.reconnect_delay, 0
+        while True:
+            if self.connects or failures:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            session = _Polling(f"{self.url}socket.io/", self.timeout)
+            last_ids = dict(self.last_ids)
+            try:
+                session.open()
+                session.send([f"40{NAMESPACES[stream]}," for stream in self.streams])
+                missed = self._backfill()
+                break
+            except (OSError, ValueError, RequestFailedError) as exc:
+                # events of a failed backfill are fetched again next time
+                self.last_ids = last_ids
+                failures += 1
+                if self.max_reconnects is not None and failures > self.max_reconnects:
+                    raise StreamError(self.url, repr(exc)) from exc
+        self._session = session
+        self.connects += 1
+        return missed
+
+    def _backfill(self) -> List[StreamEvent]:
+        """Returns the new transfers, assets and offers after last_ids"""
+        events = []
+        for stream in self.streams:
+            last = self.last_ids.get(stream)
+            if last is None:
+                continue
+            endpoint, sort, name = BACKFILL[stream]
+            cls = EVENTS[name][0]
+            params = self.atom.filter_params({"collection_name": self.collection})
+            params["lower_bound"] = str(int(last) + 1)
+            for items in self.atom.pages(
+                endpoint,
+                params,
+                lambda data, cls=cls: [cls(item) for item in data],
+                sort,
+            ):
+                for item in items:
+                    event = self._deliver(stream, name, item, {}, True)
+                    if event is not None:
+                        events.append(event)
+        return events
+
+    def _deliver(
+        self, stream: str, name: str, item, data: dict, backfilled: bool = False
+    ) -> Optional[StreamEvent]:
+        """Returns the event, or None for duplicates and other collections"""
+        if self.collection and item is not None:
+            collection = getattr(item, "_collection", None)
+            if collection is not None and collection.get_id() != self.collection:
+                return None
+        if name.startswith("new_") and item is not None:
+            last = self.last_ids.get(stream)
+            if last is not None and int(item.get_id()) <= int(last):
+                return None
+            self.last_ids[stream] = item.get_id()
+        return StreamEvent(stream, name, item, data, backfilled)
+
+    def _decode(self, namespace: str, payload: list) -> Optional[StreamEvent]:
+        name, data = payload[0], payload[1] if len(payload) > 1 else {}
+        item = None
+        if name in EVENTS and isinstance(data, dict):
+            cls, field = EVENTS[name]
+            if data.get(field) is not None:
+                item = cls(data[field])
+        return self._deliver(_STREAMS[namespace], name, item, data)
+
+    def poll(self) -> List[StreamEvent]:
+        """Waits for the next events, reconnecting when the session was lost
+
+        Returns:
+            list: StreamEvent tuples, empty when only a ping arrived
+        """
+        if self._session is None:
+            return self._connect()
+        try:
+            packets = self._session.receive()
+        except (OSError, ValueError):
+            self._session = None
+            return []
+        events, replies = [], []
+        for packet in packets:
+            if packet == "2":
+                replies.append("3")
+            elif packet == "1":
+                self._session = None
+            elif packet.startswith("42"):
+                _, namespace, payload = _parse(packet)
+                if namespace in _STREAMS:
+                    event = self._decode(namespace, payload)
+                    if event is not None:
+                        events.append(event)
+            elif packet.startswith("44"):
+                _, namespace, payload = _parse(packet)
+                raise StreamError(self.url, f"{namespace} refused: {payload}")
+        if replies and self._session is not None:
+            try:
+                self._session.send(replies)
+            except (OSError, ValueError):
+                self._session = None
+        return events
+
+    def events(self, max_events: Optional[int] = None) -> Iterator[StreamEvent]:
+        """Yields events as they arrive
+
+        Args:
+            max_events (int, optional): stop after this many events. Defaults to
+                no limit.
+
+        Yields:
+            StreamEvent: each event
+        """
+        count = 0
+        while not self._closed and (max_events is None or count < max_events):
+            for event in self.poll():
+                yield event
+                count += 1
+                if max_events is not None and count >= max_events:
+                    return
+
+    def __iter__(self) -> Iterator[StreamEvent]:
+        return self.events()
+
+    async def events_async(self, max_events: Optional[int] = None):
+        """Yields events as they arrive, waiting for them in the default executor
+
+        Args:
+            max_events (int, optional): stop after this many events. Defaults to
+                no limit.
+
+        Yields:
+            StreamEvent: each event
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        loop = asyncio.get_running_loop()
+        count = 0
+        while not self._closed and (max_events is None or count < max_events):
+            for event in await loop.run_in_executor(None, self.poll):
+                yield event
+                count += 1
+                if max_events is not None and count >= max_events:
+                    return
+
+    def __aiter__(self):
+        return self.events_async()
+
+    def close(self):
+        """Ends the session, and stops iteration"""
+        self._closed = True
+        session, self._session = self._session, None
+        if session is not None:
+            try:
+                session.send(["1"])
+            except (OSError, ValueError):
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,5 +1,16 @@
 """Support Subpackage for Dalton API
 
+* asset_set - Indexed set of assets with snapshot diffs
 * atomic_classes - Classes for Atomic Asset data structures
 * atomic_erros - Custom Errors
+* batching - Packing filter values into few requests
+* cache - Response cache with conditional revalidation
+* catalog - Template and schema index of collections
+* flight - Single-flight request coalescing
+* instrumentation - Request events and latency statistics
+* market_classes - Classes for AtomicMarket data structures
+* paging - Adaptive page sizes
+* serialization - Compact encoding of model objects
+* snapshot_file - Memory-mapped asset and transfer snapshots
+* transport - Pluggable HTTP backends
 """
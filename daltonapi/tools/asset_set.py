@@ -0,0 +1,200 @@
+"""Asset Set
+
+Set of assets keyed by asset id, with set algebra, lazily built secondary
+indexes and snapshot diffs"""
+
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Set, Tuple, Union
+
+from .atomic_classes import Asset
+
+
+def _owner(asset: Asset) -> Optional[str]:
+    return getattr(asset, "_owner", None)
+
+
+def _entity(attribute: str):
+    """Returns a function reading the id of an embedded collection, schema or template"""
+
+    def read(asset: Asset) -> Optional[str]:
+        entity = getattr(asset, attribute, None)
+        return entity.get_id() if entity is not None else None
+
+    return read
+
+
+# secondary index name -> function returning the indexed value of an asset
+_INDEXED = {
+    "owner": _owner,
+    "collection": _entity("_collection"),
+    "schema": _entity("_schema"),
+    "template": _entity("_template"),
+}
+
+
+class AssetSetDiff(NamedTuple):
+    """Differences between two asset sets"""
+
+    added: "AssetSet"
+    removed: "AssetSet"
+    changed_owner: Dict[str, Tuple[Optional[str], Optional[str]]]
+
+
+class AssetSet:
+    """Assets keyed by asset id
+
+    Membership, union, intersection and difference cost O(1) per asset.
+    Lookups by owner, collection, schema or template build an index on
+    first use, which is kept up to date by add and discard.
+    """
+
+    def __init__(self, assets: Iterable[Asset] = ()):
+        """Creates an AssetSet
+
+        Args:
+            assets (iterable, optional): Asset objects. Later duplicates replace
+                earlier ones. Defaults to empty.
+        """
+        self._assets: Dict[str, Asset] = {asset.get_id(): asset for asset in assets}
+        self._indexes: Dict[str, Dict[Optional[str], Set[str]]] = {}
+
+    @classmethod
+    def _from_dict(cls, assets: Dict[str, Asset]) -> "AssetSet":
+        result = cls()
+        result._assets = assets
+        return result
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __iter__(self) -> Iterator[Asset]:
+        return iter(self._assets.values())
+
+    def __contains__(self, item: Union[Asset, str]) -> bool:
+        key = item.get_id() if isinstance(item, Asset) else item
+        return key in self._assets
+
+    def __eq__(self, other):
+        if not isinstance(other, AssetSet):
+            return NotImplemented
+        return self._assets.keys() == other._assets.keys()
+
+    def __repr__(self):
+        return f"AssetSet({len(self)} assets)"
+
+    def get(self, asset_id: str) -> Optional[Asset]:
+        """Returns the asset with an id, or None"""
+        return self._assets.get(asset_id)
+
+    def ids(self) -> Set[str]:
+        """Returns the ids of the assets"""
+        return set(self._assets)
+
+    def add(self, asset: Asset):
+        """Adds an asset, replacing the one with the same id
+
+        Args:
+            asset (Asset): the asset
+        """
+        self.discard(asset)
+        key = asset.get_id()
+        self._assets[key] = asset
+        for name, index in self._indexes.items():
+            index.setdefault(_INDEXED[name](asset), set()).add(key)
+
+    def discard(self, item: Union[Asset, str]):
+        """Removes an asset if present
+
+        Args:
+            item (Union[Asset, str]): the asset or its id
+        """
+        key = item.get_id() if isinstance(item, Asset) else item
+        asset = self._assets.pop(key, None)
+        if asset is None:
+            return
+        for name, index in self._indexes.items():
+            value = _INDEXED[name](asset)
+            index[value].discard(key)
+            if not index[value]:
+                del index[value]
+
+    def union(self, other: "AssetSet") -> "AssetSet":
+        """Returns the assets in either set, taken from other when in both"""
+        return AssetSet._from_dict({**self._assets, **other._assets})
+
+    def intersection(self, other: "AssetSet") -> "AssetSet":
+        """Returns the assets of this set also in other"""
+        keys = self._assets.keys() & other._assets.keys()
+        return AssetSet._from_dict({key: self._assets[key] for key in keys})
+
+    def difference(self, other: "AssetSet") -> "AssetSet":
+        """Returns the assets of this set not in other"""
+        keys = self._assets.keys() - other._assets.keys()
+        return AssetSet._from_dict({key: self._assets[key] for key in keys})
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def _index(self, name: str) -> Dict[Optional[str], Set[str]]:
+        """Returns a secondary index, building it on first use"""
+        index = self._indexes.get(name)
+        if index is None:
+            read = _INDEXED[name]
+            index = {}
+            for key, asset in self._assets.items():
+                index.setdefault(read(asset), set()).add(key)
+            self._indexes[name] = index
+        return index
+
+    def _select(self, name: str, value) -> "AssetSet":
+        if not isinstance(value, str) and value is not None:
+            value = value.get_id()
+        keys = self._index(name).get(value, ())
+        return AssetSet._from_dict({key: self._assets[key] for key in keys})
+
+    def by_owner(self, owner: str) -> "AssetSet":
+        """Returns the assets held by an account"""
+        return self._select("owner", owner)
+
+    def by_collection(self, collection) -> "AssetSet":
+        """Returns the assets of a collection, given as a name or Collection"""
+        return self._select("collection", collection)
+
+    def by_schema(self, schema) -> "AssetSet":
+        """Returns the assets of a schema, given as a name or Schema"""
+        return self._select("schema", schema)
+
+    def by_template(self, template) -> "AssetSet":
+        """Returns the assets of a template, given as an ID or Template"""
+        return self._select("template", template)
+
+    def counts(self, by: str) -> Dict[Optional[str], int]:
+        """Returns the number of assets per owner, collection, schema or template
+
+        Args:
+            by (str): "owner", "collection", "schema" or "template"
+
+        Returns:
+            dict: value:count pairs
+        """
+        assert (
+            by in _INDEXED
+        ), "Assets can be counted by owner, collection, schema or template"
+        return {value: len(keys) for value, keys in self._index(by).items()}
+
+    def diff(self, newer: "AssetSet") -> AssetSetDiff:
+        """Compares this snapshot with a newer one
+
+        Args:
+            newer (AssetSet): the newer snapshot
+
+        Returns:
+            AssetSetDiff: assets added, assets removed, and
+            asset_id:(old owner, new owner) pairs of assets that changed owner
+        """
+        changed = {}
+        for key in self._assets.keys() & newer._assets.keys():
+            before, after = _owner(self._assets[key]), _owner(newer._assets[key])
+            if before != after:
+                changed[key] = (before, after)
+        return AssetSetDiff(newer - self, self - newer, changed)
@@ -6,10 +6,42 @@ from typing import Dict, List, Tuple
 from datetime import datetime
 from .atomic_errors import NoCollectionImageError
 
+# gateway media links point to, unless a client was given others
+IPFS_GATEWAY = "https://ipfs.io/ipfs/"
+
+
+def _media(data: dict) -> Dict[str, str]:
+    """Returns the key:CID pairs of the IPFS hashes in asset or template data"""
+    return {
+        key: val
+        for key, val in data.items()
+        if isinstance(val, str) and val.startswith(("Qm", "bafy"))
+    }
+
+
+def set_gateway(item, gateway: str):
+    """Points the media links of an object and its nested objects at a gateway
+
+    Args:
+        item: Asset, Template, Collection or other object from the API
+        gateway (str): gateway URL, ending with "/ipfs/"
+
+    Returns:
+        The same object
+    """
+    if isinstance(item, AtomicBaseClass) and gateway != item.gateway:
+        item.gateway = gateway
+        for field in ("_collection", "_schema", "_template"):
+            set_gateway(getattr(item, field, None), gateway)
+    return item
+
 
 class AtomicBaseClass:
     """Template class for AtomicAssets API data"""
 
+    # IPFS gateway of media links
+    gateway = IPFS_GATEWAY
+
     def __init__(self, api_data):
         """Creates the Atomic Object
 
@@ -48,8 +80,39 @@ class AtomicBaseClass:
         """
         return self.key
 
+    def to_dict(self) -> dict:
+        """Returns the API data the object was created from
+
+        Returns:
+            dict: Data that from_dict turns back into an equal object
+        """
+        data = {}
+        for name, value in vars(self).items():
+            if name.startswith("_"):
+                if isinstance(value, AtomicBaseClass):
+                    value = value.to_dict()
+                data[name[1:]] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AtomicBaseClass":
+        """Creates the object from data returned by to_dict
+
+        Args:
+            data (dict): Data from to_dict or the AtomicAssets API
+
+        Returns:
+            AtomicBaseClass: the object
+        """
+        return cls(data)
+
     def __eq__(self, other):
-        return self.key == other.key
+        if not isinstance(other, AtomicBaseClass):
+            return NotImplemented
+        return (type(self), self.key) == (type(other), other.key)
+
+    def __hash__(self):
+        return hash((type(self), self.key))
 
     def __ne__(self, other):
         return not self == other
@@ -121,7 +184,16 @@ class Asset(AtomicBaseClass):
         Returns:
             str: direct link to the image
         """
-        return f"https://ipfs.io/ipfs/{self._data['img']}"
+        return f"{self.gateway}{self._data['img']}"
+
+    @property
+    def media_cids(self) -> Dict[str, str]:
+        """Returns the IPFS hashes of all media properties of the asset
+
+        Returns:
+            dict: key:CID pairs
+        """
+        return _media(self._data)
 
     @property
     def all_media(self) -> Dict[str, str]:
@@ -130,11 +202,7 @@ class Asset(AtomicBaseClass):
         Returns:
             dict: key:image_link pairs
         """
-        return {
-            key: f"https://ipfs.io/ipfs/{val}"
-            for key, val in self._data.items()
-            if val.startswith("Qm")
-        }
+        return {key: f"{self.gateway}{val}" for key, val in self.media_cids.items()}
 
     @property
     def burned(self) -> Tuple[str, str, str]:
@@ -247,7 +315,16 @@ class Collection(AtomicBaseClass):
         """
         if self._img is None:
             raise NoCollectionImageError
-        return f"https://ipfs.io/ipfs/{self._img}"
+        return f"{self.gateway}{self._img}"
+
+    @property
+    def media_cids(self) -> Dict[str, str]:
+        """Returns the IPFS hash of the collection image
+
+        Returns:
+            dict: key:CID pairs, empty without an image
+        """
+        return {"img": self._img} if self._img else {}
 
 
 class Schema(AtomicBaseClass):
@@ -282,7 +359,16 @@ class Template(AtomicBaseClass):
         Returns:
             str: direct link to the image
         """
-        return f"https://ipfs.io/ipfs/{self._immutable_data['img']}"
+        return f"{self.gateway}{self._immutable_data['img']}"
+
+    @property
+    def media_cids(self) -> Dict[str, str]:
+        """Returns the IPFS hashes of all media properties of the template
+
+        Returns:
+            dict: key:CID pairs
+        """
+        return _media(self._immutable_data)
 
     @property
     def all_media(self) -> Dict[str, str]:
@@ -291,11 +377,7 @@ class Template(AtomicBaseClass):
         Returns:
             dict: key:image_link pairs
         """
-        return {
-            key: f"https://ipfs.io/ipfs/{val}"
-            for key, val in self._immutable_data.items()
-            if val.startswith("Qm")
-        }
+        return {key: f"{self.gateway}{val}" for key, val in self.media_cids.items()}
 
     @property
     def name(self) -> str:
@@ -312,6 +394,9 @@ class Offer(AtomicBaseClass):
 
     More features coming soon"""
 
+    # API field holding the identifier of the offer
+    id_field = "offer_id"
+
     def __init__(self, api_data):
         """Creates an Offer data object from API data
 
@@ -319,7 +404,7 @@ class Offer(AtomicBaseClass):
             api_data (dict): Data from the AtomicAssets API
         """
         super().__init__(api_data)
-        self.key = self._offer_id
+        self.key = getattr(self, "_" + self.id_field)
 
 
 class Transfer(AtomicBaseClass):
@@ -341,7 +426,7 @@ class Transfer(AtomicBaseClass):
         Returns:
             List: List of Asset
         """
-        return [Asset(nft) for nft in self._assets]
+        return [set_gateway(Asset(nft), self.gateway) for nft in self._assets]
 
     @property
     def memo(self) -> str:
@@ -361,6 +446,24 @@ class Transfer(AtomicBaseClass):
         """
         return self._contract
 
+    @property
+    def sender(self) -> str:
+        """Returns the account the assets were sent from
+
+        Returns:
+            str: account name
+        """
+        return self._sender_name
+
+    @property
+    def recipient(self) -> str:
+        """Returns the account the assets were sent to
+
+        Returns:
+            str: account name
+        """
+        return self._recipient_name
+
     @property
     def timestamp(self) -> int:
         """Returns timestamp of transfer
@@ -378,6 +481,226 @@ class Transfer(AtomicBaseClass):
             api_data (dict): Data from the AtomicAssets API
         """
         when = datetime.fromtimestamp(float(self._created_at_time) / 1000).isoformat()
-        sender = self._sender_name
-        recipient = self._recipient_name
-        return f"{when}: {sender} ---> {recipient} : {self.memo}"
+        return f"{when}: {self.sender} ---> {self.recipient} : {self.memo}"
+
+
+def _counts(rows: List[dict], key: str, value: str = "assets") -> Dict[str, int]:
+    """Returns key:count pairs from a list of API count rows"""
+    return {row[key]: int(row[value]) for row in rows}
+
+
+class CollectionStats(AtomicBaseClass):
+    """Class for instantizing aggregate statistics of a collection"""
+
+    def __init__(self, api_data):
+        """Creates CollectionStats from API data
+
+        Args:
+            api_data (dict): Data from the AtomicAssets API, with collection_name
+        """
+        super().__init__(api_data)
+        self.key = self._collection_name
+
+    @property
+    def assets(self) -> int:
+        """Returns the number of assets minted in the collection
+
+        Returns:
+            int: number of assets
+        """
+        return int(self._assets)
+
+    @property
+    def burned(self) -> int:
+        """Returns the number of burned assets of the collection
+
+        Returns:
+            int: number of burned assets
+        """
+        return int(self._burned)
+
+    @property
+    def templates(self) -> int:
+        """Returns the number of templates of the collection
+
+        Returns:
+            int: number of templates
+        """
+        return int(self._templates)
+
+    @property
+    def burned_by_template(self) -> Dict[str, int]:
+        """Returns the number of burned assets per template
+
+        Returns:
+            dict: template_id:count pairs
+        """
+        return _counts(
+            getattr(self, "_burned_by_template", []), "template_id", "burned"
+        )
+
+    @property
+    def burned_by_schema(self) -> Dict[str, int]:
+        """Returns the number of burned assets per schema
+
+        Returns:
+            dict: schema_name:count pairs
+        """
+        return _counts(getattr(self, "_burned_by_schema", []), "schema_name", "burned")
+
+
+class TemplateStats(AtomicBaseClass):
+    """Class for instantizing aggregate statistics of a template"""
+
+    def __init__(self, api_data):
+        """Creates TemplateStats from API data
+
+        Args:
+            api_data (dict): Data from the AtomicAssets API, with collection_name
+                and template_id
+        """
+        super().__init__(api_data)
+        self.key = self._template_id
+
+    @property
+    def assets(self) -> int:
+        """Returns the number of assets minted from the template
+
+        Returns:
+            int: number of assets
+        """
+        return int(self._assets)
+
+    @property
+    def burned(self) -> int:
+        """Returns the number of burned assets of the template
+
+        Returns:
+            int: number of burned assets
+        """
+        return int(self._burned)
+
+
+class SchemaStats(AtomicBaseClass):
+    """Class for instantizing aggregate statistics of a schema"""
+
+    def __init__(self, api_data):
+        """Creates SchemaStats from API data
+
+        Args:
+            api_data (dict): Data from the AtomicAssets API, with collection_name
+                and schema_name
+        """
+        super().__init__(api_data)
+        self.key = self._schema_name
+
+    @property
+    def assets(self) -> int:
+        """Returns the number of assets of the schema
+
+        Returns:
+            int: number of assets
+        """
+        return int(self._assets)
+
+    @property
+    def burned(self) -> int:
+        """Returns the number of burned assets of the schema
+
+        Returns:
+            int: number of burned assets
+        """
+        return int(self._burned)
+
+    @property
+    def templates(self) -> int:
+        """Returns the number of templates of the schema
+
+        Returns:
+            int: number of templates
+        """
+        return int(self._templates)
+
+
+class AccountStats(AtomicBaseClass):
+    """Class for instantizing the asset counts of an account"""
+
+    def __init__(self, api_data):
+        """Creates AccountStats from API data
+
+        Args:
+            api_data (dict): Data from the AtomicAssets API, with account
+        """
+        super().__init__(api_data)
+        self.key = self._account
+
+    @property
+    def assets(self) -> int:
+        """Returns the number of assets held by the account
+
+        Returns:
+            int: number of assets
+        """
+        return int(self._assets)
+
+    @property
+    def collections(self) -> Dict[str, int]:
+        """Returns the number of assets held per collection
+
+        Returns:
+            dict: collection_name:count pairs
+        """
+        return {
+            row["collection"]["collection_name"]: int(row["assets"])
+            for row in self._collections
+        }
+
+    @property
+    def templates(self) -> Dict[str, int]:
+        """Returns the number of assets held per template
+
+        Returns:
+            dict: template_id:count pairs
+        """
+        return _counts(self._templates, "template_id")
+
+
+class AccountCollectionStats(AtomicBaseClass):
+    """Class for instantizing the asset counts of an account in one collection"""
+
+    def __init__(self, api_data):
+        """Creates AccountCollectionStats from API data
+
+        Args:
+            api_data (dict): Data from the AtomicAssets API, with account and
+                collection_name
+        """
+        super().__init__(api_data)
+        self.key = f"{self._account}:{self._collection_name}"
+
+    @property
+    def assets(self) -> int:
+        """Returns the number of assets held in the collection
+
+        Returns:
+            int: number of assets
+        """
+        return sum(self.schemas.values())
+
+    @property
+    def templates(self) -> Dict[str, int]:
+        """Returns the number of assets held per template
+
+        Returns:
+            dict: template_id:count pairs
+        """
+        return _counts(self._templates, "template_id")
+
+    @property
+    def schemas(self) -> Dict[str, int]:
+        """Returns the number of assets held per schema
+
+        Returns:
+            dict: schema_name:count pairs
+        """
+        return _counts(self._schemas, "schema_name")
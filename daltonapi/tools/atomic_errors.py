@@ -47,3 +47,47 @@ class NoCollectionImageError(Exception):
 
     def __str__(self):
         return self.message
+
+
+class NoRecordingError(Exception):
+    """Exception called when a replayed request was never recorded"""
+
+    def __init__(self, method, url):
+        super().__init__(self)
+        self.message = f"No recorded response for {method} {url}."
+
+    def __str__(self):
+        return self.message
+
+
+class SnapshotFormatError(Exception):
+    """Exception called when a file is not a readable snapshot"""
+
+    def __init__(self, path, reason):
+        super().__init__(self)
+        self.message = f"{path} is not a readable snapshot: {reason}."
+
+    def __str__(self):
+        return self.message
+
+
+class MediaFetchError(Exception):
+    """Exception called when no gateway returned a media file"""
+
+    def __init__(self, cid, reason):
+        super().__init__(self)
+        self.message = f"Could not fetch {cid}: {reason}."
+
+    def __str__(self):
+        return self.message
+
+
+class StreamError(Exception):
+    """Exception called when the live stream can not be reached"""
+
+    def __init__(self, url, reason):
+        super().__init__(self)
+        self.message = f"Could not connect to the live stream at {url}: {reason}."
+
+    def __str__(self):
+        return self.message
@@ -0,0 +1,54 @@
+"""Batching
+
+Helpers for packing many filter values into comma-separated query
+parameters without exceeding URL length limits"""
+
+from typing import List, Optional
+from urllib.parse import quote
+
+# "," is sent percent-encoded as "%2C"
+_SEPARATOR_LENGTH = 3
+
+
+def encoded_length(value: str) -> int:
+    """Returns the length of a value once percent-encoded in a query string
+
+    Args:
+        value (str): raw value
+
+    Returns:
+        int: encoded length
+    """
+    return len(quote(value, safe=""))
+
+
+def chunk_values(
+    values: List[str], max_count: Optional[int] = None, max_chars: int = 2000
+) -> List[List[str]]:
+    """Splits values into groups that each fit in one comma-separated filter
+
+    A single value longer than max_chars still gets a group of its own.
+
+    Args:
+        values (list[str]): values to pack
+        max_count (int, optional): maximum number of values per group. Defaults to None.
+        max_chars (int, optional): maximum encoded length of a joined group. Defaults to 2000.
+
+    Returns:
+        list[list[str]]: packed groups, in the original order
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    length = 0
+    for value in values:
+        size = encoded_length(value)
+        extra = size + (_SEPARATOR_LENGTH if current else 0)
+        full = max_count is not None and len(current) >= max_count
+        if current and (full or length + extra > max_chars):
+            chunks.append(current)
+            current, length, extra = [], 0, size
+        current.append(value)
+        length += extra
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,169 @@
+"""Cache
+
+Response cache for the API clients, revalidating expired entries with
+conditional requests"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+def content_digest(content: bytes) -> str:
+    """Returns a digest of a response body
+
+    Args:
+        content (bytes): response body
+
+    Returns:
+        str: hex digest
+    """
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class CacheEntry:
+    """A cached result with the validators of the response it was built from"""
+
+    __slots__ = ("result", "etag", "last_modified", "digest", "expires")
+
+    def __init__(
+        self,
+        result,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        digest: str,
+        expires: float,
+    ):
+        """Creates a CacheEntry
+
+        Args:
+            result: the decoded and built result
+            etag (str): ETag of the response, or None
+            last_modified (str): Last-Modified of the response, or None
+            digest (str): digest of the response body
+            expires (float): clock time the entry has to be revalidated after
+        """
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.expires = expires
+
+    def validators(self) -> Dict[str, str]:
+        """Returns the headers revalidating this entry"""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Least recently used cache of built query results
+
+    Entries are served without a request until ttl runs out. After that the
+    next query revalidates them: with If-None-Match/If-Modified-Since when
+    the server sent an ETag or Last-Modified, where a 304 reply reuses the
+    cached objects. Without validators the full response is fetched, but
+    when its body hashes the same as before the cached objects are still
+    reused and not rebuilt.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Creates a ResponseCache
+
+        Args:
+            ttl (float, optional): seconds an entry is used without revalidating it.
+                Defaults to 60.
+            max_entries (int, optional): entries kept before evicting the least
+                recently used. Defaults to 1024.
+            clock (callable, optional): returns the current time in seconds.
+                Defaults to time.monotonic.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Returns the entry stored under key, fresh or expired
+
+        Args:
+            key (str): request key
+
+        Returns:
+            CacheEntry: the entry, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def fresh(self, entry: CacheEntry) -> bool:
+        """Returns whether entry can be used without revalidating it"""
+        return self.clock() < entry.expires
+
+    def store(
+        self, key: str, result, headers: Dict[str, str], digest: str
+    ) -> CacheEntry:
+        """Caches a result
+
+        Args:
+            key (str): request key
+            result: the decoded and built result
+            headers (dict): headers of the response
+            digest (str): digest of the response body
+
+        Returns:
+            CacheEntry: the new entry
+        """
+        lowered = {name.lower(): value for name, value in headers.items()}
+        entry = CacheEntry(
+            result,
+            lowered.get("etag"),
+            lowered.get("last-modified"),
+            digest,
+            self.clock() + self.ttl,
+        )
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def hit(self, entry: CacheEntry, revalidated: bool = False):
+        """Counts a use of entry, renewing it after a revalidation
+
+        Args:
+            entry (CacheEntry): the entry used
+            revalidated (bool, optional): whether the server confirmed the entry is
+                unchanged. Defaults to False.
+        """
+        with self._lock:
+            if revalidated:
+                self.revalidated += 1
+                entry.expires = self.clock() + self.ttl
+            else:
+                self.hits += 1
+
+    def clear(self):
+        """Removes every entry"""
+        with self._lock:
+            self._entries.clear()
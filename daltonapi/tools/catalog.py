@@ -0,0 +1,158 @@
+"""Catalog
+
+In-memory index of the templates and schemas of collections"""
+
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .atomic_classes import Asset, Schema, Template
+
+
+class Catalog:
+    """Templates and schemas of collections, indexed by ID and name
+
+    Fill it with prefetch, which pages through the list endpoints of a
+    collection, or pass it to Atom, which adds the templates and schemas
+    embedded in the assets it returns and answers get_template and
+    get_schema from it.
+    """
+
+    def __init__(self):
+        """Creates an empty Catalog"""
+        self._templates: Dict[Tuple[str, str], Template] = {}
+        self._template_names: Dict[Tuple[str, str], Template] = {}
+        self._schemas: Dict[Tuple[str, str], Schema] = {}
+        self.loaded: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._templates) + len(self._schemas)
+
+    def add_template(self, collection: str, template: Template):
+        """Adds a template, replacing an older copy
+
+        Args:
+            collection (str): collection name
+            template (Template): the template
+        """
+        data = getattr(template, "_immutable_data", None) or {}
+        name = data.get("name")
+        with self._lock:
+            self._templates[(collection, template.get_id())] = template
+            if name is not None:
+                self._template_names[(collection, name)] = template
+
+    def add_schema(self, collection: str, schema: Schema):
+        """Adds a schema, replacing an older copy
+
+        Args:
+            collection (str): collection name
+            schema (Schema): the schema
+        """
+        with self._lock:
+            self._schemas[(collection, schema.get_id())] = schema
+
+    def add_assets(self, assets: Iterable[Asset]):
+        """Adds the templates and schemas embedded in assets
+
+        Embedded templates lack their collection and schema, so the catalog
+        keeps a copy of them with those of the asset, leaving the asset as it is.
+
+        Args:
+            assets (iterable): Asset objects
+        """
+        # pylint: disable=protected-access
+        for asset in assets:
+            collection = getattr(asset, "_collection", None)
+            if collection is None:
+                continue
+            name = collection.get_id()
+            schema = getattr(asset, "_schema", None)
+            if schema is not None:
+                self.add_schema(name, schema)
+            template = getattr(asset, "_template", None)
+            if template is not None:
+                if not hasattr(template, "_collection"):
+                    template = copy.copy(template)
+                    template._collection = collection
+                    template._schema = schema
+                self.add_template(name, template)
+
+    def template(self, collection: str, template_id: str) -> Optional[Template]:
+        """Returns a template by ID, or None when it is not in the catalog"""
+        return self._templates.get((collection, str(template_id)))
+
+    def template_by_name(self, collection: str, name: str) -> Optional[Template]:
+        """Returns a template by its name, or None when it is not in the catalog"""
+        return self._template_names.get((collection, name))
+
+    def schema(self, collection: str, schema_name: str) -> Optional[Schema]:
+        """Returns a schema by name, or None when it is not in the catalog"""
+        return self._schemas.get((collection, schema_name))
+
+    def templates(self, collection: str) -> List[Template]:
+        """Returns the templates of a collection in the catalog"""
+        with self._lock:
+            return [t for (c, _), t in self._templates.items() if c == collection]
+
+    def schemas(self, collection: str) -> List[Schema]:
+        """Returns the schemas of a collection in the catalog"""
+        with self._lock:
+            return [s for (c, _), s in self._schemas.items() if c == collection]
+
+    def prefetch(self, atom, collection: str, limit: int = 1000, workers: int = 4):
+        """Loads every template and schema of a collection
+
+        Pages of both list endpoints are requested together, in waves of
+        `workers` pages shared between the endpoints still being paged, until
+        each returns a page with fewer than `limit` items.
+
+        Args:
+            atom (Atom): Atom used to query the AtomicAssets API
+            collection (str): collection name
+            limit (int, optional): items per page. Defaults to 1000.
+            workers (int, optional): pages fetched at the same time. Defaults to 4.
+        """
+        fetches = (atom.get_templates, atom.get_schemas)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            templates, schemas = _all_pages(pool, fetches, collection, limit, workers)
+        for template in templates:
+            self.add_template(collection, template)
+        for schema in schemas:
+            self.add_schema(collection, schema)
+        with self._lock:
+            self.loaded.add(collection)
+
+
+def _all_pages(
+    pool: ThreadPoolExecutor,
+    fetches: Sequence[Callable],
+    collection: str,
+    limit: int,
+    workers: int,
+) -> List[list]:
+    """Returns the items of every page of several list endpoints"""
+    items: List[list] = [[] for _ in fetches]
+    next_page = [1] * len(fetches)
+    active = list(range(len(fetches)))
+    while active:
+        wave = max(1, workers // len(active))
+        jobs = [
+            (endpoint, page)
+            for endpoint in active
+            for page in range(next_page[endpoint], next_page[endpoint] + wave)
+        ]
+        pages = pool.map(
+            lambda job: fetches[job[0]](collection, page=job[1], limit=limit), jobs
+        )
+        finished = set()
+        for (endpoint, _), rows in zip(jobs, pages):
+            items[endpoint].extend(rows)
+            if len(rows) < limit:
+                finished.add(endpoint)
+        for endpoint in active:
+            next_page[endpoint] += wave
+        active = [endpoint for endpoint in active if endpoint not in finished]
+    return items
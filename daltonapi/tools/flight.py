@@ -0,0 +1,99 @@
+"""Flight
+
+Single-flight deduplication of identical concurrent requests"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def flight_key(method: str, endpoint: str, params: Optional[dict] = None) -> tuple:
+    """Builds the key identifying identical requests
+
+    Args:
+        method (str): HTTP method
+        endpoint (str): URL of the request
+        params (dict, optional): query parameters or JSON body. Defaults to None.
+
+    Returns:
+        tuple: hashable key
+    """
+    return (method, endpoint, json.dumps(params or {}, sort_keys=True, default=str))
+
+
+class _Call:
+    """A call in flight, and the outcome its waiters will share"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one call"""
+
+    def __init__(self):
+        """Creates an empty SingleFlight group"""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Runs func, unless a call with the same key is already running
+
+        Callers that arrive while a call is running wait for it, then get the
+        same result or have the same exception raised.
+
+        Args:
+            key (Hashable): identifies identical calls
+            func (callable): the call to make
+
+        Returns:
+            Any: the result of func
+        """
+        return self.call(key, func)[0]
+
+    def call(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Same as do, but also tells whether the result came from another caller
+
+        Args:
+            key (Hashable): identifies identical calls
+            func (callable): the call to make
+
+        Returns:
+            tuple: (result of func, True when shared from a call already running)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Returns the number of calls currently running
+
+        Returns:
+            int: running calls
+        """
+        with self._lock:
+            return len(self._calls)
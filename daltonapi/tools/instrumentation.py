@@ -0,0 +1,231 @@
+"""Instrumentation
+
+Per-request events and aggregated latency statistics for the API clients"""
+
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger("daltonapi")
+
+# upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class QueryEvent(NamedTuple):
+    """Timings and outcome of one client query
+
+    Times are in seconds. `connect` runs until the response headers arrive,
+    `transfer` until the body is read, then `decode` parses the JSON and
+    `build` constructs the returned objects.
+    """
+
+    client: str
+    endpoint: str
+    url: str
+    params: dict
+    status: int
+    bytes: int
+    connect: float
+    transfer: float
+    decode: float
+    build: float
+    total: float
+    retries: int = 0
+    cache_hit: bool = False
+    coalesced: bool = False
+    error: Optional[str] = None
+
+
+class Histogram:
+    """Latency histogram with fixed buckets"""
+
+    def __init__(self):
+        """Creates an empty Histogram"""
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        """Records one latency
+
+        Args:
+            seconds (float): latency in seconds
+        """
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        """Returns the mean latency
+
+        Returns:
+            float: seconds
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, fraction: float) -> float:
+        """Estimates a latency quantile as the upper bound of its bucket
+
+        Args:
+            fraction (float): quantile between 0 and 1, e.g. 0.99
+
+        Returns:
+            float: seconds, capped at the largest latency seen
+        """
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class EndpointStats:
+    """Aggregated statistics of one endpoint"""
+
+    def __init__(self):
+        """Creates empty EndpointStats"""
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.phases = {"connect": 0.0, "transfer": 0.0, "decode": 0.0, "build": 0.0}
+
+    def add(self, event: QueryEvent):
+        """Records one event
+
+        Args:
+            event (QueryEvent): the event to record
+        """
+        self.calls += 1
+        self.latency.add(event.total)
+        self.errors += event.error is not None
+        self.bytes += event.bytes
+        self.retries += event.retries
+        self.cache_hits += event.cache_hit
+        self.coalesced += event.coalesced
+        for phase in self.phases:
+            self.phases[phase] += getattr(event, phase)
+
+    def summary(self) -> dict:
+        """Returns the statistics as a plain dict
+
+        Returns:
+            dict: counters, latency quantiles and time spent per phase
+        """
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "mean": self.latency.mean,
+            "p50": self.latency.quantile(0.5),
+            "p90": self.latency.quantile(0.9),
+            "p99": self.latency.quantile(0.99),
+            "max": self.latency.max,
+            "phases": dict(self.phases),
+        }
+
+
+class QueryStats:
+    """Thread-safe statistics of every endpoint queried"""
+
+    def __init__(self):
+        """Creates empty QueryStats"""
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def record(self, event: QueryEvent):
+        """Records one event
+
+        Args:
+            event (QueryEvent): the event to record
+        """
+        label = f"{event.client}:{event.endpoint}"
+        with self._lock:
+            if label not in self.endpoints:
+                self.endpoints[label] = EndpointStats()
+            self.endpoints[label].add(event)
+
+    def summary(self) -> Dict[str, dict]:
+        """Returns the statistics of every endpoint
+
+        Returns:
+            dict: "client:endpoint":summary pairs
+        """
+        with self._lock:
+            return {label: stats.summary() for label, stats in self.endpoints.items()}
+
+    def reset(self):
+        """Clears all statistics"""
+        with self._lock:
+            self.endpoints = {}
+
+
+class Instrumentation:
+    """Collects QueryEvents from the API clients
+
+    Pass one to Atom, Wax or WaxTable. Clients without instrumentation skip
+    all timing work.
+    """
+
+    def __init__(
+        self,
+        hooks: List[Callable[[QueryEvent], None]] = None,
+        slow_query: Optional[float] = None,
+        collect_stats: bool = True,
+    ):
+        """Creates an Instrumentation
+
+        Args:
+            hooks (list[callable], optional): functions called with every QueryEvent.
+                Defaults to None.
+            slow_query (float, optional): log queries slower than this many seconds
+                to the "daltonapi" logger. Defaults to None.
+            collect_stats (bool, optional): aggregate events into stats. Defaults to True.
+        """
+        self.hooks = list(hooks or [])
+        self.slow_query = slow_query
+        self.stats = QueryStats() if collect_stats else None
+
+    def add_hook(self, hook: Callable[[QueryEvent], None]):
+        """Registers a function called with every QueryEvent
+
+        Args:
+            hook (callable): function taking a QueryEvent
+        """
+        self.hooks.append(hook)
+
+    def emit(self, event: QueryEvent):
+        """Records an event and passes it to the hooks
+
+        Args:
+            event (QueryEvent): the event to emit
+        """
+        if self.stats is not None:
+            self.stats.record(event)
+        if self.slow_query is not None and event.total >= self.slow_query:
+            logger.warning(
+                "Slow query %s %.3fs (connect %.3fs, transfer %.3fs, decode %.3fs, "
+                "build %.3fs) %s",
+                event.url,
+                event.total,
+                event.connect,
+                event.transfer,
+                event.decode,
+                event.build,
+                event.params,
+            )
+        for hook in self.hooks:
+            hook(event)
@@ -0,0 +1,187 @@
+"""Market Classes
+
+Classes for instantizing AtomicMarket data structures. Sales, auctions and
+buyoffers are offers of assets for a price, so they share the Offer model."""
+
+from typing import List, Optional
+
+from .atomic_classes import Asset, AtomicBaseClass, Offer, set_gateway
+
+# names of the state codes of sales and auctions
+LISTING_STATES = {0: "waiting", 1: "listed", 2: "canceled", 3: "sold", 4: "invalid"}
+
+# names of the state codes of buyoffers
+BUYOFFER_STATES = {
+    0: "pending",
+    1: "declined",
+    2: "canceled",
+    3: "accepted",
+    4: "invalid",
+}
+
+
+def _amount(value, precision) -> float:
+    """Returns a token amount from its integer form, such as 100000000 at precision 8"""
+    return int(value) / 10 ** int(precision)
+
+
+class MarketOffer(Offer):
+    """Base class for AtomicMarket sales, auctions and buyoffers"""
+
+    # code of the state in which the assets changed hands
+    completed = 3
+
+    @property
+    def seller(self) -> str:
+        """Returns the account selling the assets"""
+        return self._seller
+
+    @property
+    def buyer(self) -> Optional[str]:
+        """Returns the account buying the assets, None until bought"""
+        return self._buyer
+
+    @property
+    def price(self) -> float:
+        """Returns the price in tokens, such as 12.5 WAX
+
+        Returns:
+            float: price, the current bid of auctions
+        """
+        return _amount(self._price["amount"], self._price["token_precision"])
+
+    @property
+    def token(self) -> str:
+        """Returns the symbol of the token priced in, such as WAX"""
+        return self._price["token_symbol"]
+
+    @property
+    def assets(self) -> List[Asset]:
+        """Returns the assets offered
+
+        Returns:
+            list: List of Asset
+        """
+        return [set_gateway(Asset(nft), self.gateway) for nft in self._assets]
+
+    @property
+    def asset_ids(self) -> List[str]:
+        """Returns the IDs of the assets offered, without building them"""
+        return [nft["asset_id"] for nft in self._assets]
+
+    @property
+    def template_ids(self) -> List[Optional[str]]:
+        """Returns the template ID of each asset offered, None for assets without one"""
+        return [
+            nft["template"]["template_id"] if nft.get("template") else None
+            for nft in self._assets
+        ]
+
+    @property
+    def collection_name(self) -> str:
+        """Returns the name of the collection of the assets"""
+        return self._collection_name
+
+    @property
+    def state(self) -> int:
+        """Returns the state code, named in LISTING_STATES or BUYOFFER_STATES"""
+        return int(self._state)
+
+    @property
+    def completed_at(self) -> Optional[int]:
+        """Returns when the assets changed hands
+
+        Returns:
+            int: timestamp to millisecond precision, None if they did not
+        """
+        if self.state != self.completed:
+            return None
+        return int(self._updated_at_time)
+
+    @property
+    def created_at(self) -> int:
+        """Returns when the offer was made, to millisecond precision"""
+        return int(self._created_at_time)
+
+
+class Sale(MarketOffer):
+    """Class for instantizing AtomicMarket Sale Data"""
+
+    id_field = "sale_id"
+
+    @property
+    def offer_id(self) -> str:
+        """Returns the ID of the AtomicAssets offer behind the sale"""
+        return self._offer_id
+
+    def __str__(self):
+        state = LISTING_STATES.get(self.state, self.state)
+        return f"Sale {self.key}: {self.price} {self.token} ({state})"
+
+
+class Auction(MarketOffer):
+    """Class for instantizing AtomicMarket Auction Data"""
+
+    id_field = "auction_id"
+
+    @property
+    def end_time(self) -> int:
+        """Returns when bidding ends, to millisecond precision"""
+        return int(self._end_time)
+
+    @property
+    def bids(self) -> List[dict]:
+        """Returns the bids made, oldest first"""
+        return self._bids
+
+    def __str__(self):
+        state = LISTING_STATES.get(self.state, self.state)
+        return f"Auction {self.key}: {self.price} {self.token} ({state})"
+
+
+class BuyOffer(MarketOffer):
+    """Class for instantizing AtomicMarket Buyoffer Data"""
+
+    id_field = "buyoffer_id"
+
+    @property
+    def memo(self) -> str:
+        """Returns the memo of the buyoffer"""
+        return self._memo
+
+    def __str__(self):
+        state = BUYOFFER_STATES.get(self.state, self.state)
+        return f"BuyOffer {self.key}: {self.price} {self.token} ({state})"
+
+
+class PricePoint(AtomicBaseClass):
+    """Class for instantizing one day of AtomicMarket sale price history"""
+
+    def __init__(self, api_data):
+        """Creates a PricePoint data object from API data
+
+        Args:
+            api_data (dict): Data from the AtomicMarket API
+        """
+        super().__init__(api_data)
+        self.key = str(self._time)
+
+    @property
+    def time(self) -> int:
+        """Returns the start of the day, to millisecond precision"""
+        return int(self._time)
+
+    @property
+    def median(self) -> float:
+        """Returns the median sale price of the day, in tokens"""
+        return _amount(self._median, self._token_precision)
+
+    @property
+    def average(self) -> float:
+        """Returns the average sale price of the day, in tokens"""
+        return _amount(self._average, self._token_precision)
+
+    @property
+    def sales(self) -> int:
+        """Returns the number of sales of the day"""
+        return int(self._sales)
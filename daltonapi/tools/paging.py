@@ -0,0 +1,150 @@
+"""Paging
+
+Adaptive page size for paginated fetches. The controller measures the rows
+per second of every full page, and grows or shrinks the page size within
+bounds towards the fastest size seen. Failed requests and partial pages cut
+the size, and pages are kept under a response size limit."""
+
+import threading
+from typing import Dict, Optional
+
+
+class PageSizeController:
+    """Chooses the page size of the next request from the previous ones
+
+    Each full page moves the size one step in the current direction, and a
+    page slower than the one before reverses the direction. A failed request
+    divides the size by the step, and a partial page, where the server
+    returned fewer rows than asked for while more remain, lowers the size to
+    the rows returned. Both also cap later sizes, and the cap is raised by
+    one step after `recover_after` successful pages.
+
+    The controller can be shared by fetches of the same endpoint, and its
+    `size` or `best` passed as `initial` to a later controller.
+    """
+
+    def __init__(
+        self,
+        initial: int = 100,
+        minimum: int = 10,
+        maximum: int = 1000,
+        step: float = 2.0,
+        tolerance: float = 0.1,
+        max_bytes: int = 0,
+        recover_after: int = 10,
+    ):
+        """Creates a PageSizeController
+
+        Args:
+            initial (int, optional): size of the first page. Defaults to 100.
+            minimum (int, optional): smallest size used. Defaults to 10.
+            maximum (int, optional): largest size used. Defaults to 1000.
+            step (float, optional): factor the size grows or shrinks by. Defaults to 2.
+            tolerance (float, optional): share of throughput a page may lose before
+                the direction reverses, to ride out noise. Defaults to 0.1.
+            max_bytes (int, optional): largest response wanted, in bytes, 0 for no
+                limit. Defaults to 0.
+            recover_after (int, optional): successful pages before a cap set by an
+                error or partial page is raised. Defaults to 10.
+        """
+        assert 0 < minimum <= maximum, "Page size bounds must be 0 < minimum <= maximum"
+        assert step > 1, "Step must be greater than 1"
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.tolerance = tolerance
+        self.max_bytes = max_bytes
+        self.recover_after = recover_after
+        self.size = self._bounded(initial, maximum)
+        # rows per second measured at each size, smoothed
+        self.rates: Dict[int, float] = {}
+        self.requests = 0
+        self.errors = 0
+        self.partial = 0
+        self._ceiling = maximum
+        self._successes = 0
+        self._direction = 1
+        self._last_rate: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _bounded(self, size: float, ceiling: int) -> int:
+        return max(self.minimum, min(ceiling, self.maximum, int(size)))
+
+    @property
+    def best(self) -> int:
+        """Returns the size with the highest rows per second measured so far"""
+        with self._lock:
+            if not self.rates:
+                return self.size
+            return max(self.rates, key=self.rates.get)
+
+    def record(
+        self,
+        requested: int,
+        rows: int,
+        seconds: float,
+        size_bytes: int = 0,
+        more: bool = False,
+        error: bool = False,
+    ) -> int:
+        """Records the outcome of a request and picks the next page size
+
+        Args:
+            requested (int): page size of the request
+            rows (int): rows returned
+            seconds (float): request latency
+            size_bytes (int, optional): response size, 0 if unknown. Defaults to 0.
+            more (bool, optional): the server reported more rows after this
+                page. Defaults to False.
+            error (bool, optional): the request failed. Defaults to False.
+
+        Returns:
+            int: the next page size
+        """
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+                self._cap(requested / self.step)
+                return self.size
+            if more and 0 < rows < requested:
+                self.partial += 1
+                self._cap(rows)
+                return self.size
+            if self.max_bytes and size_bytes and rows:
+                self._ceiling = self._bounded(
+                    self.max_bytes * rows / size_bytes, self._ceiling
+                )
+            self._successes += 1
+            if self._successes >= self.recover_after and self._ceiling < self.maximum:
+                self._successes = 0
+                self._ceiling = self._bounded(self._ceiling * self.step, self.maximum)
+            if rows < requested or seconds <= 0:
+                # a short last page says nothing about the size
+                self.size = self._bounded(self.size, self._ceiling)
+                return self.size
+            rate = rows / seconds
+            known = self.rates.get(requested)
+            self.rates[requested] = rate if known is None else (known + rate) / 2
+            if self._last_rate is not None and rate < self._last_rate * (
+                1 - self.tolerance
+            ):
+                self._direction = -self._direction
+            self._last_rate = rate
+            factor = self.step if self._direction > 0 else 1 / self.step
+            self.size = self._bounded(requested * factor, self._ceiling)
+            if self.size == requested and self.size in (self._ceiling, self.minimum):
+                # at a bound, turn around so the other side is measured
+                self._direction = -self._direction
+            return self.size
+
+    def _cap(self, size: float):
+        """Lowers the size and caps later sizes after an error or partial page"""
+        self._ceiling = self._bounded(size, self.maximum)
+        self.size = self._ceiling
+        self._successes = 0
+        self._direction = -1
+        self._last_rate = None
+
+    def __repr__(self):
+        return f"PageSizeController(size={self.size}, best={self.best})"
@@ -0,0 +1,188 @@
+"""Serialization
+
+Compact encoding of many model objects. Collections, schemas and templates
+shared by many assets are stored once, and objects are restored without
+running their constructors, so large lists round-trip quickly through
+msgpack or pickle."""
+
+import gc
+import pickle
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+from . import atomic_classes, market_classes, wax_classes
+
+FORMAT_VERSION = 1
+
+# model classes by name, the names are stored in packed data
+MODELS: Dict[str, type] = {
+    name: cls
+    for module in (atomic_classes, market_classes, wax_classes)
+    for name, cls in vars(module).items()
+    if isinstance(cls, type)
+    and issubclass(cls, (atomic_classes.AtomicBaseClass, wax_classes.WaxBaseClass))
+}
+
+_MODEL_BASES = (atomic_classes.AtomicBaseClass, wax_classes.WaxBaseClass)
+
+# attributes that hold nested model objects
+_NESTED = ("_collection", "_schema", "_template")
+
+
+class _Packer:
+    """Builds the tables of packed data"""
+
+    def __init__(self):
+        self.types: Dict[str, int] = {}
+        self.shapes: Dict[Tuple[str, ...], int] = {}
+        self.entities: List[list] = []
+        # id of an object already stored -> (object, index), the object is
+        # kept so its id can't be reused
+        self._stored: Dict[int, Tuple[object, int]] = {}
+        # (type, key) -> [(record, index)] of entities already stored
+        self._seen: Dict[Tuple[str, str], List[Tuple[list, int]]] = {}
+
+    def record(self, obj) -> list:
+        """Returns [type, shape, values, references] of an object"""
+        name = type(obj).__name__
+        assert name in MODELS, f"{name} is not a model class"
+        state = vars(obj)
+        refs = {
+            field: self.entity(state[field])
+            for field in _NESTED
+            if isinstance(state.get(field), _MODEL_BASES)
+        }
+        if refs:
+            fields = tuple(field for field in state if field not in refs)
+            values = [state[field] for field in fields]
+        else:
+            fields, values = tuple(state), list(state.values())
+        shape = self.shapes.setdefault(fields, len(self.shapes))
+        return [self.types.setdefault(name, len(self.types)), shape, values, refs]
+
+    def entity(self, obj) -> int:
+        """Returns the index of a nested object, storing it once per content"""
+        stored = self._stored.get(id(obj))
+        if stored is not None:
+            return stored[1]
+        index = self._entity(obj)
+        self._stored[id(obj)] = (obj, index)
+        return index
+
+    def _entity(self, obj) -> int:
+        record = self.record(obj)
+        candidates = self._seen.setdefault((type(obj).__name__, obj.key), [])
+        for stored, index in candidates:
+            if stored == record:
+                return index
+        self.entities.append(record)
+        candidates.append((record, len(self.entities) - 1))
+        return len(self.entities) - 1
+
+
+def pack(objects: Iterable) -> dict:
+    """Packs model objects into plain data with shared entities stored once
+
+    Args:
+        objects (iterable): Asset, Transfer, Template, Schema, Collection, Account
+            or other model objects
+
+    Returns:
+        dict: data of plain lists, dicts and strings
+    """
+    packer = _Packer()
+    with _gc_paused():
+        items = [packer.record(obj) for obj in objects]
+    return {
+        "version": FORMAT_VERSION,
+        "types": list(packer.types),
+        "shapes": [list(shape) for shape in packer.shapes],
+        "entities": packer.entities,
+        "items": items,
+    }
+
+
+def unpack(data: dict) -> list:
+    """Restores the objects of pack
+
+    Args:
+        data (dict): data returned by pack
+
+    Returns:
+        list: the model objects, sharing restored entities
+    """
+    assert data["version"] == FORMAT_VERSION, "Unsupported packed data version"
+    types = [MODELS[name] for name in data["types"]]
+    shapes = [tuple(shape) for shape in data["shapes"]]
+    entities: list = []
+
+    def restore(record: list):
+        obj = object.__new__(types[record[0]])
+        state = dict(zip(shapes[record[1]], record[2]))
+        for field, index in record[3].items():
+            state[field] = entities[index]
+        obj.__dict__ = state
+        return obj
+
+    with _gc_paused():
+        for record in data["entities"]:
+            entities.append(restore(record))
+        return [restore(record) for record in data["items"]]
+
+
+def dumps(objects: Iterable, codec: str = "msgpack") -> bytes:
+    """Encodes model objects as bytes
+
+    Args:
+        objects (iterable): model objects
+        codec (str, optional): "msgpack", which needs the optional msgpack
+            package, or "pickle". Defaults to "msgpack".
+
+    Returns:
+        bytes: the encoded objects
+    """
+    packed = pack(objects)
+    if codec == "pickle":
+        return pickle.dumps(packed, protocol=pickle.HIGHEST_PROTOCOL)
+    return _msgpack().packb(packed, use_bin_type=True)
+
+
+def loads(data: bytes, codec: str = "msgpack") -> list:
+    """Decodes model objects encoded by dumps
+
+    Args:
+        data (bytes): encoded objects
+        codec (str, optional): "msgpack" or "pickle". Defaults to "msgpack".
+
+    Returns:
+        list: the model objects
+    """
+    with _gc_paused():
+        if codec == "pickle":
+            packed = pickle.loads(data)
+        else:
+            packed = _msgpack().unpackb(data, raw=False, strict_map_key=False)
+    return unpack(packed)
+
+
+@contextmanager
+def _gc_paused():
+    """Pauses the cyclic garbage collector, which slows down creating many objects"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _msgpack():
+    """Returns the msgpack module, which is an optional dependency"""
+    try:
+        import msgpack  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise ImportError(
+            "The msgpack codec needs msgpack, install daltonapi[msgpack]"
+        ) from exc
+    return msgpack
@@ -0,0 +1,590 @@
+"""Snapshot File
+
+Memory-mapped binary snapshots of assets and transfers. IDs, mints,
+timestamps and references to names are fixed-width columns, names are kept
+once in a sorted string table, and the remaining data of every row is a JSON
+record found through an offset index. Opening a snapshot maps the file
+without reading it, and objects are only built for the rows looked at.
+
+File layout, little-endian::
+
+    header     magic, format version, section count
+    sections   name, type code, offset and length of every section
+    data       the sections, each aligned to 8 bytes
+"""
+
+# pylint: disable=protected-access
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .atomic_classes import (
+    AtomicBaseClass,
+    Asset,
+    Collection,
+    Schema,
+    Template,
+    Transfer,
+)
+from .atomic_errors import SnapshotFormatError
+from .serialization import _gc_paused
+
+MAGIC = b"DLTNSNAP"
+FORMAT_VERSION = 1
+
+# reference to no string or entity
+NONE = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<24sc7xQQ")
+
+# nested objects of asset records, kept once in the entity table
+_ENTITIES = {"collection": Collection, "schema": Schema, "template": Template}
+
+# string columns of assets, in the order of _names
+_ASSET_STRINGS = ("owner", "name", "collection", "schema")
+
+
+def _int(value) -> int:
+    """Returns an integer column value, 0 for missing values"""
+    return int(value) if value not in (None, "") else 0
+
+
+def _record(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class _Blobs:
+    """Variable-length records behind an offset index"""
+
+    def __init__(self):
+        self.offsets = array("Q", [0])
+        self.data = bytearray()
+
+    def add(self, blob: bytes) -> int:
+        self.data += blob
+        self.offsets.append(len(self.data))
+        return len(self.offsets) - 2
+
+
+class _Entities(_Blobs):
+    """Collections, schemas and templates, each stored once per content"""
+
+    def __init__(self):
+        super().__init__()
+        # (field, key) -> [(attributes, index)] of entities already stored
+        self._seen: Dict[Tuple[str, str], List[Tuple[dict, int]]] = {}
+
+    def ref(self, field: str, entity) -> int:
+        """Returns the index of an entity, storing it if new"""
+        state = vars(entity)
+        candidates = self._seen.setdefault((field, entity.key), [])
+        for stored, index in candidates:
+            if stored == state:
+                return index
+        index = self.add(_record(entity.to_dict()))
+        candidates.append((state, index))
+        return index
+
+
+def _names(asset: Asset) -> Tuple[Optional[str], ...]:
+    """Returns the values of the string columns of an asset"""
+    state = vars(asset)
+    collection, schema = state.get("_collection"), state.get("_schema")
+    return (
+        state.get("_owner"),
+        state.get("_name"),
+        getattr(collection, "_collection_name", None),
+        getattr(schema, "_schema_name", None),
+    )
+
+
+def write_snapshot(
+    path: str, assets: Iterable[Asset] = (), transfers: Iterable[Transfer] = ()
+):
+    """Writes assets and transfers to a snapshot file
+
+    The file is written next to path and moved into place when complete.
+
+    Args:
+        path (str): snapshot file
+        assets (iterable, optional): Asset objects, later duplicates replace
+            earlier ones. Defaults to none.
+        transfers (iterable, optional): Transfer objects. Defaults to none.
+    """
+    with _gc_paused():
+        _write(path, _sections(assets, transfers))
+
+
+def _sections(
+    assets: Iterable[Asset], transfers: Iterable[Transfer]
+) -> Dict[str, Union[array, bytearray]]:
+    """Returns the sections of a snapshot"""
+    asset_rows = {int(asset.get_id()): asset for asset in assets}
+    transfer_rows = {int(transfer.get_id()): transfer for transfer in transfers}
+
+    names = set()
+    for asset in asset_rows.values():
+        names.update(_names(asset))
+    for transfer in transfer_rows.values():
+        names.update((transfer._sender_name, transfer._recipient_name))
+    names.discard(None)
+    strings = sorted(names)
+    string_index = {string: index for index, string in enumerate(strings)}
+    string_table = _Blobs()
+    for string in strings:
+        string_table.add(string.encode("utf-8"))
+
+    sections: Dict[str, Union[array, bytearray]] = {
+        "strings.offsets": string_table.offsets,
+        "strings.data": string_table.data,
+    }
+
+    entities = _Entities()
+    columns = {
+        "assets.id": array("Q"),
+        "assets.mint": array("I"),
+        "assets.template": array("Q"),
+        "assets.minted": array("Q"),
+        "assets.moved": array("Q"),
+    }
+    columns.update({f"assets.{column}": array("I") for column in _ASSET_STRINGS})
+    columns.update({f"assets.{field}_ref": array("I") for field in _ENTITIES})
+    records = _Blobs()
+    for asset_id in sorted(asset_rows):
+        asset = asset_rows[asset_id]
+        state = vars(asset)
+        columns["assets.id"].append(asset_id)
+        columns["assets.mint"].append(_int(state.get("_template_mint")))
+        template = state.get("_template")
+        columns["assets.template"].append(_int(getattr(template, "_template_id", None)))
+        columns["assets.minted"].append(_int(state.get("_minted_at_time")))
+        columns["assets.moved"].append(_int(state.get("_transferred_at_time")))
+        for column, value in zip(_ASSET_STRINGS, _names(asset)):
+            columns[f"assets.{column}"].append(string_index.get(value, NONE))
+        data = {}
+        for name, value in state.items():
+            if name.startswith("_"):
+                data[name[1:]] = value
+        for field in _ENTITIES:
+            ref = NONE
+            if isinstance(data.get(field), AtomicBaseClass):
+                ref = entities.ref(field, data.pop(field))
+            columns[f"assets.{field}_ref"].append(ref)
+        records.add(_record(data))
+    sections.update(columns)
+    sections.update(
+        {
+            "entities.offsets": entities.offsets,
+            "entities.data": entities.data,
+            "assets.offsets": records.offsets,
+            "assets.data": records.data,
+        }
+    )
+
+    columns = {
+        "transfers.id": array("Q"),
+        "transfers.time": array("Q"),
+        "transfers.sender": array("I"),
+        "transfers.recipient": array("I"),
+        "transfers.assets": array("Q", [0]),
+        "transfers.asset_ids": array("Q"),
+    }
+    records = _Blobs()
+    for transfer_id in sorted(transfer_rows):
+        data = transfer_rows[transfer_id].to_dict()
+        columns["transfers.id"].append(transfer_id)
+        columns["transfers.time"].append(_int(data.get("created_at_time")))
+        for column, key in (("sender", "sender_name"), ("recipient", "recipient_name")):
+            columns[f"transfers.{column}"].append(string_index.get(data.get(key), NONE))
+        columns["transfers.asset_ids"].extend(
+            int(asset["asset_id"]) for asset in data.get("assets") or ()
+        )
+        columns["transfers.assets"].append(len(columns["transfers.asset_ids"]))
+        records.add(_record(data))
+    sections.update(columns)
+    sections.update(
+        {"transfers.offsets": records.offsets, "transfers.data": records.data}
+    )
+
+    return sections
+
+
+def _write(path: str, sections: Dict[str, Union[array, bytearray]]):
+    """Writes the header, section table and sections of a snapshot"""
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table, blobs = [], []
+    for name, values in sections.items():
+        if isinstance(values, array):
+            code = values.typecode
+            if sys.byteorder == "big":
+                values = array(code, values)
+                values.byteswap()
+            blob = values.tobytes()
+        else:
+            code, blob = "B", bytes(values)
+        offset += -offset % 8
+        table.append(_SECTION.pack(name.encode(), code.encode(), offset, len(blob)))
+        blobs.append((offset, blob))
+        offset += len(blob)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        file.write(b"".join(table))
+        for start, blob in blobs:
+            file.write(b"\0" * (start - file.tell()))
+            file.write(blob)
+    os.replace(temp, path)
+
+
+class _Strings:
+    """Sorted string table, decoding strings as they are read"""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+        self._cache: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index == NONE:
+            return None
+        string = self._cache.get(index)
+        if string is None:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            string = self._cache[index] = str(self._data[start:end], "utf-8")
+        return string
+
+    def find(self, string: str) -> int:
+        """Returns the index of a string, or NONE"""
+        index = bisect.bisect_left(self, string)
+        return index if index < len(self) and self[index] == string else NONE
+
+
+class AssetRow:
+    """Column values of one asset in a snapshot, read without building the Asset"""
+
+    __slots__ = ("snapshot", "index")
+
+    def __init__(self, snapshot: "SnapshotFile", index: int):
+        """Creates an AssetRow
+
+        Args:
+            snapshot (SnapshotFile): the open snapshot
+            index (int): position of the asset in the snapshot
+        """
+        self.snapshot = snapshot
+        self.index = index
+
+    def _string(self, column: str) -> Optional[str]:
+        snapshot = self.snapshot
+        return snapshot.strings[snapshot.column(column)[self.index]]
+
+    @property
+    def asset_id(self) -> str:
+        """Returns the asset ID"""
+        return str(self.snapshot.column("assets.id")[self.index])
+
+    @property
+    def owner(self) -> Optional[str]:
+        """Returns the owner, None for burned assets"""
+        return self._string("assets.owner")
+
+    @property
+    def name(self) -> Optional[str]:
+        """Returns the asset name"""
+        return self._string("assets.name")
+
+    @property
+    def collection(self) -> Optional[str]:
+        """Returns the collection name"""
+        return self._string("assets.collection")
+
+    @property
+    def schema(self) -> Optional[str]:
+        """Returns the schema name"""
+        return self._string("assets.schema")
+
+    @property
+    def template_id(self) -> Optional[str]:
+        """Returns the template ID, None for assets without a template"""
+        template_id = self.snapshot.column("assets.template")[self.index]
+        return str(template_id) if template_id else None
+
+    @property
+    def template_mint(self) -> int:
+        """Returns the template mint number, 0 when unknown"""
+        return self.snapshot.column("assets.mint")[self.index]
+
+    @property
+    def minted_at(self) -> int:
+        """Returns the mint time in milliseconds"""
+        return self.snapshot.column("assets.minted")[self.index]
+
+    @property
+    def transferred_at(self) -> int:
+        """Returns the time of the last transfer in milliseconds"""
+        return self.snapshot.column("assets.moved")[self.index]
+
+    def asset(self) -> Asset:
+        """Builds the Asset of the row"""
+        return self.snapshot.asset(self.index)
+
+    def __repr__(self):
+        return f"AssetRow({self.asset_id})"
+
+
+class SnapshotFile:
+    """Read-only view of a snapshot file written by write_snapshot
+
+    Columns are read straight from the mapped file. Collections, schemas and
+    templates built for assets are shared between the assets using them.
+    """
+
+    def __init__(self, path: str):
+        """Opens a snapshot
+
+        Args:
+            path (str): snapshot file
+
+        Raises:
+            SnapshotFormatError: When the file is not a snapshot of this version
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = [memoryview(self._mmap)]
+        self._columns: Dict[str, memoryview] = {}
+        # section name -> (offset, length, type code)
+        self._sections: Dict[str, Tuple[int, int, str]] = {}
+        try:
+            self._read_sections()
+        except SnapshotFormatError:
+            self.close()
+            raise
+        self.strings = _Strings(
+            self.column("strings.offsets"), self.column("strings.data")
+        )
+        self._entities: Dict[int, object] = {}
+
+    def _read_sections(self):
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotFormatError(self.path, "file too short")
+        magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotFormatError(self.path, "bad magic number")
+        if version != FORMAT_VERSION:
+            raise SnapshotFormatError(self.path, f"unsupported version {version}")
+        if _HEADER.size + count * _SECTION.size > len(self._mmap):
+            raise SnapshotFormatError(self.path, "truncated section table")
+        base = self._views[0]
+        for position in range(count):
+            name, code, offset, length = _SECTION.unpack_from(
+                self._mmap, _HEADER.size + position * _SECTION.size
+            )
+            if offset + length > len(self._mmap):
+                raise SnapshotFormatError(self.path, "truncated section")
+            view = base[offset : offset + length]
+            self._views.append(view)
+            code = code.decode()
+            if code != "B":
+                if sys.byteorder == "big":
+                    values = array(code, view.tobytes())
+                    values.byteswap()
+                    view = memoryview(values)
+                else:
+                    view = view.cast(code)
+                self._views.append(view)
+            name = name.rstrip(b"\0").decode()
+            self._columns[name] = view
+            self._sections[name] = (offset, length, code)
+
+    def close(self):
+        """Releases the mapped file, rows read from it can't be used afterwards"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "SnapshotFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name: str) -> memoryview:
+        """Returns a column, such as "assets.id" or "transfers.time"
+
+        Args:
+            name (str): section name
+
+        Returns:
+            memoryview: the values, read from the file when indexed
+        """
+        return self._columns[name]
+
+    def positions(self, name: str, value: int) -> List[int]:
+        """Returns the positions of a value in a column
+
+        The mapped bytes are searched directly, so no value is read into Python.
+
+        Args:
+            name (str): section name
+            value (int): value searched for
+
+        Returns:
+            list: positions, in order
+        """
+        offset, length, code = self._sections[name]
+        pattern = struct.pack(f"<{code}", value)
+        size = len(pattern)
+        found, start, end = [], offset, offset + length
+        while True:
+            match = self._mmap.find(pattern, start, end)
+            if match < 0:
+                return found
+            if (match - offset) % size:
+                start = match + 1
+            else:
+                found.append((match - offset) // size)
+                start = match + size
+
+    def __len__(self) -> int:
+        return len(self._columns["assets.id"])
+
+    def __iter__(self) -> Iterator[AssetRow]:
+        return (AssetRow(self, index) for index in range(len(self)))
+
+    def find(self, asset_id: str) -> int:
+        """Returns the position of an asset by binary search, or -1
+
+        Args:
+            asset_id (str): asset ID
+
+        Returns:
+            int: position of the asset, -1 if not in the snapshot
+        """
+        ids = self._columns["assets.id"]
+        key = int(asset_id)
+        index = bisect.bisect_left(ids, key)
+        return index if index < len(ids) and ids[index] == key else -1
+
+    def row(self, asset_id: str) -> Optional[AssetRow]:
+        """Returns the columns of an asset, or None"""
+        index = self.find(asset_id)
+        return AssetRow(self, index) if index >= 0 else None
+
+    def get_asset(self, asset_id: str) -> Optional[Asset]:
+        """Builds an asset, or returns None when it is not in the snapshot"""
+        index = self.find(asset_id)
+        return self.asset(index) if index >= 0 else None
+
+    def _blob(self, section: str, index: int) -> bytes:
+        offsets = self._columns[f"{section}.offsets"]
+        return self._columns[f"{section}.data"][offsets[index] : offsets[index + 1]]
+
+    def _entity(self, field: str, ref: int):
+        entity = self._entities.get(ref)
+        if entity is None:
+            data = json.loads(self._blob("entities", ref).tobytes())
+            entity = self._entities[ref] = _ENTITIES[field](data)
+        return entity
+
+    def asset(self, index: int) -> Asset:
+        """Builds the asset at a position
+
+        Args:
+            index (int): position, from 0 to len(snapshot) - 1
+
+        Returns:
+            Asset: the asset
+        """
+        asset = Asset(json.loads(self._blob("assets", index).tobytes()))
+        for field in _ENTITIES:
+            ref = self._columns[f"assets.{field}_ref"][index]
+            if ref != NONE:
+                setattr(asset, f"_{field}", self._entity(field, ref))
+        return asset
+
+    def select(
+        self, owner: str = "", collection: str = "", schema: str = "", template=""
+    ) -> Iterator[AssetRow]:
+        """Yields the rows matching every filter given, scanning only those columns
+
+        Args:
+            owner (str, optional): owner account. Defaults to "".
+            collection (str, optional): collection name. Defaults to "".
+            schema (str, optional): schema name. Defaults to "".
+            template (str, optional): template ID. Defaults to "".
+
+        Yields:
+            AssetRow: the matching rows, by asset ID
+        """
+        checks: List[Tuple[str, int]] = []
+        for column, value in (
+            ("owner", owner),
+            ("collection", collection),
+            ("schema", schema),
+        ):
+            if value:
+                index = self.strings.find(value)
+                if index == NONE:
+                    return
+                checks.append((f"assets.{column}", index))
+        if template:
+            checks.append(("assets.template", int(template)))
+        if not checks:
+            yield from self
+            return
+        positions = self.positions(*checks[0])
+        for name, value in checks[1:]:
+            column = self._columns[name]
+            positions = [index for index in positions if column[index] == value]
+        for index in positions:
+            yield AssetRow(self, index)
+
+    @property
+    def transfer_count(self) -> int:
+        """Returns the number of transfers in the snapshot"""
+        return len(self._columns["transfers.id"])
+
+    def transfer(self, index: int) -> Transfer:
+        """Builds the transfer at a position, transfers are ordered by ID"""
+        return Transfer(json.loads(self._blob("transfers", index).tobytes()))
+
+    def get_transfer(self, transfer_id: str) -> Optional[Transfer]:
+        """Builds a transfer, or returns None when it is not in the snapshot"""
+        ids = self._columns["transfers.id"]
+        key = int(transfer_id)
+        index = bisect.bisect_left(ids, key)
+        if index < len(ids) and ids[index] == key:
+            return self.transfer(index)
+        return None
+
+    def transfers(self) -> Iterator[Transfer]:
+        """Yields every transfer, by transfer ID"""
+        return (self.transfer(index) for index in range(self.transfer_count))
+
+    def transfers_of(self, asset_id: str) -> List[Transfer]:
+        """Returns the transfers that moved an asset, by transfer ID
+
+        Args:
+            asset_id (str): asset ID
+
+        Returns:
+            list: Transfer objects
+        """
+        starts = self._columns["transfers.assets"]
+        positions = [
+            bisect.bisect_right(starts, position) - 1
+            for position in self.positions("transfers.asset_ids", int(asset_id))
+        ]
+        return [self.transfer(index) for index in sorted(set(positions))]
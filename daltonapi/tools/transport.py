@@ -0,0 +1,510 @@
+"""Transport
+
+Pluggable HTTP backends used by the API clients"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .atomic_errors import NoRecordingError
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger("daltonapi")
+
+
+class Response(NamedTuple):
+    """An HTTP response returned by a Transport
+
+    `elapsed` is the time in seconds until the response headers arrived.
+    `headers` is None when the transport has none to report.
+    """
+
+    status_code: int
+    content: bytes
+    headers: Optional[Dict[str, str]] = None
+    elapsed: float = 0.0
+
+
+def request_key(
+    method: str, url: str, params: Optional[dict] = None, body: Optional[dict] = None
+) -> str:
+    """Returns a stable key identifying a request
+
+    Args:
+        method (str): HTTP method
+        url (str): URL without query string
+        params (dict, optional): query parameters. Defaults to None.
+        body (dict, optional): JSON body. Defaults to None.
+
+    Returns:
+        str: hex digest
+    """
+    canonical = json.dumps(
+        [method.upper(), url, params or {}, body or {}], sort_keys=True, default=str
+    )
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+class Transport:
+    """Sends HTTP requests for Atom, Wax and WaxTable
+
+    Subclasses implement request. Exceptions listed in retry_errors are
+    retried by the clients when they are created with retries.
+    """
+
+    retry_errors: Tuple[type, ...] = ()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[dict] = None,
+        json: Optional[dict] = None,  # pylint: disable=redefined-outer-name
+        headers: Optional[dict] = None,
+    ) -> Response:
+        """Sends a request
+
+        Args:
+            method (str): HTTP method
+            url (str): URL without query string
+            params (dict, optional): query parameters. Defaults to None.
+            json (dict, optional): JSON body. Defaults to None.
+            headers (dict, optional): extra request headers. Defaults to None.
+
+        Returns:
+            Response: the response
+        """
+        raise NotImplementedError
+
+    async def request_async(
+        self,
+        method: str,
+        url: str,
+        params: Optional[dict] = None,
+        json: Optional[dict] = None,  # pylint: disable=redefined-outer-name
+        headers: Optional[dict] = None,
+    ) -> Response:
+        """Sends a request from a coroutine
+
+        Transports without native async support run request in the default
+        executor.
+
+        Returns:
+            Response: the response
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: self.request(method, url, params, json, headers)
+        )
+
+    def close(self):
+        """Releases any connections held by the transport"""
+
+
+class RequestsTransport(Transport):
+    """Default transport, a pooled requests Session"""
+
+    def __init__(self, timeout: Optional[float] = None, pool_size: int = 32):
+        """Creates a RequestsTransport
+
+        Args:
+            timeout (float, optional): seconds before a request times out. Defaults to None.
+            pool_size (int, optional): connections kept open per host. Defaults to 32.
+        """
+        import requests  # pylint: disable=import-outside-toplevel
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.retry_errors = (requests.ConnectionError, requests.Timeout)
+
+    def request(self, method, url, params=None, json=None, headers=None) -> Response:
+        response = self.session.request(
+            method, url, params=params, json=json, headers=headers, timeout=self.timeout
+        )
+        return Response(
+            response.status_code,
+            response.content,
+            dict(response.headers),
+            response.elapsed.total_seconds(),
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class Http2Transport(Transport):
+    """Multiplexes requests over a few HTTP/2 connections
+
+    Needs the optional httpx dependency, installed with
+    ``pip install daltonapi[http2]``. Hosts that do not offer HTTP/2 are
+    spoken to over HTTP/1.1 instead.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        max_streams: int = 100,
+        timeout: Optional[float] = None,
+        prior_knowledge: bool = False,
+    ):
+        """Creates an Http2Transport
+
+        Args:
+            max_connections (int, optional): connections opened per host. Defaults to 4.
+            max_streams (int, optional): requests in flight on each connection.
+                Defaults to 100.
+            timeout (float, optional): seconds before a request times out. Defaults to None.
+            prior_knowledge (bool, optional): speak HTTP/2 to http:// URLs without
+                negotiating first. Defaults to False.
+        """
+        try:
+            import httpx  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise ImportError(
+                "Http2Transport needs httpx, install daltonapi[http2]"
+            ) from exc
+        try:
+            import h2  # pylint: disable=import-outside-toplevel,unused-import
+
+            self.http2 = True
+        except ImportError:
+            logger.warning("h2 is not installed, Http2Transport falls back to HTTP/1.1")
+            self.http2 = False
+        self._httpx = httpx
+        self.max_connections = max_connections
+        self.max_streams = max_streams
+        self.timeout = timeout
+        self.prior_knowledge = prior_knowledge and self.http2
+        self.retry_errors = (httpx.TransportError,)
+        self.versions: Counter = Counter()
+        self._streams = threading.BoundedSemaphore(max_connections * max_streams)
+        self._async_streams: Optional["asyncio.Semaphore"] = None
+        self._lock = threading.Lock()
+        self._client = self._make_client(httpx.Client)
+        self._async_client = None
+        # async clients replaced by a fall back, waiting to be closed
+        self._retired: list = []
+
+    def _make_client(self, cls):
+        """Returns an httpx Client or AsyncClient for the current settings"""
+        return cls(
+            http1=not self.prior_knowledge,
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=self._httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    def _fall_back(self, client) -> bool:
+        """Stops speaking HTTP/2 without negotiation after the server rejected it
+
+        The rejected sync client is closed at once. The async client is closed
+        from the async path, by the next async request or aclose.
+
+        Args:
+            client: the client whose request failed
+
+        Returns:
+            bool: whether the request should be sent again
+        """
+        with self._lock:
+            if client is not self._client and client is not self._async_client:
+                return True
+            if not self.prior_knowledge:
+                return False
+            logger.warning("HTTP/2 prior knowledge rejected, falling back to HTTP/1.1")
+            self.prior_knowledge = False
+            rejected, self._client = self._client, self._make_client(self._httpx.Client)
+            if self._async_client is not None:
+                self._retired.append(self._async_client)
+                self._async_client = None
+        rejected.close()
+        return True
+
+    async def _close_retired(self):
+        """Closes the async clients replaced by a fall back"""
+        with self._lock:
+            retired, self._retired = self._retired, []
+        for client in retired:
+            await client.aclose()
+
+    def _response(self, response) -> Response:
+        """Converts an httpx response"""
+        self.versions[response.http_version] += 1
+        return Response(
+            response.status_code,
+            response.content,
+            dict(response.headers),
+            response.elapsed.total_seconds(),
+        )
+
+    def _get_async_client(self):
+        """Returns the AsyncClient, created on first use"""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = self._make_client(self._httpx.AsyncClient)
+            if self._async_streams is None:
+                self._async_streams = asyncio.Semaphore(
+                    self.max_connections * self.max_streams
+                )
+            return self._async_client
+
+    def request(self, method, url, params=None, json=None, headers=None) -> Response:
+        with self._streams:
+            client = self._client
+            try:
+                response = client.request(
+                    method, url, params=params, json=json, headers=headers
+                )
+            except self._httpx.RemoteProtocolError:
+                if not self._fall_back(client):
+                    raise
+                response = self._client.request(
+                    method, url, params=params, json=json, headers=headers
+                )
+        return self._response(response)
+
+    async def request_async(
+        self, method, url, params=None, json=None, headers=None
+    ) -> Response:
+        client = self._get_async_client()
+        async with self._async_streams:
+            try:
+                response = await client.request(
+                    method, url, params=params, json=json, headers=headers
+                )
+            except self._httpx.RemoteProtocolError:
+                if not self._fall_back(client):
+                    raise
+                await self._close_retired()
+                response = await self._get_async_client().request(
+                    method, url, params=params, json=json, headers=headers
+                )
+        return self._response(response)
+
+    def close(self):
+        self._client.close()
+
+    async def aclose(self):
+        """Releases the connections held by the async client"""
+        await self._close_retired()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+
+
+class MemoryTransport(Transport):
+    """Serves fixture data from memory, without any network access"""
+
+    def __init__(
+        self,
+        handler: Optional[Callable[..., tuple]] = None,
+    ):
+        """Creates a MemoryTransport
+
+        Args:
+            handler (callable, optional): called as handler(method, url, params, json,
+                headers) for requests without a fixture, returning (status, payload)
+                or (status, payload, headers). Defaults to None.
+        """
+        self.handler = handler
+        self.calls: List[Tuple[str, str, dict, dict]] = []
+        self._exact: Dict[str, Response] = {}
+        self._any: Dict[Tuple[str, str], Response] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        payload,
+        status: int = 200,
+        params: Optional[dict] = None,
+        json: Optional[dict] = None,  # pylint: disable=redefined-outer-name
+        headers: Optional[dict] = None,
+    ):
+        """Adds a fixture
+
+        Without params or json the fixture answers every request to the URL.
+
+        Args:
+            method (str): HTTP method
+            url (str): URL without query string
+            payload: JSON serializable response body, or bytes
+            status (int, optional): response status. Defaults to 200.
+            params (dict, optional): query parameters to match. Defaults to None.
+            json (dict, optional): JSON body to match. Defaults to None.
+            headers (dict, optional): response headers. Defaults to None.
+        """
+        response = Response(status, _encode(payload), dict(headers or {}))
+        if params is None and json is None:
+            self._any[(method.upper(), url)] = response
+        else:
+            self._exact[request_key(method, url, params, json)] = response
+
+    def request(self, method, url, params=None, json=None, headers=None) -> Response:
+        with self._lock:
+            self.calls.append((method.upper(), url, dict(params or {}), json))
+        response = self._exact.get(request_key(method, url, params, json))
+        if response is None:
+            response = self._any.get((method.upper(), url))
+        if response is None and self.handler is not None:
+            reply = self.handler(
+                method.upper(), url, params or {}, json, dict(headers or {})
+            )
+            response = Response(
+                reply[0], _encode(reply[1]), dict(reply[2]) if len(reply) > 2 else {}
+            )
+        if response is None:
+            return Response(404, b'{"success": false, "message": "No fixture"}')
+        return response
+
+
+class _Recordings:
+    """Recorded responses of a RecordReplayTransport, written to disk when flushed"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.responses: Dict[str, dict] = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.responses = json.load(file)
+
+    def add(self, key: str, recording: dict):
+        with self.lock:
+            self.responses[key] = recording
+            self.dirty = True
+
+    def flush(self, force: bool = False):
+        """Writes the responses to disk if any were recorded since the last write"""
+        with self.lock:
+            if not (self.dirty or force):
+                return
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as file:
+                json.dump(self.responses, file, indent=1, sort_keys=True)
+            os.replace(temp, self.path)
+            self.dirty = False
+
+
+class RecordReplayTransport(Transport):
+    """Records responses of another transport to disk, and plays them back
+
+    In "record" mode every request goes to the wrapped transport and its
+    response is kept, unless it is a 304 answering a conditional request,
+    which would replace the recorded body with an empty one. In "replay" mode responses only come from the
+    recording. "auto" replays what was recorded and records the rest.
+    New recordings are written to disk by flush, on close or when leaving
+    a with block, and when the transport is garbage collected or the
+    interpreter exits.
+    """
+
+    def __init__(
+        self, path: str, mode: str = "auto", transport: Optional[Transport] = None
+    ):
+        """Creates a RecordReplayTransport
+
+        Args:
+            path (str): JSON file holding the recorded responses
+            mode (str, optional): "record", "replay" or "auto". Defaults to "auto".
+            transport (Transport, optional): transport used to record. Defaults to
+                a RequestsTransport.
+        """
+        assert mode in (
+            "record",
+            "replay",
+            "auto",
+        ), "Mode must be record, replay or auto"
+        self.path = path
+        self.mode = mode
+        self._transport = transport
+        self._recordings = _Recordings(path)
+        weakref.finalize(self, self._recordings.flush)
+
+    @property
+    def transport(self) -> Transport:
+        """Returns the wrapped transport, created on first use"""
+        if self._transport is None:
+            self._transport = RequestsTransport()
+        return self._transport
+
+    @property
+    def retry_errors(self):
+        return self.transport.retry_errors if self.mode != "replay" else ()
+
+    def request(self, method, url, params=None, json=None, headers=None) -> Response:
+        key = request_key(method, url, params, json)
+        recording = self._recordings.responses.get(key)
+        if recording is not None and self.mode != "record":
+            return Response(
+                recording["status"],
+                recording["body"].encode("utf-8"),
+                recording["headers"],
+            )
+        if self.mode == "replay":
+            raise NoRecordingError(method, url)
+        start = time.perf_counter()
+        response = self.transport.request(method, url, params, json, headers)
+        # a 304 answers a conditional request and has no body to replay
+        if response.status_code == 304:
+            return response
+        self._recordings.add(
+            key,
+            {
+                "method": method.upper(),
+                "url": url,
+                "params": params,
+                "json": json,
+                "status": response.status_code,
+                "headers": dict(response.headers or {}),
+                "body": response.content.decode("utf-8"),
+                "elapsed": response.elapsed or time.perf_counter() - start,
+            },
+        )
+        return response
+
+    def flush(self):
+        """Writes responses recorded since the last write to disk"""
+        self._recordings.flush()
+
+    def save(self):
+        """Writes all the recorded responses to disk"""
+        self._recordings.flush(force=True)
+
+    def close(self):
+        self.flush()
+        if self._transport is not None:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _encode(payload) -> bytes:
+    """Encodes a fixture payload as a response body"""
+    if isinstance(payload, bytes):
+        return payload
+    return json.dumps(payload).encode("utf-8")
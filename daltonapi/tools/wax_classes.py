@@ -3,6 +3,9 @@
 Uses other endpoints for more information
 """
 
+from typing import Dict, Optional, Tuple
+
+
 class WaxBaseClass:
     """Template class for WAX API data"""
 
@@ -35,6 +38,30 @@ class WaxBaseClass:
     #         data = conversions[key](data)
     #     return (key, data)
 
+    def to_dict(self) -> dict:
+        """Returns the API data the object was created from
+
+        Returns:
+            dict: Data that from_dict turns back into an equal object
+        """
+        return {
+            name[1:]: value
+            for name, value in vars(self).items()
+            if name.startswith("_")
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WaxBaseClass":
+        """Creates the object from data returned by to_dict
+
+        Args:
+            data (dict): Data from to_dict or the WAX API
+
+        Returns:
+            WaxBaseClass: the object
+        """
+        return cls(data)
+
     def get_id(self):
         """Returns the primary atomic assets identifier of the object
         E.g. For an asset, returns asset id. For a schema, returns schema name
@@ -46,37 +73,65 @@ class WaxBaseClass:
         return self.key
 
 
+def _memoized(method):
+    """Turns a method into a property computed once per object
+
+    The value is kept in the object's __dict__ under the property name, which
+    to_dict leaves out.
+    """
+    name = method.__name__
+
+    class Memoized:
+        def __get__(self, obj, cls=None):
+            if obj is None:
+                return self
+            value = obj.__dict__[name] = method(obj)
+            return value
+
+    Memoized.__doc__ = method.__doc__
+    return Memoized()
+
+
+def _wax(amount: Optional[str]) -> float:
+    """Returns the amount of an asset string such as "12.50000000 WAX" as a float"""
+    if not amount:
+        return 0.0
+    return float(amount.split(" ", 1)[0])
+
+
 class Account(WaxBaseClass):
-    """Class for WAX accounts"""
+    """Class for WAX accounts
+
+    Balances and resources are parsed on first access and kept.
+    """
 
     def __init__(self, api_data: dict):
         super().__init__(api_data)
         self.key = self._account_name
 
-    @property
-    def balance(self):
-        """Returns liquid balance of account
+    @_memoized
+    def balance(self) -> float:
+        """Returns liquid balance of account, 0 when the account holds no WAX
 
         Returns:
             float: Liquid Balance
         """
-        bal = float(self._core_liquid_balance.rstrip(" WAX"))
-        return bal
+        return _wax(getattr(self, "_core_liquid_balance", None))
 
-    @property
-    def staked_balance(self):
+    @_memoized
+    def staked_balance(self) -> Dict[str, float]:
         """Returns staked balance
 
         Returns:
             dict: {"cpu":float,"net":float}
         """
-        resources = self._total_resources
-        net = float(resources["net_weight"].rstrip(" WAX"))
-        cpu = float(resources["cpu_weight"].rstrip(" WAX"))
+        resources = getattr(self, "_total_resources", None) or {}
+        net = _wax(resources.get("net_weight"))
+        cpu = _wax(resources.get("cpu_weight"))
         return {"cpu": cpu, "net": net}
 
-    @property
-    def total_balance(self):
+    @_memoized
+    def total_balance(self) -> float:
         """Returns total account balance
 
         Returns:
@@ -84,3 +139,35 @@ class Account(WaxBaseClass):
         """
         staked = self.staked_balance
         return self.balance + staked["cpu"] + staked["net"]
+
+    @_memoized
+    def cpu(self) -> Tuple[int, int]:
+        """Returns CPU usage
+
+        Returns:
+            tuple: (used, max) in microseconds
+        """
+        limit = getattr(self, "_cpu_limit", None) or {}
+        return (int(limit.get("used", 0)), int(limit.get("max", 0)))
+
+    @_memoized
+    def net(self) -> Tuple[int, int]:
+        """Returns NET usage
+
+        Returns:
+            tuple: (used, max) in bytes
+        """
+        limit = getattr(self, "_net_limit", None) or {}
+        return (int(limit.get("used", 0)), int(limit.get("max", 0)))
+
+    @_memoized
+    def ram(self) -> Tuple[int, int]:
+        """Returns RAM usage
+
+        Returns:
+            tuple: (usage, quota) in bytes
+        """
+        return (
+            int(getattr(self, "_ram_usage", 0)),
+            int(getattr(self, "_ram_quota", 0)),
+        )
@@ -0,0 +1,337 @@
+"""Watcher
+
+Polls many owners and collections for new assets and transfers. Targets
+are packed into combined comma-separated queries, and each target's
+polling interval adapts to how active it has been recently."""
+
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from .tools.atomic_classes import Asset, AtomicBaseClass, Transfer
+from .tools.batching import chunk_values
+
+WATCH_KINDS = ("assets", "transfers")
+
+# query field used for each kind of target, per watched endpoint
+_FIELDS = {
+    ("assets", "owner"): "owner",
+    ("assets", "collection"): "collection_name",
+    ("transfers", "owner"): "account",
+    ("transfers", "collection"): "collection_name",
+}
+
+
+class WatchEvent(NamedTuple):
+    """A new asset or transfer seen for a watched target"""
+
+    kind: str
+    target: str
+    item: AtomicBaseClass
+    detected_at: float
+    lag: float
+
+
+class WatcherStats:
+    """Counters describing the work done by a Watcher"""
+
+    def __init__(self, request_budget: Optional[int] = None):
+        """Creates an empty set of counters
+
+        Args:
+            request_budget (int, optional): Requests allowed per budget window.
+                Defaults to None (unlimited).
+        """
+        self.request_budget = request_budget
+        self.requests = 0
+        self.budget_used = 0
+        self.polls = 0
+        self.events = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def mean_lag(self) -> float:
+        """Average seconds between an item's creation and its detection
+
+        Returns:
+            float: mean lag in seconds
+        """
+        if not self.events:
+            return 0.0
+        return self.total_lag / self.events
+
+    @property
+    def budget_remaining(self) -> Optional[int]:
+        """Requests left in the current budget window
+
+        Returns:
+            int: remaining requests, or None when unlimited
+        """
+        if self.request_budget is None:
+            return None
+        return max(0, self.request_budget - self.budget_used)
+
+    def __repr__(self):
+        return (
+            f"WatcherStats(requests={self.requests}, events={self.events}, "
+            f"mean_lag={self.mean_lag:.2f}, budget_used={self.budget_used})"
+        )
+
+
+class _Target:
+    """Polling state of a single watched owner or collection"""
+
+    def __init__(self, name: str, field: str, interval: float):
+        self.name = name
+        self.field = field
+        self.interval = interval
+        self.next_due = 0.0
+        self.watermarks: Dict[str, Optional[int]] = {kind: None for kind in WATCH_KINDS}
+
+
+class Watcher:
+    """Watches many owners and collections for new assets and transfers"""
+
+    def __init__(
+        self,
+        atom,
+        owners: List[str] = None,
+        collections: List[str] = None,
+        watch: tuple = WATCH_KINDS,
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        batch_size: int = 50,
+        max_chars: int = 1500,
+        limit: int = 100,
+        max_pages: int = 5,
+        request_budget: Optional[int] = None,
+        budget_window: float = 60.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Creates a Watcher
+
+        Args:
+            atom (Atom): Atom used to query the AtomicAssets API
+            owners (list[str], optional): account names to watch. Defaults to None.
+            collections (list[str], optional): collection names to watch. Defaults to None.
+            watch (tuple, optional): kinds of item to watch, "assets" and/or "transfers".
+            min_interval (float, optional): seconds between polls of an active target. Defaults to 5.
+            max_interval (float, optional): longest back-off for an idle target. Defaults to 300.
+            backoff (float, optional): interval multiplier after an idle poll. Defaults to 2.
+            batch_size (int, optional): maximum targets packed in one query. Defaults to 50.
+            max_chars (int, optional): maximum encoded length of a packed filter value. Defaults to 1500.
+            limit (int, optional): page size of each query. Defaults to 100.
+            max_pages (int, optional): pages fetched per batch before giving up. Defaults to 5.
+            request_budget (int, optional): requests allowed per budget window. Defaults to None.
+            budget_window (float, optional): length of the budget window in seconds. Defaults to 60.
+            clock (callable, optional): time source, in seconds. Defaults to time.time.
+            sleep (callable, optional): waits a number of seconds of the clock.
+                Defaults to time.sleep.
+        """
+        for kind in watch:
+            assert kind in WATCH_KINDS, f"Cannot watch {kind}"
+        self.atom = atom
+        self.watch = tuple(watch)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.limit = limit
+        self.max_pages = max_pages
+        self.budget_window = budget_window
+        self.stats = WatcherStats(request_budget)
+        self._clock = clock
+        self._sleep = sleep
+        self._window_start = clock()
+        self._callbacks: List[Callable[[WatchEvent], None]] = []
+        self._targets: Dict[tuple, _Target] = {}
+        for owner in owners or []:
+            self.add_target(owner, "owner")
+        for collection in collections or []:
+            self.add_target(collection, "collection")
+
+    def add_target(self, name: str, field: str = "owner"):
+        """Starts watching an owner or a collection
+
+        Args:
+            name (str): account or collection name
+            field (str, optional): "owner" or "collection". Defaults to "owner".
+        """
+        assert field in ("owner", "collection"), "Field must be owner or collection"
+        key = (field, name)
+        if key not in self._targets:
+            self._targets[key] = _Target(name, field, self.min_interval)
+
+    def remove_target(self, name: str, field: str = "owner"):
+        """Stops watching an owner or a collection
+
+        Args:
+            name (str): account or collection name
+            field (str, optional): "owner" or "collection". Defaults to "owner".
+        """
+        self._targets.pop((field, name), None)
+
+    def add_callback(self, callback: Callable[[WatchEvent], None]):
+        """Registers a function called with every new WatchEvent
+
+        Args:
+            callback (callable): function taking a WatchEvent
+        """
+        self._callbacks.append(callback)
+
+    def interval(self, name: str, field: str = "owner") -> float:
+        """Returns the current polling interval of a target
+
+        Args:
+            name (str): account or collection name
+            field (str, optional): "owner" or "collection". Defaults to "owner".
+
+        Returns:
+            float: seconds between polls
+        """
+        return self._targets[(field, name)].interval
+
+    def poll(self) -> List[WatchEvent]:
+        """Polls every target that is due, in as few requests as possible
+
+        Returns:
+            list[WatchEvent]: new events, oldest first
+        """
+        now = self._clock()
+        if now - self._window_start >= self.budget_window:
+            self._window_start = now
+            self.stats.budget_used = 0
+        due = [t for t in self._targets.values() if t.next_due <= now]
+        for kind in self.watch:
+            fresh = [t for t in due if t.watermarks[kind] is None]
+            if fresh and self.stats.budget_remaining != 0:
+                # new targets only report items created after they were added
+                newest = self._baseline(kind)
+                for target in fresh:
+                    target.watermarks[kind] = newest
+        events: List[WatchEvent] = []
+        polled, active = set(), set()
+        for field in ("owner", "collection"):
+            targets = [t for t in due if t.field == field]
+            by_name = {t.name: t for t in targets}
+            for names in chunk_values(list(by_name), self.batch_size, self.max_chars):
+                batch = [by_name[name] for name in names]
+                for kind in self.watch:
+                    if self.stats.budget_remaining == 0:
+                        break
+                    if any(t.watermarks[kind] is None for t in batch):
+                        continue
+                    found = self._poll_batch(kind, field, batch)
+                    polled.update((field, t.name) for t in batch)
+                    active.update((field, event.target) for event in found)
+                    events.extend(found)
+        self.stats.polls += 1
+        for target in due:
+            key = (target.field, target.name)
+            if key not in polled:
+                # left due when the request budget ran out
+                continue
+            if key in active:
+                target.interval = self.min_interval
+            else:
+                target.interval = min(self.max_interval, target.interval * self.backoff)
+            target.next_due = now + target.interval
+        events.sort(key=lambda event: event.detected_at - event.lag)
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        return events
+
+    def events(self, max_polls: Optional[int] = None) -> Iterator[WatchEvent]:
+        """Polls forever, yielding events as they are found
+
+        Args:
+            max_polls (int, optional): stop after this many polls. Defaults to None.
+
+        Yields:
+            WatchEvent: new events, oldest first within each poll
+        """
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            yield from self.poll()
+            polls += 1
+            if self._targets:
+                next_due = min(t.next_due for t in self._targets.values())
+                self._sleep(max(0.0, next_due - self._clock()))
+
+    def _baseline(self, kind: str) -> int:
+        """Returns the newest id of a kind, ids are global so it fits every target"""
+        params = {"order": "desc", "limit": 1}
+        data = self.atom.query(kind, params=params)
+        self._count_request()
+        if not data:
+            return 0
+        key = "asset_id" if kind == "assets" else "transfer_id"
+        return int(data[0][key])
+
+    def _count_request(self):
+        """Charges one request against the stats and the budget"""
+        self.stats.requests += 1
+        self.stats.budget_used += 1
+
+    def _poll_batch(
+        self, kind: str, field: str, batch: List[_Target]
+    ) -> List[WatchEvent]:
+        """Runs one packed query and turns new items into events"""
+        floor = min(t.watermarks[kind] for t in batch)
+        params = {
+            _FIELDS[(kind, field)]: ",".join(t.name for t in batch),
+            "order": "desc",
+            "sort": "asset_id" if kind == "assets" else "created",
+            "limit": self.limit,
+        }
+        model = Asset if kind == "assets" else Transfer
+
+        def build(data: list) -> List[AtomicBaseClass]:
+            return [model(d) for d in data]
+
+        items: List[AtomicBaseClass] = []
+        for page in range(1, self.max_pages + 1):
+            params["page"] = page
+            data = self.atom.query(kind, params=params, build=build)
+            self._count_request()
+            items.extend(data)
+            if len(data) < self.limit or int(items[-1].get_id()) <= floor:
+                break
+            if self.stats.budget_remaining == 0:
+                break
+
+        detected = self._clock()
+        events = []
+        for target in batch:
+            watermark = target.watermarks[kind]
+            for item in items:
+                item_id = int(item.get_id())
+                if item_id > watermark and target.name in _matches(item, field):
+                    lag = max(0.0, detected - _created_at(item))
+                    events.append(WatchEvent(kind, target.name, item, detected, lag))
+                    target.watermarks[kind] = max(target.watermarks[kind], item_id)
+                    self.stats.events += 1
+                    self.stats.total_lag += lag
+                    self.stats.max_lag = max(self.stats.max_lag, lag)
+        return events
+
+
+def _matches(item: AtomicBaseClass, field: str) -> tuple:
+    """Returns the target names an item belongs to"""
+    if field == "collection":
+        collection = getattr(item, "_collection", None)
+        return (collection.get_id(),) if collection is not None else ()
+    if isinstance(item, Asset):
+        return (item.owner,)
+    return (item.sender, item.recipient)
+
+
+def _created_at(item: AtomicBaseClass) -> float:
+    """Returns the creation time of an item in seconds"""
+    if isinstance(item, Transfer):
+        return item.timestamp / 1000
+    return int(getattr(item, "_minted_at_time", 0) or 0) / 1000
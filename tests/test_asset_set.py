@@ -0,0 +1,71 @@
+"""Tests for hashable models and AssetSet"""
+
+from daltonapi.tools.asset_set import AssetSet
+from daltonapi.tools.atomic_classes import (
+    Asset,
+    Collection,
+    CollectionStats,
+    Template,
+    Transfer,
+)
+
+
+def make_asset(asset_id, owner, template="1", schema="cards"):
+    return Asset(
+        {
+            "asset_id": str(asset_id),
+            "owner": owner,
+            "collection": {"collection_name": "col"},
+            "schema": {"schema_name": schema},
+            "template": {"template_id": template},
+        }
+    )
+
+
+class TestHashableModels:
+    def test_sets_and_dicts(self):
+        assets = {make_asset(1, "alice"), make_asset(1, "bob"), make_asset(2, "bob")}
+        assert len(assets) == 2
+        assert {Transfer({"transfer_id": "5"}): 1}[Transfer({"transfer_id": "5"})] == 1
+        assert Template({"template_id": "1"}) != "1"
+
+    def test_types_differ(self):
+        assert Asset({"asset_id": "1"}) != Template({"template_id": "1"})
+        collection = Collection({"collection_name": "col"})
+        stats = CollectionStats({"collection_name": "col", "assets": "3"})
+        assert collection != stats
+        assert len({collection, stats, Collection({"collection_name": "col"})}) == 2
+
+
+class TestAssetSet:
+    def test_algebra(self):
+        old = AssetSet(make_asset(i, "alice") for i in range(5))
+        new = AssetSet(make_asset(i, "alice") for i in range(3, 8))
+        assert (old | new).ids() == {str(i) for i in range(8)}
+        assert (old & new).ids() == {"3", "4"}
+        assert (old - new).ids() == {"0", "1", "2"}
+        assert "3" in old and make_asset(3, "x") in old and "9" not in old
+
+    def test_indexes(self):
+        assets = AssetSet(
+            make_asset(i, f"owner{i % 3}", template=str(i % 2)) for i in range(12)
+        )
+        assert len(assets.by_owner("owner1")) == 4
+        assert len(assets.by_template(Template({"template_id": "0"}))) == 6
+        assert assets.counts("schema") == {"cards": 12}
+        assets.add(make_asset(1, "owner0"))
+        assets.add(make_asset(99, "owner0"))
+        assets.discard("0")
+        assert assets.by_owner("owner0").ids() == {"1", "3", "6", "9", "99"}
+        assert assets.counts("owner") == {"owner0": 5, "owner1": 3, "owner2": 4}
+
+    def test_diff(self):
+        old = AssetSet(make_asset(i, "alice") for i in range(4))
+        new = AssetSet(
+            [make_asset(1, "alice"), make_asset(2, "bob"), make_asset(3, "alice")]
+            + [make_asset(4, "carol")]
+        )
+        diff = old.diff(new)
+        assert diff.added.ids() == {"4"}
+        assert diff.removed.ids() == {"0"}
+        assert diff.changed_owner == {"2": ("alice", "bob")}
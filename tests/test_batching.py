@@ -0,0 +1,133 @@
+"""Tests for packing lists of filter values into few requests"""
+
+from urllib.parse import parse_qs, urlencode
+
+import pytest
+from daltonapi.api import Atom
+from daltonapi.tools.atomic_classes import Asset, Collection
+from daltonapi.tools.atomic_errors import NoFiltersError
+from daltonapi.tools.batching import chunk_values
+
+
+class RecordingAtom(Atom):
+    """Atom answering queries from a list of assets"""
+
+    def __init__(self, assets, **kwargs):
+        super().__init__("fake/", **kwargs)
+        self.assets = assets
+        self.urls = []
+
+    def _query(self, endpoint, params=None, build=None):
+        rows = self._rows(endpoint, params)
+        return rows if build is None else build(rows)
+
+    def _rows(self, endpoint, params):
+        self.urls.append(f"{endpoint}?{urlencode(params)}")
+        if endpoint.endswith("accounts"):
+            templates = params["template_id"].split(",")
+            return [{"account": "alice", "assets": str(len(templates))}]
+        owners = params.get("owner", "").split(",")
+        return [a for a in self.assets if a["owner"] in owners]
+
+
+class HolderAtom(Atom):
+    """Atom ranking the holders of templates from memory"""
+
+    def __init__(self, holdings, **kwargs):
+        super().__init__("fake/", **kwargs)
+        self.holdings = holdings
+        self.requests = 0
+
+    def _query(self, endpoint, params=None, build=None):
+        self.requests += 1
+        counts = {}
+        for template in params["template_id"].split(","):
+            for account, count in self.holdings[template].items():
+                counts[account] = counts.get(account, 0) + count
+        ranked = sorted(counts.items(), key=lambda p: (p[1], p[0]), reverse=True)
+        start = (params["page"] - 1) * params["limit"]
+        rows = ranked[start : start + params["limit"]]
+        return [{"account": acc, "assets": str(count)} for acc, count in rows]
+
+
+def make_asset(asset_id, owner, collection="col"):
+    return {
+        "asset_id": str(asset_id),
+        "owner": owner,
+        "collection": {"collection_name": collection},
+    }
+
+
+class TestBatching:
+    def test_chunk_values(self):
+        assert chunk_values(["a", "b", "c"], 2, 100) == [["a", "b"], ["c"]]
+        assert chunk_values(["aaa", "bbb", "c"], 10, 9) == [["aaa", "bbb"], ["c"]]
+        assert chunk_values(["a b", "c"], None, 5) == [["a b"], ["c"]]
+        assert chunk_values([], 10, 10) == []
+
+    def test_single_values_unchanged(self):
+        atom = RecordingAtom([make_asset(1, "alice")])
+        result = atom.get_assets(owner="alice")
+        assert result == [Asset(make_asset(1, "alice"))]
+        assert len(atom.urls) == 1
+
+    def test_packs_within_url_limit(self):
+        owners = [f"owner{i:04d}" for i in range(500)]
+        atom = RecordingAtom([make_asset(i, o) for i, o in enumerate(owners)])
+        result = atom.get_assets(owner=owners, limit=1000)
+        assert len(result) == 500
+        assert 1 < len(atom.urls) < 10
+        assert all(len(url) <= atom.max_url_length for url in atom.urls)
+
+    def test_every_list_within_url_limit(self):
+        owners = [f"owner{i:04d}" for i in range(60)]
+        templates = [str(100000 + i) for i in range(40)]
+        atom = RecordingAtom([], max_url_length=200)
+        atom.get_assets(owner=owners, template=templates)
+        assert all(len(url) <= 200 for url in atom.urls)
+        sent = set()
+        for url in atom.urls:
+            params = parse_qs(url.split("?", 1)[1])
+            for owner in params["owner"][0].split(","):
+                for template in params["template_id"][0].split(","):
+                    sent.add((owner, template))
+        assert len(sent) == len(owners) * len(templates)
+
+    def test_group_by(self):
+        atom = RecordingAtom([make_asset(1, "alice"), make_asset(2, "bob")])
+        groups = atom.get_assets(
+            owner=["alice", "bob", "carol"],
+            collection=[Collection({"collection_name": "col"})],
+            group_by="owner",
+        )
+        assert list(groups) == ["alice", "bob", "carol"]
+        assert [a.get_id() for a in groups["bob"]] == ["2"]
+        assert groups["carol"] == []
+        assert "collection_name=col" in atom.urls[0]
+
+    def test_holders_are_merged(self):
+        atom = RecordingAtom([], max_url_length=200)
+        holders = atom.get_holders(template=[str(i) for i in range(100)])
+        assert len(atom.urls) > 1
+        assert holders == [{"account": "alice", "assets": "100"}]
+
+    def test_holders_ranked_across_requests(self):
+        templates = [str(100000 + i) for i in range(40)]
+        holdings = {
+            t: {f"acc{j:04d}": (i * j) % 7 + 1 for j in range(1200)}
+            for i, t in enumerate(templates)
+        }
+        whole = HolderAtom(holdings)
+        packed = HolderAtom(holdings, max_url_length=150)
+        for page in (1, 3):
+            expected = whole.get_holders(template=templates, page=page, limit=50)
+            assert packed.get_holders(template=templates, page=page, limit=50) == (
+                expected
+            )
+        assert whole.requests == 2
+        assert packed.requests > 2
+
+    def test_empty_list_is_no_filter(self):
+        atom = RecordingAtom([])
+        with pytest.raises(NoFiltersError):
+            atom.get_assets(owner=[])
@@ -0,0 +1,137 @@
+"""Tests for the WAX block-range reader"""
+
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from benchmarks.server import StandInServer, make_block
+from daltonapi.api import Wax
+from daltonapi.blocks import BlockReader, block_actions, block_time, block_transfers
+from daltonapi.provenance import ProvenanceIndex
+from daltonapi.tools.atomic_errors import RequestFailedError
+from daltonapi.tools.transport import MemoryTransport
+
+
+class Node:
+    """Serves blocks with varying latency, counting requests in flight"""
+
+    def __init__(self, blocks=200):
+        self.server = StandInServer(blocks=blocks)
+        self.in_flight = self.most_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, params, json, headers):
+        path = urlparse(url).path
+        if path.endswith("get_block"):
+            with self._lock:
+                self.in_flight += 1
+                self.most_in_flight = max(self.most_in_flight, self.in_flight)
+            time.sleep(0.002 * (json["block_num_or_id"] % 3))
+            with self._lock:
+                self.in_flight -= 1
+        return self.server.post(path, json)
+
+
+def wax(node):
+    return Wax("/", transport=MemoryTransport(node))
+
+
+class TestBlockActions:
+    def test_time(self):
+        assert block_time("2020-09-13T12:26:40.500") == 1600000000500
+
+    def test_skips_deferred(self):
+        block = StandInServer().post("/v1/chain/get_block", {"block_num_or_id": 10})[1]
+        actions = list(block_actions(block))
+        assert [(a.account, a.name, a.index) for a in actions] == [
+            ("atomicassets", "transfer", 0),
+            ("eosio.token", "transfer", 1),
+            ("atomicassets", "logmint", 2),
+        ]
+
+    def test_logtransfer_replaces_transfer(self):
+        block = make_block(7)
+        actions = block["transactions"][0]["trx"]["transaction"]["actions"]
+        logged = dict(actions[0], name="logtransfer")
+        logged["data"] = dict(actions[0]["data"], collection_name="benchcollect")
+        actions.insert(1, logged)
+        transfers = list(block_transfers(block))
+        assert [t._action for t in transfers] == ["logtransfer"]
+        assert transfers[0].get_id() == "700001"
+        # a transaction without logtransfer falls back on transfer
+        assert [t._action for t in block_transfers(make_block(7))] == ["transfer"]
+
+
+class TestWax:
+    def test_info_and_block(self):
+        chain = wax(Node(blocks=500))
+        assert chain.get_info()["last_irreversible_block_num"] == 200
+        assert chain.get_block(7)["block_num"] == 7
+        with pytest.raises(RequestFailedError):
+            chain.get_block(501)
+
+
+class TestBlockReader:
+    def test_in_order_with_window(self):
+        node = Node()
+        reader = BlockReader(wax(node), window=8)
+        numbers = [block["block_num"] for block in reader.blocks(1, 100)]
+        assert numbers == list(range(1, 101))
+        assert 1 < node.most_in_flight <= 8
+        assert reader.last_block == 100
+
+    def test_filters(self):
+        reader = BlockReader(
+            wax(Node()), contracts=["atomicassets"], actions=["logmint"]
+        )
+        actions = list(reader.read(1, 50))
+        assert [action.block_num for action in actions] == [10, 20, 30, 40, 50]
+
+    def test_transfers_build_provenance(self):
+        reader = BlockReader(wax(Node()), window=4)
+        transfers = list(reader.transfers(1, 20))
+        assert len(transfers) == 22
+        mint = transfers[-1]
+        assert mint._action == "logmint" and mint._sender_name == ""
+        assert mint.get_id() == "2000002"
+        index = ProvenanceIndex(transfers)
+        assert index.owner_at("1099500000005", 1600000010000) == "owner6.wam"
+
+    def test_transfers_filter_logical_actions(self):
+        node = Node()
+        transfers = list(
+            BlockReader(wax(node), actions=["logtransfer"]).transfers(1, 20)
+        )
+        assert len(transfers) == 20
+        assert {t._action for t in transfers} == {"transfer"}
+        mints = list(BlockReader(wax(node), actions=["logmint"]).transfers(1, 20))
+        assert [t._action for t in mints] == ["logmint", "logmint"]
+
+    def test_default_end_is_irreversible(self):
+        node = Node(blocks=310)
+        assert list(BlockReader(wax(node)).blocks(5))[-1]["block_num"] == 10
+
+    def test_checkpoint_resume(self, tmp_path):
+        path = str(tmp_path / "blocks.checkpoint")
+        node = Node()
+        reader = BlockReader(wax(node), window=4, checkpoint=path, checkpoint_every=10)
+        for block in reader.blocks(1, 100):
+            if block["block_num"] == 35:
+                break
+        with open(path, encoding="utf-8") as file:
+            assert json.load(file) == {"last_block": 34}
+        resumed = BlockReader(wax(node), checkpoint=path)
+        assert next(resumed.blocks(1, 100))["block_num"] == 35
+
+    def test_error_keeps_progress(self, tmp_path):
+        path = str(tmp_path / "blocks.checkpoint")
+        reader = BlockReader(wax(Node(blocks=30)), checkpoint=path)
+        with pytest.raises(RequestFailedError):
+            for _ in reader.blocks(1, 40):
+                pass
+        assert reader.last_block == 30
+        with open(path, encoding="utf-8") as file:
+            assert json.load(file) == {"last_block": 30}
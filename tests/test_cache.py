@@ -0,0 +1,109 @@
+"""Tests for the response cache and conditional requests"""
+
+from daltonapi.api import Atom, Wax
+from daltonapi.tools.cache import ResponseCache
+from daltonapi.tools.instrumentation import Instrumentation
+from daltonapi.tools.transport import MemoryTransport
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Server:
+    """Serves a collection with an ETag, answering 304 while it is unchanged"""
+
+    def __init__(self, validators=True):
+        self.validators = validators
+        self.version = 1
+        self.requests = []
+        self.query_time = 0
+
+    def __call__(self, method, url, params, json, headers):
+        self.requests.append(headers)
+        etag = f'"v{self.version}"'
+        if self.validators and headers.get("If-None-Match") == etag:
+            return 304, b""
+        self.query_time += 1
+        payload = (
+            '{"success":true,"data":{"collection_name":"col","name":"v%d"},'
+            '"query_time":%d}' % (self.version, self.query_time)
+        )
+        return 200, payload.encode(), {"ETag": etag} if self.validators else {}
+
+
+def make_atom(server, clock, **kwargs):
+    cache = ResponseCache(ttl=10, clock=clock)
+    return Atom("fake/", transport=MemoryTransport(server), cache=cache, **kwargs)
+
+
+class TestResponseCache:
+    def test_fresh_entries_skip_requests(self):
+        server, clock = Server(), Clock()
+        atom = make_atom(server, clock)
+        first = atom.get_collection("col")
+        assert atom.get_collection("col") is first
+        assert len(server.requests) == 1
+        assert atom.cache.hits == 1
+
+    def test_revalidates_with_etag(self):
+        server, clock = Server(), Clock()
+        atom = make_atom(server, clock)
+        first = atom.get_collection("col")
+        clock.now = 11
+        assert atom.get_collection("col") is first
+        assert server.requests[1] == {"If-None-Match": '"v1"'}
+        assert atom.cache.revalidated == 1
+
+        server.version = 2
+        clock.now = 22
+        assert atom.get_collection("col")._name == "v2"
+        assert len(server.requests) == 3
+
+    def test_content_hash_fallback(self):
+        server, clock = Server(validators=False), Clock()
+        atom = make_atom(server, clock)
+        first = atom.get_collection("col")
+        clock.now = 11
+        assert atom.get_collection("col") is first
+        assert server.requests[1] == {}
+        assert atom.cache.revalidated == 1
+
+    def test_results_are_copied(self):
+        transport = MemoryTransport(lambda *_: (200, {"rows": [{"id": 1}]}))
+        wax = Wax("fake/", transport=transport, cache=ResponseCache())
+        payload = wax._query("fake/table", data={"code": "c"})
+        payload["rows"].append({"id": 2})
+        payload["rows"][0]["id"] = 3
+        payload["more"] = True
+        assert wax._query("fake/table", data={"code": "c"}) == {"rows": [{"id": 1}]}
+        holders = MemoryTransport(
+            lambda *_: (200, {"success": True, "data": [{"account": "a"}]})
+        )
+        atom = Atom("fake/", transport=holders, cache=ResponseCache())
+        atom.get_holders(template="1").append({"account": "b"})
+        assert atom.get_holders(template="1") == [{"account": "a"}]
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        for key in "abc":
+            cache.store(key, key, {}, "")
+        assert cache.get("a") is None
+        assert len(cache) == 2
+
+    def test_events_report_cache_hits(self):
+        events = []
+        server, clock = Server(), Clock()
+        atom = make_atom(
+            server, clock, instrumentation=Instrumentation(hooks=[events.append])
+        )
+        atom.get_collection("col")
+        atom.get_collection("col")
+        clock.now = 11
+        atom.get_collection("col")
+        assert [event.cache_hit for event in events] == [False, True, True]
+        assert [event.status for event in events] == [200, 200, 304]
@@ -0,0 +1,84 @@
+"""Tests for the template and schema catalog"""
+
+from daltonapi.api import Atom
+from daltonapi.tools.catalog import Catalog
+from daltonapi.tools.transport import MemoryTransport
+
+
+def make_template(index):
+    return {
+        "template_id": str(100 + index),
+        "collection": {"collection_name": "col"},
+        "schema": {"schema_name": f"schema{index % 3}"},
+        "immutable_data": {"name": f"Card {index}"},
+    }
+
+
+class Server:
+    """Serves 25 templates and 3 schemas of one collection"""
+
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, method, url, params, json, headers):
+        path = url[len("fake/") :]
+        self.paths.append(path)
+        page, limit = int(params.get("page", 1)), int(params.get("limit", 100))
+        window = slice((page - 1) * limit, page * limit)
+        if path == "templates":
+            data = [make_template(i) for i in range(25)][window]
+        elif path == "schemas":
+            data = [{"schema_name": f"schema{i}"} for i in range(3)][window]
+        elif path == "assets":
+            data = [
+                {
+                    "asset_id": "1",
+                    "collection": {"collection_name": "col"},
+                    "schema": {"schema_name": "schema9"},
+                    "template": {"template_id": "900", "immutable_data": {"name": "X"}},
+                }
+            ]
+        else:
+            return 404, {"success": False}
+        return 200, {"success": True, "data": data}
+
+
+class TestCatalog:
+    def test_prefetch(self):
+        server = Server()
+        atom = Atom("fake/", transport=MemoryTransport(server), catalog=Catalog())
+        atom.catalog.prefetch(atom, "col", limit=10, workers=2)
+        # the first wave asks both endpoints, the schemas end on their first page
+        assert set(server.paths[:2]) == {"templates", "schemas"}
+        assert server.paths.count("templates") == 3
+        assert server.paths.count("schemas") == 1
+        assert len(atom.catalog.templates("col")) == 25
+        assert len(atom.catalog.schemas("col")) == 3
+        assert atom.catalog.template_by_name("col", "Card 7").get_id() == "107"
+        assert "col" in atom.catalog.loaded
+
+        requests = len(server.paths)
+        assert atom.get_template("col", "107").get_id() == "107"
+        assert atom.get_schema("col", "schema2").get_id() == "schema2"
+        assert len(server.paths) == requests
+
+    def test_filled_by_get_assets(self):
+        server = Server()
+        atom = Atom("fake/", transport=MemoryTransport(server), catalog=Catalog())
+        assets = atom.get_assets(collection="col")
+        template = atom.get_template("col", "900")
+        assert template.name == "X"
+        assert template._collection.get_id() == "col"
+        assert not hasattr(assets[0]._template, "_collection")
+        assert atom.get_schema("col", "schema9").get_id() == "schema9"
+        assert server.paths == ["assets"]
+
+    def test_misses_are_fetched_once(self):
+        transport = MemoryTransport()
+        transport.add(
+            "GET", "fake/templates/col/105", {"success": True, "data": make_template(5)}
+        )
+        atom = Atom("fake/", transport=transport, catalog=Catalog())
+        first = atom.get_template("col", "105")
+        assert atom.get_template("col", "105") is first
+        assert len(transport.calls) == 1
@@ -0,0 +1,42 @@
+"""Tests for lazy imports and the cold start benchmark"""
+
+import subprocess
+import sys
+
+import daltonapi
+from benchmarks import coldstart
+from benchmarks.server import StandInServer
+
+
+class TestLazyImports:
+    def test_heavy_modules_not_imported(self):
+        code = (
+            "import sys, daltonapi.api; "
+            f"print([m for m in {coldstart.HEAVY_MODULES!r} if m in sys.modules])"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout
+        assert output.strip() == "[]"
+
+    def test_package_exports(self):
+        from daltonapi.api import Atom  # pylint: disable=import-outside-toplevel
+
+        assert daltonapi.Atom is Atom
+        assert "WaxTable" in daltonapi._LAZY
+
+
+class TestColdStart:
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        assert coldstart.percentile(values, 0.99) == 99.0
+        assert coldstart.percentile(values, 0.5) == 50.0
+        assert coldstart.percentile([3.0], 0.99) == 3.0
+
+    def test_measure(self):
+        with StandInServer(assets=10, transfers=0, holders=0, templates=10) as server:
+            result = coldstart.measure(server.atomic_endpoint, runs=2)
+        assert result["runs"] == 2 and result["heavy_modules"] == []
+        assert 0 < result["import_p50_seconds"] <= result["import_p99_seconds"]
+        assert coldstart.over_budget(result, 0.0, 0.0) == {}
+        assert list(coldstart.over_budget(result, 1e-9, 0.0)) == ["import_p99_seconds"]
@@ -0,0 +1,90 @@
+"""Tests for the resumable collection crawl"""
+
+import json
+import time
+
+import pytest
+from benchmarks.server import StandInServer
+from daltonapi.api import Atom
+from daltonapi import crawl
+from daltonapi.crawl import CrawlJob, SharedRateLimit
+from daltonapi.tools.atomic_classes import Asset, Template
+from daltonapi.tools.transport import MemoryTransport, RequestsTransport
+
+
+@pytest.fixture(name="server")
+def fixture_server():
+    with StandInServer(assets=250, holders=30, templates=20) as server:
+        yield server
+
+
+class TestCrawlJob:
+    def test_crawl(self, server, tmp_path):
+        output = str(tmp_path / "snapshot.ndjson")
+        job = CrawlJob(
+            Atom(server.atomic_endpoint), "benchcollect", output, workers=2, rate=0
+        )
+        counts = job.run()
+        assert counts["templates"] == 20
+        assert counts["holders"] == 30
+        assert len(counts) == 12
+        rows = list(CrawlJob.read(output))
+        assets = [item for kind, item in rows if kind == "assets"]
+        assert len({asset.get_id() for asset in assets}) == 250
+        assert isinstance(assets[0], Asset)
+        assert isinstance(rows[0][1], (Asset, Template, dict))
+
+    def test_resume(self, server, tmp_path):
+        output = str(tmp_path / "snapshot.ndjson")
+        job = CrawlJob(
+            Atom(server.atomic_endpoint), "benchcollect", output, workers=2, rate=0
+        )
+        job.run()
+        with open(job.checkpoint, encoding="utf-8") as file:
+            state = json.load(file)
+        # forget the shard appended last, leaving part of it behind
+        with open(output, "rb") as file:
+            lines = file.readlines()
+        last = json.loads(lines[-1])["data"]["schema"]["schema_name"]
+        key = f"assets:schema_name={last}"
+        del state["done"][key]
+        rows = [json.loads(line) for line in lines]
+        dropped = [
+            row["kind"] == "assets" and row["data"]["schema"]["schema_name"] == last
+            for row in rows
+        ]
+        assert all(dropped[dropped.index(True) :])
+        state["offset"] = sum(
+            len(line) for line, drop in zip(lines, dropped) if not drop
+        )
+        with open(job.checkpoint, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+
+        before = server.requests
+        counts = job.run()
+        assert server.requests - before == 1
+        assert key in counts
+        assets = [item for kind, item in CrawlJob.read(output) if kind == "assets"]
+        assert len({asset.get_id() for asset in assets}) == len(assets) == 250
+
+    def test_rate_limit(self):
+        limit = SharedRateLimit(50)
+        start = time.time()
+        for _ in range(6):
+            limit.wait()
+        assert time.time() - start >= 0.09
+
+    def test_workers_copy_client_settings(self, tmp_path):
+        atom = Atom("fake/", retries=5, transport=RequestsTransport(timeout=3))
+        job = CrawlJob(atom, "col", str(tmp_path / "out.ndjson"))
+        crawl._init_worker(job._worker_settings(), SharedRateLimit(0), 100)
+        worker = crawl._WORKER["atom"]
+        assert worker.endpoint == "fake/" and worker.retries == 5
+        assert isinstance(worker.transport, RequestsTransport)
+        assert worker.transport.timeout == 3
+        crawl._WORKER.clear()
+
+    def test_transport_needs_factory(self, tmp_path):
+        atom = Atom("fake/", transport=MemoryTransport())
+        with pytest.raises(AssertionError):
+            CrawlJob(atom, "col", str(tmp_path / "out.ndjson"))
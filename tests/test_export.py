@@ -0,0 +1,69 @@
+"""Tests for the time-window sharded transfer export"""
+
+import pytest
+from daltonapi.api import Atom
+from daltonapi.export import TransferExport
+from daltonapi.tools.transport import MemoryTransport
+
+# transfers every 100ms from 0 to 10s, and a burst of 300 at 5s
+TIMES = sorted(list(range(0, 10000, 100)) + [5000] * 150 + [5001] * 150)
+
+
+class Server:
+    """Serves TIMES as transfers, filtered by after/before and paged"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, method, url, params, json, headers):
+        self.requests.append(params)
+        after, before = int(params["after"]), int(params["before"])
+        rows = [
+            {"transfer_id": str(i), "created_at_time": str(t)}
+            for i, t in enumerate(TIMES)
+            if after < t < before
+        ]
+        page, limit = int(params["page"]), int(params["limit"])
+        return 200, {
+            "success": True,
+            "data": rows[(page - 1) * limit : page * limit],
+        }
+
+
+def make_export(server, **kwargs):
+    atom = Atom("fake/", transport=MemoryTransport(server))
+    options = dict(window=2000, limit=20, max_pages=2, workers=4)
+    options.update(kwargs)
+    return TransferExport(atom, 0, 10000, collection="col", **options)
+
+
+class TestTransferExport:
+    def test_exports_everything_in_order(self):
+        server = Server()
+        export = make_export(server)
+        transfers = list(export)
+        assert [t.timestamp for t in transfers] == TIMES
+        assert len({t.get_id() for t in transfers}) == len(TIMES)
+        assert export.splits > 0
+        assert all(int(params["page"]) <= 20 for params in server.requests)
+        assert all(params["collection_name"] == "col" for params in server.requests)
+
+    def test_resumes_from_checkpoint(self, tmp_path):
+        checkpoint = str(tmp_path / "export.json")
+        first = []
+        for transfer in make_export(Server(), checkpoint=checkpoint):
+            first.append(transfer)
+            if len(first) == 150:
+                break
+        rest = list(make_export(Server(), checkpoint=checkpoint))
+        resumed_at = rest[0].timestamp
+        assert [t.timestamp for t in first if t.timestamp < resumed_at] + [
+            t.timestamp for t in rest
+        ] == TIMES
+
+    def test_checkpoint_of_other_export(self, tmp_path):
+        checkpoint = str(tmp_path / "export.json")
+        list(make_export(Server(), checkpoint=checkpoint))
+        atom = Atom("fake/", transport=MemoryTransport(Server()))
+        with pytest.raises(ValueError):
+            TransferExport(atom, 0, 10000, collection="other", checkpoint=checkpoint)
@@ -0,0 +1,66 @@
+"""Tests for single-flight request coalescing"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from daltonapi.api import Atom
+from daltonapi.tools.atomic_errors import RequestFailedError
+from daltonapi.tools.flight import SingleFlight
+
+
+class SlowAtom(Atom):
+    """Atom whose requests take a while, counting how many are made"""
+
+    def __init__(self, fail=False, **kwargs):
+        super().__init__("fake/", **kwargs)
+        self.fail = fail
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _fetch(self, method, endpoint, params, data, build):
+        with self.lock:
+            self.requests += 1
+        time.sleep(0.2)
+        if self.fail:
+            raise RequestFailedError
+        return {"collection_name": endpoint.rsplit("/", 1)[-1]}
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_request(self):
+        atom = SlowAtom()
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: atom.get_collection("col"), range(10)))
+        assert atom.requests == 1
+        assert all(result == results[0] for result in results)
+
+    def test_different_keys_not_shared(self):
+        atom = SlowAtom()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(atom.get_collection, ["a", "b", "a", "b"]))
+        assert atom.requests == 2
+
+    def test_disabled(self):
+        atom = SlowAtom(coalesce=False)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: atom.get_collection("col"), range(4)))
+        assert atom.requests == 4
+
+    def test_errors_are_shared(self):
+        atom = SlowAtom(fail=True)
+
+        def call(_):
+            with pytest.raises(RequestFailedError):
+                atom.get_collection("col")
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            list(pool.map(call, range(5)))
+        assert atom.requests == 1
+
+    def test_sequential_calls_not_shared(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+        assert flight.in_flight() == 0
@@ -0,0 +1,79 @@
+"""Tests for bulk asset history"""
+
+import pytest
+from daltonapi.api import Atom
+from daltonapi.history import AssetTimeline, fetch_asset_histories
+from daltonapi.tools.atomic_classes import Asset, Transfer
+from daltonapi.tools.atomic_errors import AtomicIDError
+
+
+def make_transfer(transfer_id, asset_ids, created):
+    return {
+        "transfer_id": str(transfer_id),
+        "assets": [{"asset_id": asset_id} for asset_id in asset_ids],
+        "created_at_time": str(created),
+    }
+
+
+class HistoryAtom(Atom):
+    """Atom serving transfers from memory"""
+
+    def __init__(self, transfers, **kwargs):
+        super().__init__("fake/", **kwargs)
+        self.transfers = transfers
+        self.requests = 0
+
+    def _query(self, endpoint, params=None, build=None):
+        rows = self._rows(endpoint, params)
+        return rows if build is None else build(rows)
+
+    def _rows(self, endpoint, params):
+        self.requests += 1
+        wanted = set(params["asset_id"].split(","))
+        rows = [
+            t
+            for t in self.transfers
+            if wanted & {nft["asset_id"] for nft in t["assets"]}
+        ]
+        page, limit = params["page"], params["limit"]
+        return rows[(page - 1) * limit : page * limit]
+
+
+class TestHistory:
+    def test_merges_and_dedupes(self):
+        transfers = [
+            make_transfer(3, ["1", "2"], 300),
+            make_transfer(1, ["1"], 100),
+            make_transfer(2, ["2"], 200),
+        ]
+        atom = HistoryAtom(transfers, max_url_length=40)
+        timeline = fetch_asset_histories(atom, ["1", Asset({"asset_id": "2"})])
+        assert [t.get_id() for t in timeline] == ["1", "2", "3"]
+        assert [t.get_id() for t in timeline.history("1")] == ["1", "3"]
+        assert [t.get_id() for t in timeline.history("2")] == ["2", "3"]
+        assert timeline.history("9") == []
+
+    def test_pages_through_history(self):
+        transfers = [make_transfer(i, ["1"], i) for i in range(250)]
+        atom = HistoryAtom(transfers)
+        timeline = fetch_asset_histories(atom, ["1"], limit=100, workers=2)
+        assert len(timeline) == 250
+        # two waves of two pages, the second ending on the short third page
+        assert atom.requests == 4
+
+    def test_pages_every_group(self):
+        transfers = [make_transfer(i, [str(i % 3 + 1)], i) for i in range(600)]
+        atom = HistoryAtom(transfers, max_url_length=40)
+        timeline = fetch_asset_histories(atom, ["1", "2", "3"], limit=50, workers=4)
+        assert len(timeline) == 600
+        assert len(timeline.history("3")) == 200
+
+    def test_invalid_id(self):
+        with pytest.raises(AtomicIDError):
+            fetch_asset_histories(HistoryAtom([]), ["not numeric"])
+
+    def test_timeline_order(self):
+        timeline = AssetTimeline(
+            [Transfer(make_transfer(2, ["1"], 5)), Transfer(make_transfer(1, ["1"], 5))]
+        )
+        assert [t.get_id() for t in timeline] == ["1", "2"]
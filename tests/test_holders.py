@@ -0,0 +1,79 @@
+"""Tests for holder snapshots"""
+
+import pytest
+from daltonapi.api import Atom
+from daltonapi.holders import HolderSnapshot, take_holder_snapshot
+from daltonapi.tools.atomic_errors import NoFiltersError
+
+
+class PagedAtom(Atom):
+    """Atom serving holder pages from memory"""
+
+    def __init__(self, holders):
+        super().__init__("fake/")
+        self.holders = holders
+        self.pages = []
+
+    def _query(self, endpoint, params=None, build=None):
+        page, limit = params["page"], params["limit"]
+        self.pages.append(page)
+        rows = self.holders[(page - 1) * limit : page * limit]
+        return [{"account": acc, "assets": str(count)} for acc, count in rows]
+
+
+class TemplateAtom(Atom):
+    """Atom serving the holders of each template from memory"""
+
+    def __init__(self, holdings, **kwargs):
+        super().__init__("fake/", **kwargs)
+        self.holdings = holdings
+
+    def _query(self, endpoint, params=None, build=None):
+        counts = {}
+        for template in params["template_id"].split(","):
+            for account, count in self.holdings[template].items():
+                counts[account] = counts.get(account, 0) + count
+        page, limit = params["page"], params["limit"]
+        rows = sorted(counts.items())[(page - 1) * limit : page * limit]
+        return [{"account": acc, "assets": str(count)} for acc, count in rows]
+
+
+class TestHolderSnapshot:
+    def test_take_snapshot(self):
+        holders = [(f"account{i}", i + 1) for i in range(2500)]
+        atom = PagedAtom(holders)
+        snapshot = take_holder_snapshot(atom, template="123", limit=100, workers=4)
+        assert len(snapshot) == 2500
+        assert snapshot["account9"] == 10
+        assert snapshot.filters == {"template": "123"}
+        assert sorted(atom.pages) == list(range(1, 29))
+
+    def test_sums_packed_requests(self):
+        templates = [str(100000 + i) for i in range(30)]
+        holdings = {t: {"alice": 1, f"acc{t}": 2} for t in templates}
+        atom = TemplateAtom(holdings, max_url_length=100)
+        snapshot = take_holder_snapshot(atom, template=templates, limit=10)
+        assert snapshot["alice"] == 30
+        assert len(snapshot) == 31
+        assert snapshot.filters == {"template": templates}
+
+    def test_requires_filter(self):
+        with pytest.raises(NoFiltersError):
+            take_holder_snapshot(PagedAtom([]))
+
+    def test_diff(self):
+        old = HolderSnapshot({"alice": 1, "bob": 2, "carol": 3})
+        new = HolderSnapshot({"bob": 2, "carol": 5, "dave": 1})
+        diff = old.diff(new)
+        assert diff.new == {"dave": 1}
+        assert diff.exited == {"alice": 1}
+        assert diff.changed == {"carol": (3, 5)}
+
+    def test_save_load(self, tmp_path):
+        path = str(tmp_path / "holders.gz")
+        snapshot = HolderSnapshot({"alice": 1, "bob": 2}, {"collection": "col"}, 10.0)
+        snapshot.save(path)
+        loaded = HolderSnapshot.load(path)
+        assert loaded.holders == snapshot.holders
+        assert loaded.filters == snapshot.filters
+        assert loaded.taken_at == 10.0
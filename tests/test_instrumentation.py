@@ -0,0 +1,80 @@
+"""Tests for request instrumentation"""
+
+import json
+import logging
+
+import pytest
+
+from daltonapi.api import Atom, Wax, _Client
+from daltonapi.tools.atomic_classes import Asset
+from daltonapi.tools.atomic_errors import RequestFailedError
+from daltonapi.tools.instrumentation import Histogram, Instrumentation
+from daltonapi.tools.transport import MemoryTransport
+
+
+class FakeSendMixin:
+    """Answers every request with a fixed payload"""
+
+    payload = None
+
+    def __init__(self, *args, **kwargs):
+        transport = MemoryTransport(lambda *_: (200, self.payload))
+        super().__init__(*args, transport=transport, **kwargs)
+
+
+class FakeAtom(FakeSendMixin, Atom):
+    payload = {"success": True, "data": {"asset_id": "1"}}
+
+
+class FakeWax(FakeSendMixin, Wax):
+    payload = {"account_name": "alice"}
+
+
+class TestInstrumentation:
+    def test_events(self):
+        events = []
+        instrumentation = Instrumentation(hooks=[events.append])
+        atom = FakeAtom("fake/", instrumentation=instrumentation)
+        assert atom.get_asset("1") == Asset({"asset_id": "1"})
+        (event,) = events
+        assert event.client == "FakeAtom"
+        assert event.endpoint == "assets"
+        assert event.status == 200
+        assert event.bytes == len(json.dumps(FakeAtom.payload))
+        assert event.error is None
+        assert event.total >= event.decode + event.build
+
+    def test_stats(self):
+        instrumentation = Instrumentation()
+        wax = FakeWax("fake/", instrumentation=instrumentation)
+        for _ in range(3):
+            wax.get_account("alice")
+        summary = instrumentation.stats.summary()
+        assert summary["FakeWax:get_account"]["calls"] == 3
+        assert summary["FakeWax:get_account"]["errors"] == 0
+
+    def test_errors_recorded(self):
+        events = []
+        atom = FakeAtom("fake/", instrumentation=Instrumentation(hooks=[events.append]))
+        atom.payload = {"success": False}
+        with pytest.raises(RequestFailedError):
+            atom.get_asset("1")
+        assert events[0].error == "RequestFailedError: The request did not succeed."
+
+    def test_slow_query_log(self, caplog):
+        atom = FakeAtom("fake/", instrumentation=Instrumentation(slow_query=0.0))
+        with caplog.at_level(logging.WARNING, logger="daltonapi"):
+            atom.get_asset("1")
+        assert "Slow query fake/assets/1" in caplog.text
+
+    def test_histogram(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.add(ms / 1000)
+        assert histogram.count == 100
+        assert histogram.quantile(0.5) == 0.05
+        assert histogram.quantile(1.0) == 0.1
+
+    def test_client_base_is_abstract(self):
+        with pytest.raises(TypeError):
+            _Client()  # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,153 @@
+"""Tests for the AtomicMarket client and the sales aggregator"""
+
+from urllib.parse import urlparse
+
+import pytest
+
+from benchmarks.server import StandInServer, make_sale
+from daltonapi.api import Market
+from daltonapi.pricing import SalesAggregator
+from daltonapi.tools.atomic_errors import AtomicIDError, NoFiltersError
+from daltonapi.tools.market_classes import Auction, BuyOffer, PricePoint, Sale
+from daltonapi.tools.paging import PageSizeController
+from daltonapi.tools.serialization import dumps, loads
+from daltonapi.tools.transport import MemoryTransport
+
+
+def market(sales=250):
+    server = StandInServer(sales=sales, templates=10)
+
+    def handler(method, url, params, json, headers):
+        return server.get(urlparse(url).path, params)
+
+    transport = MemoryTransport(handler)
+    return Market("/atomicmarket/v1/", transport=transport), transport
+
+
+def sale(index, price, minute, templates=("1001",), state=3, token="WAX"):
+    data = make_sale(index)
+    data["price"]["amount"] = str(int(price * 1e8))
+    data["price"]["token_symbol"] = token
+    data["updated_at_time"] = str(minute * 60000)
+    data["state"] = state
+    data["assets"] = [
+        dict(data["assets"][0], template={"template_id": template})
+        for template in templates
+    ]
+    return Sale(data)
+
+
+class TestMarketClasses:
+    def test_sale(self):
+        item = Sale(make_sale(3))
+        assert item.get_id() == "100003" and item.offer_id == "9000003"
+        assert item.price == 8.57 and item.token == "WAX"
+        assert item.asset_ids == ["1099500000003"]
+        assert item.template_ids == ["1003"]
+        assert item.assets[0].get_id() == "1099500000003"
+        assert item.completed_at == 1600002180000
+        assert str(item) == "Sale 100003: 8.57 WAX (sold)"
+
+    def test_other_offers(self):
+        data = make_sale(1)
+        auction = Auction(dict(data, auction_id="55", end_time="1", bids=[], state=1))
+        assert auction.get_id() == "55" and auction.completed_at is None
+        buyoffer = BuyOffer(dict(data, buyoffer_id="77", memo="hi"))
+        assert buyoffer.get_id() == "77" and buyoffer.memo == "hi"
+        point = PricePoint(
+            {
+                "time": "86400000",
+                "median": "150000000",
+                "average": "200000000",
+                "token_precision": 8,
+                "sales": "4",
+            }
+        )
+        assert (point.median, point.average, point.sales) == (1.5, 2.0, 4)
+
+    def test_serialized(self):
+        sales = [Sale(make_sale(i)) for i in range(5)]
+        restored = loads(dumps(sales, codec="pickle"), codec="pickle")
+        assert restored == sales and restored[2].price == sales[2].price
+
+
+class TestMarket:
+    def test_get_sales(self):
+        client, transport = market()
+        sales = client.get_sales(state=3, template=["1001", "1002"], limit=10)
+        assert len(sales) == 10
+        assert {s.template_ids[0] for s in sales} == {"1001", "1002"}
+        params = transport.calls[0][2]
+        assert params["template_id"] == "1001,1002" and params["state"] == 3
+        assert client.get_sale("100007").get_id() == "100007"
+        with pytest.raises(AtomicIDError):
+            client.get_sale("abc")
+
+    def test_iter_sales(self):
+        client, transport = market()
+        paging = PageSizeController(initial=20, minimum=10, maximum=100)
+        ids = [s.get_id() for s in client.iter_sales(state=3, paging=paging)]
+        assert ids == [str(100000 + i) for i in range(250)]
+        assert transport.calls[1][2]["lower_bound"] == "100020"
+        assert transport.calls[0][2]["sort"] == "sale_id"
+
+    def test_price_history_needs_filter(self):
+        client, _ = market()
+        with pytest.raises(NoFiltersError):
+            client.get_price_history()
+
+
+class TestSalesAggregator:
+    def test_floor_volume_bars(self):
+        prices = SalesAggregator(window=3600, bar_seconds=600)
+        assert prices.add(sale(0, 5.0, 0))
+        assert prices.add(sale(1, 3.0, 5))
+        assert prices.add(sale(2, 4.0, 20))
+        assert not prices.add(sale(2, 4.0, 20))
+        assert prices.floor("1001") == 3.0
+        assert prices.volume("1001") == pytest.approx(12.0)
+        bars = prices.bars("1001")
+        assert [bar.start for bar in bars] == [0, 1200000]
+        bar = bars[0]
+        assert (bar.open, bar.high, bar.low, bar.close) == (5.0, 5.0, 3.0, 3.0)
+        assert bar.volume == 8.0 and bar.sales == 2
+
+    def test_window_rolls(self):
+        prices = SalesAggregator(window=3600)
+        prices.update([sale(0, 1.0, 0), sale(1, 9.0, 30), sale(2, 7.0, 70)])
+        assert prices.floor("1001") == 7.0
+        assert prices.sales("1001") == 2
+        assert prices.volume("1001") == pytest.approx(16.0)
+        assert prices.last("1001") == 7.0
+
+    def test_out_of_order(self):
+        prices = SalesAggregator(window=3600, bar_seconds=3600)
+        prices.update([sale(0, 6.0, 50), sale(1, 2.0, 10), sale(2, 4.0, 30)])
+        bar = prices.bars("1001")[0]
+        assert (bar.open, bar.close, bar.low) == (2.0, 6.0, 2.0)
+        assert prices.last("1001") == 6.0
+        # older than the window: counted in the bars only
+        prices.add(sale(3, 1.0, 50 - 61))
+        assert prices.floor("1001") == 2.0
+
+    def test_seen_sales_forgotten(self):
+        prices = SalesAggregator(window=3600, bar_seconds=600, max_bars=12)
+        prices.update(sale(i, 1.0, i * 10) for i in range(100))
+        # two hours back from the latest sale, at minute 990
+        assert len(prices._seen) == 13
+        assert not prices.add(sale(0, 1.0, 0))
+        assert prices.bars("1001")[0].sales == 1
+
+    def test_keys_and_skips(self):
+        prices = SalesAggregator()
+        bundle = sale(0, 10.0, 1, templates=("1001", "1002"))
+        assert prices.add(bundle)
+        assert not prices.add(sale(1, 1.0, 1, state=1))
+        assert not prices.add(sale(2, 1.0, 1, token="TLM"))
+        assert sorted(prices.keys()) == ["1001", "1002"]
+        assert prices.floor("1002") == 5.0
+        by_collection = SalesAggregator(by="collection")
+        by_collection.add(bundle)
+        assert by_collection.summary() == {
+            "benchcollect": {"floor": 10.0, "volume": 10.0, "sales": 1, "last": 10.0}
+        }
@@ -0,0 +1,122 @@
+"""Tests for IPFS gateways and the media fetcher"""
+
+import os
+import threading
+
+from daltonapi.api import Atom
+from daltonapi.media import MediaCache, MediaFetcher, media_cids
+from daltonapi.tools.atomic_classes import Asset, Template
+from daltonapi.tools.atomic_errors import MediaFetchError
+from daltonapi.tools.transport import MemoryTransport
+
+GATEWAY = "https://gateway.example/ipfs/"
+
+
+def make_asset(index, cid="QmImage"):
+    return {
+        "asset_id": str(index),
+        "collection": {"collection_name": "col", "img": "QmCollection"},
+        "template": {"template_id": "1", "immutable_data": {"img": cid, "name": "X"}},
+        "data": {"img": cid, "video": f"QmVideo{index}", "name": "X", "rarity": 3},
+    }
+
+
+class TestGateways:
+    def test_default(self):
+        asset = Asset(make_asset(1))
+        assert asset.image == "https://ipfs.io/ipfs/QmImage"
+        assert asset.media_cids == {"img": "QmImage", "video": "QmVideo1"}
+        assert "gateway" not in vars(asset)
+
+    def test_per_client(self):
+        transport = MemoryTransport()
+        transport.add("GET", "fake/assets/1", {"success": True, "data": make_asset(1)})
+        atom = Atom("fake/", transport=transport, gateways=[GATEWAY, "https://b/ipfs/"])
+        asset = atom.get_asset("1")
+        assert asset.image == f"{GATEWAY}QmImage"
+        assert asset.all_media["video"] == f"{GATEWAY}QmVideo1"
+        assert asset.template.image == f"{GATEWAY}QmImage"
+        assert asset.collection.image == f"{GATEWAY}QmCollection"
+        assert Asset(make_asset(1)).image == "https://ipfs.io/ipfs/QmImage"
+
+
+class Gateway:
+    """Serves files by CID, counting requests"""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, method, url, params, json, headers):
+        cid = url.rsplit("/", 1)[1]
+        with self.lock:
+            self.requests.append(url)
+        if cid in self.missing or url in self.missing:
+            return 504, b""
+        return 200, cid.encode() * 10
+
+
+class TestMediaFetcher:
+    def test_fetch_all_once(self, tmp_path):
+        gateway = Gateway()
+        fetcher = MediaFetcher(
+            MediaCache(str(tmp_path)), workers=4, transport=MemoryTransport(gateway)
+        )
+        assets = [Asset(make_asset(i % 3)) for i in range(30)]
+        assert media_cids(assets) == ["QmImage", "QmVideo0", "QmVideo1", "QmVideo2"]
+        assert media_cids([assets[0].collection, "QmOther"], keys=["img"]) == [
+            "QmCollection",
+            "QmOther",
+        ]
+        result = fetcher.fetch_all(assets)
+        assert len(result.paths) == 4 and not result.errors
+        with open(result.paths["QmVideo2"], "rb") as file:
+            assert file.read() == b"QmVideo2" * 10
+        fetcher.fetch_all(
+            assets
+            + [Template({"template_id": "1", "immutable_data": {"img": "QmImage"}})]
+        )
+        assert len(gateway.requests) == 4
+        assert fetcher.hits == 4
+
+    def test_gateway_fallback(self, tmp_path):
+        first = Gateway(missing=["a/ipfs/QmB"])
+        transport = MemoryTransport(first)
+        fetcher = MediaFetcher(
+            MediaCache(str(tmp_path)),
+            gateways=["a/ipfs/", "b/ipfs/"],
+            transport=transport,
+        )
+        fetcher.fetch("QmB")
+        assert first.requests == ["a/ipfs/QmB", "b/ipfs/QmB"]
+
+    def test_errors(self, tmp_path):
+        fetcher = MediaFetcher(
+            MediaCache(str(tmp_path)),
+            max_file_bytes=50,
+            transport=MemoryTransport(Gateway(missing=["QmGone"])),
+        )
+        result = fetcher.fetch_all(["QmGone", "QmLongerThanFiftyBytes", "QmOk"])
+        assert list(result.paths) == ["QmOk"]
+        assert isinstance(result.errors["QmGone"], MediaFetchError)
+        assert "larger" in str(result.errors["QmLongerThanFiftyBytes"])
+
+
+class TestMediaCache:
+    def test_lru_eviction(self, tmp_path):
+        cache = MediaCache(str(tmp_path), max_bytes=25)
+        for cid in ("QmA", "QmB"):
+            cache.put(cid, b"x" * 10)
+        assert cache.get("QmA")
+        cache.put("QmC", b"x" * 10)
+        assert "QmB" not in cache and "QmA" in cache
+        assert not os.path.exists(cache.path("QmB"))
+        assert (cache.size, cache.evicted) == (20, 1)
+
+    def test_reopen(self, tmp_path):
+        cache = MediaCache(str(tmp_path))
+        cache.put("bafy/with/path", b"data")
+        reopened = MediaCache(str(tmp_path))
+        assert reopened.size == 4
+        assert reopened.get("bafy/with/path") == cache.path("bafy/with/path")
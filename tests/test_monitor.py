@@ -0,0 +1,128 @@
+"""Tests for bulk account retrieval and the resource monitor"""
+
+import math
+
+from benchmarks.server import make_account
+from daltonapi.api import Wax
+from daltonapi.monitor import ResourceMonitor
+from daltonapi.tools.cache import ResponseCache
+from daltonapi.tools.atomic_errors import RequestFailedError
+from daltonapi.tools.transport import MemoryTransport
+from daltonapi.tools.wax_classes import Account
+
+
+class Chain:
+    """Serves accounts whose CPU usage can be changed"""
+
+    def __init__(self, names):
+        self.accounts = {name: make_account(name) for name in names}
+        self.requests = 0
+
+    def __call__(self, method, url, params, json, headers):
+        self.requests += 1
+        account = self.accounts.get(json["account_name"])
+        if account is None:
+            return 500, {"code": 500, "message": "unknown key"}
+        return 200, account
+
+
+class UnreachableTransport(MemoryTransport):
+    """Loses the connection for some accounts"""
+
+    retry_errors = (ConnectionError,)
+
+    def __init__(self, handler, unreachable):
+        super().__init__(handler)
+        self.unreachable = unreachable
+
+    def request(self, method, url, params=None, json=None, headers=None):
+        if json["account_name"] in self.unreachable:
+            raise ConnectionError("connection reset")
+        return super().request(method, url, params, json, headers)
+
+
+class TestAccount:
+    def test_parsed_once(self):
+        account = Account(make_account("alice"))
+        assert account.balance == 123.456789
+        assert account.staked_balance == {"cpu": 20.0, "net": 10.0}
+        assert account.cpu == (200, 1000) and account.ram == (5000, 10000)
+        assert account.to_dict() == make_account("alice")
+        account._core_liquid_balance = "1.00000000 WAX"
+        assert account.balance == 123.456789
+
+    def test_no_liquid_balance(self):
+        data = make_account("empty")
+        del data["core_liquid_balance"]
+        assert Account(data).balance == 0.0
+
+
+class TestGetAccounts:
+    def test_concurrent_and_cached(self):
+        chain = Chain([f"acct{i}" for i in range(20)])
+        wax = Wax(
+            "fake/", transport=MemoryTransport(chain), cache=ResponseCache(ttl=60)
+        )
+        names = [f"acct{i}" for i in range(20)] + ["acct3", "nobody"]
+        accounts = wax.get_accounts(names, workers=4)
+        assert list(accounts) == [f"acct{i}" for i in range(20)]
+        assert accounts["acct7"].get_id() == "acct7"
+        assert chain.requests == 21
+        wax.get_accounts(names[:20])
+        assert chain.requests == 21
+
+    def test_failures_reported(self):
+        chain = Chain(["a", "b", "c"])
+        transport = UnreachableTransport(chain, unreachable={"b"})
+        errors = {}
+        accounts = Wax("fake/", transport=transport).get_accounts(
+            ["a", "b", "c", "gone"], errors=errors
+        )
+        assert list(accounts) == ["a", "c"]
+        assert isinstance(errors["b"], ConnectionError)
+        assert isinstance(errors["gone"], RequestFailedError)
+
+
+class TestResourceMonitor:
+    def test_refresh(self):
+        chain = Chain(["a", "b", "c"])
+        chain.accounts["b"]["cpu_limit"] = {"used": 950, "available": 50, "max": 1000}
+        wax = Wax("fake/", transport=MemoryTransport(chain))
+        monitor = ResourceMonitor(
+            wax, ["a", "b", "c", "gone"], thresholds={"cpu": 0.9, "balance": 100}
+        )
+        seen = []
+        monitor.add_callback(seen.append)
+        report = monitor.refresh()
+        assert report.column("cpu_used").tolist()[:3] == [200, 950, 200]
+        assert report.missing == ["gone"] and math.isnan(report.row("gone")["balance"])
+        assert report.row("b")["ram_quota"] == 10000
+        assert [(b.account, b.resource, b.new) for b in report.breaches] == [
+            ("b", "cpu", True)
+        ]
+        assert seen == report.breaches
+
+        chain.accounts["a"]["core_liquid_balance"] = "5.00000000 WAX"
+        report = monitor.refresh()
+        assert [(b.account, b.resource, b.new) for b in report.breaches] == [
+            ("b", "cpu", False),
+            ("a", "balance", True),
+        ]
+
+    def test_schedule(self):
+        now = [1000.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds + 2
+
+        wax = Wax("fake/", transport=MemoryTransport(Chain(["a"])))
+        monitor = ResourceMonitor(
+            wax, ["a"], interval=10, clock=lambda: now[0], sleep=sleep
+        )
+        reports = list(monitor.reports(max_refreshes=3))
+        assert len(reports) == 3 and monitor.refreshes == 3
+        # the schedule stays fixed when a sleep overruns
+        assert sleeps == [10, 8]
+        assert not reports[0].breaches
@@ -0,0 +1,166 @@
+"""Tests for adaptive page sizes"""
+
+from urllib.parse import urlparse
+
+import pytest
+
+from benchmarks.server import StandInServer
+from daltonapi.api import Atom, WaxTable
+from daltonapi.tools.atomic_errors import RequestFailedError
+from daltonapi.tools.paging import PageSizeController
+from daltonapi.tools.transport import MemoryTransport
+
+
+class Node:
+    """Serves a table, capping the rows per response and timing out large requests"""
+
+    def __init__(self, rows=1000, cap=0, fail_over=0, refuse=False):
+        self.server = StandInServer(table_rows=rows)
+        self.cap = cap
+        self.fail_over = fail_over
+        self.refuse = refuse
+        self.limits = []
+
+    def __call__(self, method, url, params, json, headers):
+        limit = int(json["limit"])
+        self.limits.append(limit)
+        if self.refuse:
+            return 500, {"code": 500, "message": "unknown table"}
+        if self.fail_over and limit > self.fail_over:
+            raise TimeoutError("read timed out")
+        if self.cap:
+            json = dict(json, limit=min(limit, self.cap))
+        return self.server.post(urlparse(url).path, json)
+
+
+class TimeoutTransport(MemoryTransport):
+    """MemoryTransport whose timeouts are retryable"""
+
+    retry_errors = (TimeoutError,)
+
+
+def table(node):
+    return WaxTable(
+        "bench",
+        "rows",
+        endpoint="/v1/chain/get_table_rows",
+        transport=TimeoutTransport(node),
+    )
+
+
+class TestPageSizeController:
+    def test_grows_while_faster(self):
+        paging = PageSizeController(initial=10, minimum=10, maximum=1000)
+        for _ in range(4):
+            size = paging.size
+            paging.record(size, size, size / 1000 + 0.01)
+        assert paging.size == 160
+        assert paging.best == 80
+
+    def test_turns_around_when_slower(self):
+        paging = PageSizeController(initial=100, minimum=10, maximum=1000)
+        paging.record(100, 100, 0.1)
+        paging.record(200, 200, 1.0)
+        assert paging.size == 100
+        assert paging.best == 100
+
+    def test_error_caps_size(self):
+        paging = PageSizeController(initial=400, recover_after=2)
+        assert paging.record(400, 0, 1.0, error=True) == 200
+        assert paging.errors == 1
+        paging.record(200, 200, 0.1)
+        assert paging.size <= 200
+        paging.record(paging.size, paging.size, 0.1)
+        assert paging._ceiling == 400
+
+    def test_partial_page(self):
+        paging = PageSizeController(initial=500)
+        assert paging.record(500, 120, 1.0, more=True) == 120
+        assert paging.partial == 1
+        # a short last page changes nothing
+        assert paging.record(120, 7, 0.1) == 120
+
+    def test_max_bytes(self):
+        paging = PageSizeController(initial=100, max_bytes=10000)
+        assert paging.record(100, 100, 0.1, size_bytes=20000) == 50
+
+    def test_bounds(self):
+        paging = PageSizeController(initial=5000, minimum=10, maximum=100)
+        assert paging.size == 100
+        paging.record(100, 100, 0.1)
+        assert paging.size == 100
+        for _ in range(5):
+            paging.record(paging.size, 0, 1.0, error=True)
+        assert paging.size == 10
+
+
+class TestAdaptiveTable:
+    def test_same_rows(self):
+        node = Node(rows=1000)
+        paging = PageSizeController(initial=10, maximum=400)
+        rows = table(node).get_table_rows("bench", {}, start_at=0, paging=paging)
+        assert [row["id"] for row in rows] == list(range(1000))
+        assert len(set(node.limits)) > 1
+        assert max(node.limits) <= 400
+
+    def test_backs_off_partial(self):
+        node = Node(rows=1000, cap=50)
+        paging = PageSizeController(initial=200, recover_after=100)
+        rows = table(node).get_table_rows("bench", {}, start_at=0, paging=paging)
+        assert len(rows) == 1000
+        assert paging.partial == 1
+        assert node.limits[1:] and max(node.limits[1:]) <= 50
+
+    def test_retries_smaller(self):
+        node = Node(rows=300, fail_over=100)
+        paging = PageSizeController(initial=400, recover_after=100)
+        rows = table(node).get_table_rows("bench", {}, start_at=0, paging=paging)
+        assert len(rows) == 300
+        assert node.limits[:3] == [400, 200, 100]
+        assert paging.errors == 2
+
+    def test_raises_at_minimum(self):
+        node = Node(rows=300, fail_over=1)
+        paging = PageSizeController(initial=40, minimum=10)
+        with pytest.raises(TimeoutError):
+            table(node).get_table_rows("bench", {}, start_at=0, paging=paging)
+        assert node.limits == [40, 20, 10]
+
+    def test_api_errors_raised_at_once(self):
+        node = Node(refuse=True)
+        paging = PageSizeController(initial=40, minimum=10)
+        with pytest.raises(RequestFailedError):
+            table(node).get_table_rows("bench", {}, start_at=0, paging=paging)
+        assert node.limits == [40]
+        assert paging.errors == 0 and paging.size == 40
+
+
+class TestIterAssets:
+    def test_keyset_pages(self):
+        server = StandInServer(assets=250)
+
+        def handler(method, url, params, json, headers):
+            return server.get(urlparse(url).path, params)
+
+        transport = MemoryTransport(handler)
+        atom = Atom("/atomicassets/v1/", transport=transport)
+        paging = PageSizeController(initial=20, minimum=10, maximum=80)
+        ids = [
+            asset.get_id()
+            for asset in atom.iter_assets(collection="benchcollect", paging=paging)
+        ]
+        assert ids == [str(1099500000000 + i) for i in range(250)]
+        limits = [call[2]["limit"] for call in transport.calls]
+        assert limits[0] == 20 and len(set(limits)) > 1
+        assert transport.calls[1][2]["lower_bound"] == str(1099500000000 + 20)
+
+    def test_fixed_limit(self):
+        server = StandInServer(assets=25)
+
+        def handler(method, url, params, json, headers):
+            return server.get(urlparse(url).path, params)
+
+        transport = MemoryTransport(handler)
+        atom = Atom("/atomicassets/v1/", transport=transport)
+        assert len(list(atom.iter_assets(collection="benchcollect", limit=10))) == 25
+        assert len(transport.calls) == 3
@@ -0,0 +1,85 @@
+"""Tests for the ProvenanceIndex class"""
+
+import random
+
+from daltonapi.tools.atomic_classes import Transfer
+from daltonapi.provenance import ProvenanceIndex
+
+
+def make_transfer(transfer_id, sender, recipient, asset_ids, created):
+    return Transfer(
+        {
+            "transfer_id": str(transfer_id),
+            "sender_name": sender,
+            "recipient_name": recipient,
+            "assets": [{"asset_id": asset_id} for asset_id in asset_ids],
+            "created_at_time": str(created),
+        }
+    )
+
+
+TRANSFERS = [
+    make_transfer(1, "alice", "bob", ["10", "11"], 100),
+    make_transfer(3, "carol", "alice", ["10"], 300),
+    make_transfer(2, "bob", "carol", ["10"], 200),
+]
+
+
+class TestProvenanceIndex:
+    def test_owner_at(self):
+        index = ProvenanceIndex(TRANSFERS)
+        assert index.owner_at("10", 50) == "alice"
+        assert index.owner_at("10", 100) == "bob"
+        assert index.owner_at("10", 250) == "carol"
+        assert index.owner_at("10", 1000) == "alice"
+        assert index.owner_at("99", 1000) is None
+
+    def test_holdings_at(self):
+        index = ProvenanceIndex(TRANSFERS)
+        assert index.holdings_at("alice", 50) == {"10", "11"}
+        assert index.holdings_at("bob", 150) == {"10", "11"}
+        assert index.holdings_at("bob", 250) == {"11"}
+        assert index.holdings_at("alice", 300) == {"10"}
+
+    def test_holdings_match_owners(self):
+        rng = random.Random(7)
+        accounts = ["alice", "bob", "carol", "dave"]
+        transfers = [
+            make_transfer(
+                i,
+                rng.choice(accounts),
+                rng.choice(accounts),
+                [str(rng.randrange(20))],
+                rng.randrange(1000),
+            )
+            for i in range(600)
+        ]
+        index = ProvenanceIndex(transfers[:300])
+        for transfer in transfers[300:]:
+            index.add(transfer)
+            if transfer.get_id().endswith("0"):
+                index.holdings_at("alice", 500)
+        for when in range(0, 1000, 50):
+            for account in accounts:
+                owned = {
+                    str(a) for a in range(20) if index.owner_at(str(a), when) == account
+                }
+                assert index.holdings_at(account, when) == owned
+
+    def test_incremental_matches_bulk(self):
+        index = ProvenanceIndex()
+        for transfer in reversed(TRANSFERS):
+            assert index.add(transfer)
+        assert not index.add(TRANSFERS[0])
+        bulk = ProvenanceIndex(TRANSFERS)
+        assert index.history("10") == bulk.history("10")
+        assert len(index) == 3
+
+    def test_round_trip(self, tmp_path):
+        index = ProvenanceIndex(TRANSFERS)
+        path = str(tmp_path / "index.gz")
+        index.save(path)
+        loaded = ProvenanceIndex.load(path)
+        assert loaded.history("10") == index.history("10")
+        assert loaded.holdings_at("bob", 150) == {"10", "11"}
+        assert not loaded.add(TRANSFERS[1])
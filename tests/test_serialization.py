@@ -0,0 +1,53 @@
+"""Tests for model serialization"""
+
+import pytest
+from benchmarks.server import make_account, make_asset, make_transfer
+from daltonapi.tools import serialization
+from daltonapi.tools.atomic_classes import Asset, Template, Transfer
+from daltonapi.tools.wax_classes import Account
+
+
+class TestToDict:
+    def test_round_trips(self):
+        for cls, payload in (
+            (Asset, make_asset(1)),
+            (Transfer, make_transfer(1)),
+            (Account, make_account("alice")),
+            (Template, {"template_id": "1", "collection": None}),
+        ):
+            obj = cls(payload)
+            assert obj.to_dict() == payload
+            assert cls.from_dict(obj.to_dict()).to_dict() == payload
+
+
+class TestPack:
+    def test_shared_entities(self):
+        assets = [Asset(make_asset(i, templates=2)) for i in range(10)]
+        packed = serialization.pack(assets)
+        # one collection, two schemas and two templates
+        assert len(packed["entities"]) == 5
+        restored = serialization.unpack(packed)
+        assert [a.to_dict() for a in restored] == [a.to_dict() for a in assets]
+        assert restored[0].collection is restored[1].collection
+        assert restored[0].template is restored[2].template
+        assert restored[0].template is not restored[1].template
+
+    def test_different_copies_are_kept(self):
+        first, second = make_asset(0), make_asset(1)
+        second["template"]["issued_supply"] = "501"
+        restored = serialization.unpack(
+            serialization.pack([Asset(first), Asset(second)])
+        )
+        assert restored[1].template._issued_supply == "501"
+        assert restored[0].template._issued_supply == "500"
+
+    @pytest.mark.parametrize("codec", ["pickle", "msgpack"])
+    def test_codecs(self, codec):
+        if codec == "msgpack":
+            pytest.importorskip("msgpack")
+        objects = [Asset(make_asset(i)) for i in range(5)]
+        objects += [Transfer(make_transfer(1)), Account(make_account("bob"))]
+        restored = serialization.loads(serialization.dumps(objects, codec), codec)
+        assert [type(obj) for obj in restored] == [type(obj) for obj in objects]
+        assert [obj.to_dict() for obj in restored] == [obj.to_dict() for obj in objects]
+        assert restored == objects[:6] + [restored[6]]
@@ -0,0 +1,93 @@
+"""Tests for memory-mapped snapshot files"""
+
+import pytest
+from benchmarks.server import make_asset, make_transfer
+from daltonapi.tools.atomic_classes import Asset, Transfer
+from daltonapi.tools.atomic_errors import SnapshotFormatError
+from daltonapi.tools.snapshot_file import (
+    _HEADER,
+    _SECTION,
+    SnapshotFile,
+    write_snapshot,
+)
+
+
+@pytest.fixture(name="snapshot")
+def fixture_snapshot(tmp_path):
+    # written out of order, with a burned asset without template
+    assets = [Asset(make_asset(i, templates=5)) for i in reversed(range(50))]
+    burned = make_asset(50)
+    burned.update(owner=None, template=None, template_mint=None)
+    assets.append(Asset(burned))
+    transfers = [Transfer(make_transfer(i)) for i in range(10)]
+    path = str(tmp_path / "assets.snap")
+    write_snapshot(path, assets, transfers)
+    with SnapshotFile(path) as snapshot:
+        yield snapshot, {asset.get_id(): asset for asset in assets}, transfers
+
+
+class TestSnapshotFile:
+    def test_lookup(self, snapshot):
+        snapshot, assets, _ = snapshot
+        assert len(snapshot) == 51
+        for asset_id, asset in assets.items():
+            assert snapshot.get_asset(asset_id).to_dict() == asset.to_dict()
+        assert snapshot.get_asset("1") is None
+        ids = [row.asset_id for row in snapshot]
+        assert ids == sorted(ids)
+
+    def test_rows(self, snapshot):
+        snapshot, _, _ = snapshot
+        row = snapshot.row(str(1099500000000 + 7))
+        assert (row.owner, row.template_id, row.template_mint) == (
+            "owner7.wam",
+            "1002",
+            8,
+        )
+        assert row.collection == "benchcollect"
+        assert row.minted_at == 1600000010000 + 7 * 500
+        burned = snapshot.row(str(1099500000000 + 50))
+        assert (burned.owner, burned.template_id, burned.template_mint) == (
+            None,
+            None,
+            0,
+        )
+
+    def test_entities_are_shared(self, snapshot):
+        snapshot, _, _ = snapshot
+        first, second = (snapshot.asset(i) for i in (0, 5))
+        assert first.template is second.template
+        assert first.collection is snapshot.asset(1).collection
+        assert snapshot.asset(50).template is None
+
+    def test_select(self, snapshot):
+        snapshot, assets, _ = snapshot
+        rows = list(snapshot.select(template="1003"))
+        assert [row.asset_id for row in rows] == sorted(
+            key
+            for key, asset in assets.items()
+            if asset.template and asset.template.get_id() == "1003"
+        )
+        assert len(list(snapshot.select(owner="owner3.wam", template="1003"))) == 1
+        assert not list(snapshot.select(owner="nobody"))
+        assert len(list(snapshot.select())) == 51
+
+    def test_transfers(self, snapshot):
+        snapshot, _, transfers = snapshot
+        assert snapshot.transfer_count == 10
+        assert snapshot.get_transfer("5000004").to_dict() == transfers[4].to_dict()
+        moved = snapshot.transfers_of(str(1099500000000 + 4))
+        assert [transfer.get_id() for transfer in moved] == ["5000003", "5000004"]
+
+    def test_not_a_snapshot(self, tmp_path):
+        path = tmp_path / "other.snap"
+        path.write_bytes(b"not a snapshot at all")
+        with pytest.raises(SnapshotFormatError):
+            SnapshotFile(str(path))
+
+    def test_truncated_section_table(self, tmp_path):
+        path = tmp_path / "cut.snap"
+        write_snapshot(str(path), [Asset(make_asset(1))], [])
+        path.write_bytes(path.read_bytes()[: _HEADER.size + _SECTION.size + 10])
+        with pytest.raises(SnapshotFormatError, match="section table"):
+            SnapshotFile(str(path))
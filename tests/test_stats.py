@@ -0,0 +1,77 @@
+"""Tests for the aggregate stats endpoints"""
+
+from daltonapi.api import Atom
+from daltonapi.tools.cache import ResponseCache
+from daltonapi.tools.transport import MemoryTransport
+
+
+def make_atom(url, data, **kwargs):
+    transport = MemoryTransport()
+    transport.add("GET", f"fake/{url}", {"success": True, "data": data})
+    return Atom("fake/", transport=transport, **kwargs), transport
+
+
+class TestStats:
+    def test_collection_stats(self):
+        atom, _ = make_atom(
+            "collections/col/stats",
+            {
+                "assets": "1200",
+                "burned": "30",
+                "templates": "12",
+                "burned_by_template": [{"template_id": "7", "burned": "30"}],
+                "burned_by_schema": [{"schema_name": "cards", "burned": "30"}],
+            },
+        )
+        stats = atom.get_collection_stats("col")
+        assert stats.get_id() == "col"
+        assert (stats.assets, stats.burned, stats.templates) == (1200, 30, 12)
+        assert stats.burned_by_template == {"7": 30}
+        assert stats.burned_by_schema == {"cards": 30}
+
+    def test_template_and_schema_stats(self):
+        atom, _ = make_atom("templates/col/7/stats", {"assets": "50", "burned": "2"})
+        stats = atom.get_template_stats("col", "7")
+        assert (stats.get_id(), stats.assets, stats.burned) == ("7", 50, 2)
+        atom, _ = make_atom(
+            "schemas/col/cards/stats", {"assets": "80", "burned": "3", "templates": "4"}
+        )
+        stats = atom.get_schema_stats("col", "cards")
+        assert (stats.get_id(), stats.templates) == ("cards", 4)
+
+    def test_account_stats(self):
+        atom, _ = make_atom(
+            "accounts/alice",
+            {
+                "collections": [
+                    {"collection": {"collection_name": "col"}, "assets": "3"}
+                ],
+                "templates": [
+                    {"collection_name": "col", "template_id": "7", "assets": "3"}
+                ],
+                "assets": "3",
+            },
+        )
+        stats = atom.get_account_stats("alice")
+        assert stats.get_id() == "alice"
+        assert stats.assets == 3
+        assert stats.collections == {"col": 3}
+        assert stats.templates == {"7": 3}
+
+    def test_account_collection_stats_are_cached(self):
+        atom, transport = make_atom(
+            "accounts/alice/col",
+            {
+                "templates": [{"template_id": "7", "assets": "2"}],
+                "schemas": [
+                    {"schema_name": "cards", "assets": "2"},
+                    {"schema_name": "packs", "assets": "1"},
+                ],
+            },
+            cache=ResponseCache(),
+        )
+        stats = atom.get_account_collection_stats("alice", "col")
+        assert stats.assets == 3
+        assert stats.schemas == {"cards": 2, "packs": 1}
+        assert atom.get_account_collection_stats("alice", "col") is stats
+        assert len(transport.calls) == 1
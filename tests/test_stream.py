@@ -0,0 +1,121 @@
+"""Tests for the live event stream client"""
+
+import asyncio
+import threading
+
+import pytest
+
+from benchmarks.server import StandInServer
+from daltonapi.api import Atom
+from daltonapi.stream import EventStream, _parse
+from daltonapi.tools.atomic_classes import Transfer
+from daltonapi.tools.atomic_errors import StreamError
+
+
+@pytest.fixture
+def server():
+    with StandInServer(transfers=10, ping_interval=0.2) as running:
+        yield running
+
+
+def publish_soon(server, count=1, delay=0.1, **kwargs):
+    def publish():
+        for _ in range(count):
+            server.add_transfer(**kwargs)
+
+    timer = threading.Timer(delay, publish)
+    timer.start()
+    return timer
+
+
+class TestParse:
+    def test_event(self):
+        assert _parse('42/atomicassets/v1/transfers,["new_transfer",{"a":1}]') == (
+            "2",
+            "/atomicassets/v1/transfers",
+            ["new_transfer", {"a": 1}],
+        )
+
+    def test_default_namespace_and_ack(self):
+        assert _parse('4212["fork",{}]') == ("2", "/", ["fork", {}])
+
+
+class TestEventStream:
+    def test_live_events(self, server):
+        with EventStream(Atom(server.atomic_endpoint)) as stream:
+            stream.poll()
+            publish_soon(server, count=2)
+            events = list(stream.events(max_events=2))
+        assert [event.name for event in events] == ["new_transfer"] * 2
+        assert isinstance(events[0].item, Transfer)
+        assert [event.item.get_id() for event in events] == ["5000010", "5000011"]
+        assert not events[0].backfilled
+        assert stream.last_ids == {"transfers": "5000011"}
+
+    def test_reconnect_backfills_gap(self, server):
+        stream = EventStream(Atom(server.atomic_endpoint), reconnect_delay=0.01)
+        stream.poll()
+        publish_soon(server)
+        assert next(iter(stream)).item.get_id() == "5000010"
+        server.drop_stream()
+        for _ in range(3):
+            server.add_transfer(publish=False)
+        events = []
+        for event in stream.events():
+            events.append(event)
+            if len(events) == 3:
+                publish_soon(server, delay=0.05)
+            if len(events) == 4:
+                break
+        stream.close()
+        assert stream.connects == 2
+        assert [e.item.get_id() for e in events] == [
+            "5000011",
+            "5000012",
+            "5000013",
+            "5000014",
+        ]
+        assert [e.backfilled for e in events] == [True, True, True, False]
+
+    def test_since(self, server):
+        stream = EventStream(
+            Atom(server.atomic_endpoint), since={"transfers": "5000007"}
+        )
+        events = stream.poll()
+        stream.close()
+        assert [e.item.get_id() for e in events] == ["5000008", "5000009"]
+
+    def test_pings_answered(self, server):
+        with EventStream(Atom(server.atomic_endpoint)) as stream:
+            stream.poll()
+            for _ in range(3):
+                assert stream.poll() == []
+            publish_soon(server, delay=0.0)
+            assert len(next(stream.events()).data["transfer"]["assets"]) == 2
+            assert stream.connects == 1
+
+    def test_async(self, server):
+        async def collect():
+            stream = EventStream(Atom(server.atomic_endpoint))
+            stream.poll()
+            publish_soon(server, count=2)
+            events = [event async for event in stream.events_async(max_events=2)]
+            stream.close()
+            return events
+
+        loop = asyncio.new_event_loop()
+        try:
+            events = loop.run_until_complete(collect())
+        finally:
+            loop.close()
+        assert [event.item.get_id() for event in events] == ["5000010", "5000011"]
+
+    def test_unreachable(self):
+        stream = EventStream(
+            Atom("http://127.0.0.1:9/atomicassets/v1/"),
+            timeout=0.5,
+            reconnect_delay=0.01,
+            max_reconnects=1,
+        )
+        with pytest.raises(StreamError):
+            stream.poll()
@@ -0,0 +1,263 @@
+"""Tests for the pluggable transports"""
+
+import asyncio
+import gc
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from benchmarks.server import StandInServer
+from daltonapi.api import Atom, Wax, WaxTable
+from daltonapi.tools.atomic_classes import Asset
+from daltonapi.tools.atomic_errors import NoRecordingError, RequestFailedError
+from daltonapi.tools.cache import ResponseCache
+from daltonapi.tools.transport import (
+    Http2Transport,
+    MemoryTransport,
+    RecordReplayTransport,
+    Response,
+    Transport,
+)
+
+
+class FlakyTransport(Transport):
+    """Fails a number of times before answering"""
+
+    retry_errors = (ConnectionError,)
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    def request(self, method, url, params=None, json=None, headers=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("reset")
+        return Response(200, b'{"success": true, "data": {"asset_id": "1"}}')
+
+
+class TestMemoryTransport:
+    def test_atom_fixture(self):
+        transport = MemoryTransport()
+        transport.add(
+            "GET", "fake/assets/1", {"success": True, "data": {"asset_id": "1"}}
+        )
+        atom = Atom("fake/", transport=transport)
+        assert atom.get_asset("1") == Asset({"asset_id": "1"})
+        assert transport.calls == [("GET", "fake/assets/1", {}, None)]
+
+    def test_exact_params_win(self):
+        transport = MemoryTransport()
+        transport.add("GET", "fake/accounts", {"success": True, "data": []})
+        transport.add(
+            "GET",
+            "fake/accounts",
+            {"success": True, "data": [{"account": "alice", "assets": "1"}]},
+            params={"template_id": "7", "limit": 100, "page": 1, "order": "desc"},
+        )
+        atom = Atom("fake/", transport=transport)
+        assert atom.get_holders(template="7") == [{"account": "alice", "assets": "1"}]
+        assert atom.get_holders(template="8") == []
+
+    def test_chain_clients(self):
+        transport = MemoryTransport()
+        transport.add("POST", "fake/v1/chain/get_account", {"account_name": "alice"})
+        transport.add("POST", "table", {"rows": [{"id": 1}]})
+        wax = Wax("fake/", transport=transport)
+        assert wax.get_account("alice").get_id() == "alice"
+        table = WaxTable("contract", "table", endpoint="table", transport=transport)
+        assert table.get_table_row("scope", "1") == {"id": 1}
+
+    def test_missing_fixture_fails(self):
+        atom = Atom("fake/", transport=MemoryTransport())
+        with pytest.raises(RequestFailedError):
+            atom.get_asset("1")
+
+    def test_retries(self):
+        atom = Atom("fake/", transport=FlakyTransport(2), retries=2)
+        assert atom.get_asset("1") == Asset({"asset_id": "1"})
+        with pytest.raises(ConnectionError):
+            Atom("fake/", transport=FlakyTransport(2), retries=1).get_asset("1")
+
+
+class TestRecordReplayTransport:
+    def test_record_then_replay(self, tmp_path):
+        path = str(tmp_path / "cassette.json")
+        inner = MemoryTransport()
+        inner.add("GET", "fake/assets/1", {"success": True, "data": {"asset_id": "1"}})
+        with RecordReplayTransport(path, mode="record", transport=inner) as recorder:
+            Atom("fake/", transport=recorder).get_asset("1")
+
+        replayer = RecordReplayTransport(path, mode="replay")
+        atom = Atom("fake/", transport=replayer)
+        assert atom.get_asset("1") == Asset({"asset_id": "1"})
+        with pytest.raises(NoRecordingError):
+            atom.get_asset("2")
+
+    def test_auto_records_misses(self, tmp_path):
+        path = str(tmp_path / "cassette.json")
+        inner = MemoryTransport(lambda *_: (200, {"success": True, "data": []}))
+        transport = RecordReplayTransport(path, transport=inner)
+        atom = Atom("fake/", transport=transport, coalesce=False)
+        atom.get_holders(template="1")
+        atom.get_holders(template="1")
+        atom.get_holders(template="2")
+        assert len(inner.calls) == 2
+
+    def test_not_modified_keeps_recording(self, tmp_path):
+        path = str(tmp_path / "cassette.json")
+        payload = {"success": True, "data": {"collection_name": "col"}}
+
+        def server(method, url, params, json, headers):
+            if headers.get("If-None-Match") == '"v1"':
+                return 304, b""
+            return 200, payload, {"ETag": '"v1"'}
+
+        inner = MemoryTransport(server)
+        with RecordReplayTransport(path, mode="record", transport=inner) as recorder:
+            atom = Atom("fake/", transport=recorder, cache=ResponseCache(ttl=0))
+            atom.get_collection("col")
+            atom.get_collection("col")
+        assert len(inner.calls) == 2
+
+        replayer = RecordReplayTransport(path, mode="replay")
+        collection = Atom("fake/", transport=replayer).get_collection("col")
+        assert collection.get_id() == "col"
+
+    def test_written_on_flush(self, tmp_path):
+        path = str(tmp_path / "cassette.json")
+        inner = MemoryTransport(lambda *_: (200, {"success": True, "data": []}))
+        transport = RecordReplayTransport(path, transport=inner)
+        atom = Atom("fake/", transport=transport, coalesce=False)
+        for template in range(5):
+            atom.get_holders(template=str(template))
+        assert not os.path.exists(path)
+        transport.flush()
+        with open(path, encoding="utf-8") as file:
+            assert len(json.load(file)) == 5
+        atom.get_holders(template="5")
+        del atom, transport
+        gc.collect()
+        with open(path, encoding="utf-8") as file:
+            assert len(json.load(file)) == 6
+
+
+class H2Server:
+    """Local HTTP/2 server answering every request with a JSON payload"""
+
+    def __init__(self, payload):
+        self.payload = json.dumps(payload).encode()
+        self.connections = 0
+        self.requests = 0
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen()
+        self.url = f"http://127.0.0.1:{self._sock.getsockname()[1]}/"
+
+    def __enter__(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._sock.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        import h2.config  # pylint: disable=import-outside-toplevel
+        import h2.connection  # pylint: disable=import-outside-toplevel
+        import h2.events  # pylint: disable=import-outside-toplevel
+
+        h2conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False)
+        )
+        h2conn.initiate_connection()
+        conn.sendall(h2conn.data_to_send())
+        while True:
+            data = conn.recv(65535)
+            if not data:
+                break
+            for event in h2conn.receive_data(data):
+                if isinstance(event, h2.events.StreamEnded):
+                    self.requests += 1
+                    h2conn.send_headers(
+                        event.stream_id,
+                        [
+                            (":status", "200"),
+                            ("content-length", str(len(self.payload))),
+                        ],
+                    )
+                    h2conn.send_data(event.stream_id, self.payload, end_stream=True)
+            conn.sendall(h2conn.data_to_send())
+        conn.close()
+
+
+class TestHttp2Transport:
+    payload = {"success": True, "data": {"asset_id": "1"}}
+
+    @pytest.fixture(autouse=True)
+    def needs_http2(self):
+        pytest.importorskip("httpx")
+        pytest.importorskip("h2")
+
+    def test_multiplexes_requests(self):
+        with H2Server(self.payload) as server:
+            transport = Http2Transport(max_connections=1, prior_knowledge=True)
+            atom = Atom(server.url, transport=transport, coalesce=False)
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                assets = list(pool.map(atom.get_asset, ["1"] * 64))
+            transport.close()
+        assert assets == [Asset({"asset_id": "1"})] * 64
+        assert server.requests == 64
+        assert server.connections == 1
+        assert transport.versions == {"HTTP/2": 64}
+
+    def test_async(self):
+        async def fetch_all(transport, url):
+            requests = [transport.request_async("GET", url) for _ in range(20)]
+            responses = await asyncio.gather(*requests)
+            await transport.aclose()
+            return responses
+
+        with H2Server(self.payload) as server:
+            transport = Http2Transport(max_connections=1, prior_knowledge=True)
+            responses = asyncio.run(fetch_all(transport, f"{server.url}assets/1"))
+        assert {response.status_code for response in responses} == {200}
+        assert server.connections == 1
+
+    def test_falls_back_to_http1(self):
+        with StandInServer(assets=10) as server:
+            transport = Http2Transport(prior_knowledge=True)
+            rejected = transport._client
+            atom = Atom(server.atomic_endpoint, transport=transport)
+            asset = atom.get_asset("1099500000001")
+            transport.close()
+        assert asset.get_id() == "1099500000001"
+        assert not transport.prior_knowledge
+        assert transport.versions == {"HTTP/1.1": 1}
+        assert rejected.is_closed
+
+    def test_async_falls_back_to_http1(self):
+        async def fetch(transport, url):
+            rejected = transport._get_async_client()
+            response = await transport.request_async("GET", url)
+            closed = rejected.is_closed
+            await transport.aclose()
+            return response, closed
+
+        with StandInServer(assets=10) as server:
+            transport = Http2Transport(prior_knowledge=True)
+            url = f"{server.atomic_endpoint}assets/1099500000001"
+            response, closed = asyncio.run(fetch(transport, url))
+            transport.close()
+        assert response.status_code == 200 and closed
+        assert transport.versions == {"HTTP/1.1": 1}
@@ -0,0 +1,142 @@
+"""Tests for the Watcher class"""
+
+from daltonapi.watcher import Watcher
+
+
+class FakeAtom:
+    """Serves assets and transfers from memory, counting queries"""
+
+    def __init__(self):
+        self.assets = []
+        self.transfers = []
+        self.queries = []
+
+    def mint(self, owner, collection):
+        asset_id = str(1000 + len(self.assets))
+        self.assets.append(
+            {
+                "asset_id": asset_id,
+                "owner": owner,
+                "collection": {"collection_name": collection},
+                "minted_at_time": "0",
+            }
+        )
+
+    def send(self, sender, recipient, collection):
+        self.transfers.append(
+            {
+                "transfer_id": str(500 + len(self.transfers)),
+                "sender_name": sender,
+                "recipient_name": recipient,
+                "collection": {"collection_name": collection},
+                "created_at_time": "0",
+            }
+        )
+
+    def query(self, endpoint, params=None, build=None):
+        rows = self._rows(endpoint, params)
+        return rows if build is None else build(rows)
+
+    def _rows(self, endpoint, params):
+        self.queries.append((endpoint, dict(params)))
+        rows = self.assets if endpoint == "assets" else self.transfers
+        for field, value in params.items():
+            values = str(value).split(",")
+            if field == "owner":
+                rows = [r for r in rows if r["owner"] in values]
+            elif field == "account":
+                rows = [
+                    r
+                    for r in rows
+                    if r["sender_name"] in values or r["recipient_name"] in values
+                ]
+            elif field == "collection_name":
+                rows = [r for r in rows if r["collection"]["collection_name"] in values]
+        rows = rows[::-1]
+        page, limit = params.get("page", 1), params["limit"]
+        return rows[(page - 1) * limit : page * limit]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestWatcher:
+    def test_batches_targets(self):
+        atom = FakeAtom()
+        owners = [f"owner{i}" for i in range(120)]
+        watcher = Watcher(atom, owners=owners, watch=("assets",), batch_size=50)
+        watcher.poll()
+        # one baseline query, then three packed queries for 120 owners
+        assert len(atom.queries) == 4
+
+    def test_reports_new_items_once(self):
+        atom = FakeAtom()
+        atom.mint("alice", "col1")
+        clock = FakeClock()
+        seen = []
+        watcher = Watcher(
+            atom, owners=["alice", "bob"], collections=["col2"], clock=clock
+        )
+        watcher.add_callback(seen.append)
+        assert watcher.poll() == []
+
+        atom.mint("bob", "col2")
+        atom.send("alice", "bob", "col1")
+        clock.now += 10
+        events = watcher.poll()
+        assert sorted((e.kind, e.target) for e in events) == [
+            ("assets", "bob"),
+            ("assets", "col2"),
+            ("transfers", "alice"),
+            ("transfers", "bob"),
+        ]
+        assert seen == events
+        assert watcher.stats.events == 4
+
+        clock.now += 10
+        assert watcher.poll() == []
+
+    def test_adaptive_interval(self):
+        atom = FakeAtom()
+        clock = FakeClock()
+        watcher = Watcher(
+            atom, owners=["alice", "bob"], min_interval=5, max_interval=20, clock=clock
+        )
+        watcher.poll()
+        for _ in range(4):
+            atom.mint("alice", "col1")
+            clock.now += 20
+            watcher.poll()
+        assert watcher.interval("alice") == 5
+        assert watcher.interval("bob") == 20
+
+    def test_request_budget(self):
+        atom = FakeAtom()
+        clock = FakeClock()
+        watcher = Watcher(
+            atom, owners=["alice"], collections=["col1"], request_budget=3, clock=clock
+        )
+        watcher.poll()
+        assert len(atom.queries) == 3
+        assert watcher.stats.budget_remaining == 0
+        clock.now += 100
+        watcher.poll()
+        assert watcher.stats.budget_used > 0
+
+    def test_events_sleep_on_the_clock(self):
+        atom = FakeAtom()
+        clock = FakeClock()
+        watcher = Watcher(
+            atom, owners=["alice"], min_interval=5, clock=clock, sleep=clock.sleep
+        )
+        assert list(watcher.events(max_polls=3)) == []
+        # idle back-off doubles the interval after each poll
+        assert clock.now == 10 + 20 + 40